@@ -0,0 +1,51 @@
+"""add settlement state
+
+Revision ID: a8d5e1f6b3c4
+Revises: f7c4d9e3a5b2
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a8d5e1f6b3c4"
+down_revision = "f7c4d9e3a5b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("settlements", sa.Column("state", sa.String(length=32), server_default=sa.text("'INITIATED'"), nullable=False))
+    op.add_column("settlements", sa.Column("chain_tx_hash", sa.String(length=128), nullable=True))
+    op.add_column("settlements", sa.Column("block_height", sa.BigInteger(), nullable=True))
+    op.add_column("settlements", sa.Column("error_reason", sa.String(length=255), nullable=True))
+    op.add_column("settlements", sa.Column("check_attempts", sa.Integer(), server_default=sa.text("0"), nullable=False))
+    op.add_column("settlements", sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("settlements", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("UPDATE settlements SET state = 'SIMULATED' WHERE tx_hash LIKE 'simulated:%'")
+    op.execute("UPDATE settlements SET next_check_at = now() WHERE state = 'INITIATED'")
+
+    op.create_index("ix_settlements_tx_hash", "settlements", ["tx_hash"], unique=False)
+    op.create_index(
+        "ix_settlements_pending_check",
+        "settlements",
+        ["next_check_at"],
+        unique=False,
+        postgresql_where=sa.text("next_check_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_settlements_pending_check", table_name="settlements")
+    op.drop_index("ix_settlements_tx_hash", table_name="settlements")
+    op.drop_column("settlements", "updated_at")
+    op.drop_column("settlements", "next_check_at")
+    op.drop_column("settlements", "check_attempts")
+    op.drop_column("settlements", "error_reason")
+    op.drop_column("settlements", "block_height")
+    op.drop_column("settlements", "chain_tx_hash")
+    op.drop_column("settlements", "state")
@@ -0,0 +1,42 @@
+"""add channel access path indexes
+
+Revision ID: b9e6f2a7c5d8
+Revises: a8d5e1f6b3c4
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b9e6f2a7c5d8"
+down_revision = "a8d5e1f6b3c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_payment_channels_active_user_content",
+        "payment_channels",
+        ["user_id", "content_id", "opened_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+    op.create_index("ix_payment_channels_user_opened", "payment_channels", ["user_id", "opened_at"], unique=False)
+    op.create_index("ix_settlements_channel_created", "settlements", ["channel_id", "created_at"], unique=False)
+
+    # Both are left prefixes of the composite indexes above.
+    op.drop_index("ix_payment_channels_user_id", table_name="payment_channels")
+    op.drop_index("ix_settlements_channel_id", table_name="settlements")
+
+
+def downgrade() -> None:
+    op.create_index("ix_settlements_channel_id", "settlements", ["channel_id"], unique=False)
+    op.create_index("ix_payment_channels_user_id", "payment_channels", ["user_id"], unique=False)
+
+    op.drop_index("ix_settlements_channel_created", table_name="settlements")
+    op.drop_index("ix_payment_channels_user_opened", table_name="payment_channels")
+    op.drop_index("ix_payment_channels_active_user_content", table_name="payment_channels")
@@ -0,0 +1,43 @@
+"""create escrow balance index
+
+Revision ID: c1a7d3e8f9b0
+Revises: b9e6f2a7c5d8
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c1a7d3e8f9b0"
+down_revision = "b9e6f2a7c5d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chain_cursors",
+        sa.Column("name", sa.String(length=128), nullable=False),
+        sa.Column("block_number", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_table(
+        "escrow_creator_balances",
+        sa.Column("escrow_address", sa.String(length=42), nullable=False),
+        sa.Column("creator_address", sa.String(length=42), nullable=False),
+        sa.Column("balance", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("total_streamed", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("total_withdrawn", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("last_block", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("escrow_address", "creator_address"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("escrow_creator_balances")
+    op.drop_table("chain_cursors")
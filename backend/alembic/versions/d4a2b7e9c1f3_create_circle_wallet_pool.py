@@ -0,0 +1,43 @@
+"""create circle wallet pool
+
+Revision ID: d4a2b7e9c1f3
+Revises: c3d7e1f5a9b2
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4a2b7e9c1f3"
+down_revision = "c3d7e1f5a9b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "circle_wallet_pool",
+        sa.Column("id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("circle_wallet_id", sa.String(length=128), nullable=False),
+        sa.Column("wallet_address", sa.String(length=128), nullable=False),
+        sa.Column("blockchain", sa.String(length=32), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("circle_wallet_id"),
+    )
+    op.create_index(
+        "ix_circle_wallet_pool_unclaimed",
+        "circle_wallet_pool",
+        ["blockchain", "created_at"],
+        unique=False,
+        postgresql_where=sa.text("claimed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_circle_wallet_pool_unclaimed", table_name="circle_wallet_pool")
+    op.drop_table("circle_wallet_pool")
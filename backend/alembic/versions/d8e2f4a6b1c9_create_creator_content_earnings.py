@@ -0,0 +1,52 @@
+"""create creator content earnings
+
+Revision ID: d8e2f4a6b1c9
+Revises: c1a7d3e8f9b0
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d8e2f4a6b1c9"
+down_revision = "c1a7d3e8f9b0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "creator_content_earnings",
+        sa.Column("content_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("creator_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("amount_gross", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("settlement_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["content_id"], ["content.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("content_id"),
+    )
+    op.create_index(
+        "ix_creator_content_earnings_creator_gross",
+        "creator_content_earnings",
+        ["creator_id", "amount_gross"],
+        unique=False,
+    )
+    op.execute(
+        """
+        INSERT INTO creator_content_earnings (content_id, creator_id, amount_gross, settlement_count)
+        SELECT content.id, content.creator_id, SUM(settlements.amount), COUNT(*)
+        FROM settlements
+        JOIN payment_channels ON payment_channels.id = settlements.channel_id
+        JOIN content ON content.id = payment_channels.content_id
+        GROUP BY content.id, content.creator_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_creator_content_earnings_creator_gross", table_name="creator_content_earnings")
+    op.drop_table("creator_content_earnings")
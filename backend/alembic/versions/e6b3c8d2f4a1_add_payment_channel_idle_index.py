@@ -0,0 +1,31 @@
+"""add payment channel idle index
+
+Revision ID: e6b3c8d2f4a1
+Revises: d4a2b7e9c1f3
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e6b3c8d2f4a1"
+down_revision = "d4a2b7e9c1f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_payment_channels_active_idle",
+        "payment_channels",
+        [sa.text("coalesce(last_tick_at, opened_at)")],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_channels_active_idle", table_name="payment_channels")
@@ -0,0 +1,53 @@
+"""create channel events
+
+Revision ID: f7c4d9e3a5b2
+Revises: e6b3c8d2f4a1
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f7c4d9e3a5b2"
+down_revision = "e6b3c8d2f4a1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("channel_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("tick_slot", sa.BigInteger(), nullable=True),
+        sa.Column("seconds", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("amount", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("compacted", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["channel_id"], ["payment_channels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_channel_events_tick_slot",
+        "channel_events",
+        ["channel_id", "tick_slot"],
+        unique=True,
+        postgresql_where=sa.text("tick_slot IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_channel_events_uncompacted",
+        "channel_events",
+        ["channel_id"],
+        unique=False,
+        postgresql_where=sa.text("NOT compacted"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_channel_events_uncompacted", table_name="channel_events")
+    op.drop_index("uq_channel_events_tick_slot", table_name="channel_events")
+    op.drop_table("channel_events")
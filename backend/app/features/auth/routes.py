@@ -5,13 +5,13 @@ from app.features.auth.schemas import LoginRequest, MeResponse, RegisterRequest,
 from app.features.auth.services import login_user, register_user
 from app.platform.db.session import get_session
 from app.platform.security import get_current_user
-from app.platform.services.circle_wallets import CircleWalletsClient
+from app.platform.services.circle_wallets import CircleWalletsClient, get_circle_wallets
 
 router = APIRouter(prefix="/auth")
 
 
 def get_circle_client() -> CircleWalletsClient:
-    return CircleWalletsClient()
+    return get_circle_wallets()
 
 
 @router.post("/register", response_model=TokenResponse)
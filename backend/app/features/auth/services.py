@@ -8,6 +8,7 @@ from app.platform.db.models import User
 from app.platform.config import settings
 from app.platform.security import create_access_token, hash_password, verify_password
 from app.platform.services.circle_wallets import CircleWalletsClient
+from app.platform.services.wallet_pool import claim_pooled_wallet, get_wallet_pool_replenisher, wallet_pool_enabled
 
 
 def _bad_request(detail: str) -> HTTPException:
@@ -32,8 +33,10 @@ async def register_user(
     circle_wallet_id: str | None = None
     wallet_address: str | None = None
 
+    pooled_wallet = await claim_pooled_wallet(session) if wallet_pool_enabled() else None
+
     try:
-        created_wallet = await circle.create_developer_wallet()
+        created_wallet = pooled_wallet or await circle.create_developer_wallet()
         circle_wallet_id = created_wallet.circle_wallet_id
         wallet_address = created_wallet.wallet_address
     except Exception:
@@ -53,6 +56,9 @@ async def register_user(
     session.add(user)
     await session.commit()
 
+    if pooled_wallet is not None:
+        get_wallet_pool_replenisher().notify()
+
     token = create_access_token(user.id)
     return TokenResponse(access_token=token)
 
@@ -2,7 +2,6 @@ from datetime import datetime, timedelta, timezone
 import secrets
 from uuid import uuid4
 
-from Crypto.Hash import keccak
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
 from fastapi.responses import JSONResponse
 from jose import JWTError, jwt
@@ -13,19 +12,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.features.ai_agents.services.content_analysis import analyze_upload
 from app.features.ai_agents.services.pricing import compute_suggested_price_per_second_minor_units
 from app.features.ai_agents.services.quality import compute_quality_score
-from app.features.content.schemas import ContentListItem, ContentResponse, StreamResponse
+from app.features.content.schemas import ContentListItem, ContentResponse, StreamPayRequest, StreamResponse
+from app.features.content.services import commit_stream_purchase, consume_stream_credit, get_stream_context
 from app.platform.config import settings
-from app.platform.db.models import Content, PaymentChannel, Settlement, StreamCredit, User
+from app.platform.db.models import Content, PaymentChannel, StreamCredit, User
+from app.platform.db.replica import get_read_session
 from app.platform.db.session import get_session
 from app.platform.security import get_current_user
-from app.platform.services.chain import ChainClient
-from app.platform.services.circle_wallets import CircleWalletsClient
+from app.platform.services.chain import ChainClient, get_escrow_usdc_address
+from app.platform.services.circle_wallets import CircleWalletsClient, circle_signing_enabled, get_circle_wallets
 from app.platform.services.gemini import get_or_create_pricing_explanation
 from app.platform.services.ipfs import IPFSClient
+from app.platform.services.earnings import record_settlement_earnings
+from app.platform.services.settlements import new_settlement
 from app.platform.services.x402 import (
     build_402_body,
-    build_exact_accept,
     encode_payment_response,
+    get_x402_sidecar,
 )
 
 router = APIRouter(prefix="/content")
@@ -36,11 +39,6 @@ def _utcnow() -> datetime:
 
 
 _X402_CHUNK_SECONDS = 10
-_ARC_TESTNET_USDC_ADDRESS = "0x3600000000000000000000000000000000000000"
-
-_SUPPORTED_CACHE: dict | None = None
-_SUPPORTED_CACHE_EXPIRES_AT: float = 0.0
-_SUPPORTED_TTL_SECONDS = 300.0
 
 
 def get_ipfs_client() -> IPFSClient:
@@ -56,13 +54,12 @@ def _service_unavailable(message: str) -> HTTPException:
 
 
 def get_circle_wallets_client() -> CircleWalletsClient:
-    return CircleWalletsClient()
+    return get_circle_wallets()
 
 
 def _live_stream_pay_enabled() -> bool:
     return bool(
-        settings.circle_api_key
-        and settings.circle_entity_secret
+        circle_signing_enabled()
         and settings.arc_rpc_url
         and settings.arc_chain_id is not None
         and settings.usdc_address
@@ -118,79 +115,48 @@ async def _get_or_create_credit(
     return credit
 
 
-async def _get_gateway_supported_kinds(*, sidecar_url: str) -> dict | None:
-    global _SUPPORTED_CACHE, _SUPPORTED_CACHE_EXPIRES_AT
-    now = datetime.now(timezone.utc).timestamp()
-    if _SUPPORTED_CACHE and _SUPPORTED_CACHE_EXPIRES_AT > now:
-        return _SUPPORTED_CACHE
-
-    timeout = httpx.Timeout(10.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            resp = await client.get(f"{sidecar_url.rstrip('/')}/supported")
-            resp.raise_for_status()
-            data = resp.json()
-        except httpx.RequestError:
-            return None
-        except httpx.HTTPStatusError:
-            return None
+async def _prepay_chunks(
+    *,
+    session: AsyncSession,
+    user_id: str,
+    content: Content,
+    body: StreamPayRequest | None,
+) -> int:
+    if body is None:
+        return 1
+
+    chunks = int(body.chunks)
+    if body.rest_of_video:
+        streamed_result = await session.execute(
+            select(PaymentChannel.total_seconds_streamed)
+            .where(
+                PaymentChannel.user_id == user_id,
+                PaymentChannel.content_id == content.id,
+                PaymentChannel.status == "active",
+            )
+            .order_by(PaymentChannel.opened_at.desc())
+            .limit(1)
+        )
+        credit_result = await session.execute(
+            select(StreamCredit.seconds_remaining).where(
+                StreamCredit.user_id == user_id,
+                StreamCredit.content_id == content.id,
+            )
+        )
+        streamed = int(streamed_result.scalar() or 0)
+        credited = int(credit_result.scalar() or 0)
+        remaining = int(content.duration_seconds) - streamed - credited
+        if remaining <= 0:
+            raise HTTPException(status_code=400, detail="Nothing left to prepay")
+        chunks = -(-remaining // _X402_CHUNK_SECONDS)
 
-    if isinstance(data, dict):
-        _SUPPORTED_CACHE = data
-        _SUPPORTED_CACHE_EXPIRES_AT = now + _SUPPORTED_TTL_SECONDS
-        return data
-    return None
+    return min(chunks, max(1, settings.stream_max_prepay_chunks))
 
 
 def _unauthorized() -> HTTPException:
     return HTTPException(status_code=401, detail="Unauthorized")
 
 
-async def _arc_rpc(method: str, params: list) -> dict:
-    if not settings.arc_rpc_url:
-        raise RuntimeError("ARC RPC not configured")
-
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params,
-    }
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.post(settings.arc_rpc_url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-
-    if isinstance(data, dict) and data.get("error"):
-        raise RuntimeError(f"ARC RPC error: {data['error']}")
-
-    if not isinstance(data, dict) or "result" not in data:
-        raise RuntimeError("ARC RPC returned no result")
-
-    return data
-
-
-def _function_selector(signature: str) -> str:
-    k = keccak.new(digest_bits=256)
-    k.update(signature.encode("utf-8"))
-    return "0x" + k.digest()[:4].hex()
-
-
-async def _get_escrow_usdc_address(escrow_address: str) -> str:
-    selector = _function_selector("usdc()")
-    call = {
-        "to": escrow_address,
-        "data": selector,
-    }
-    data = await _arc_rpc("eth_call", [call, "latest"])
-    result = data.get("result")
-    if not isinstance(result, str) or not result.startswith("0x"):
-        raise RuntimeError("ARC RPC returned invalid eth_call result")
-    addr = "0x" + result[-40:]
-    return addr.lower()
-
-
 async def _require_user_for_stream(request: Request, session: AsyncSession):
     header = request.headers.get("authorization")
     token: str | None = None
@@ -232,19 +198,12 @@ def _extract_access_token(request: Request) -> str:
 
 
 async def _pay_via_sidecar(*, sidecar_url: str, content_id: str, access_token: str) -> dict:
-    timeout = httpx.Timeout(30.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            resp = await client.post(
-                f"{sidecar_url.rstrip('/')}/pay",
-                json={"contentId": content_id, "accessToken": access_token},
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.RequestError as exc:
-            raise _service_unavailable(f"x402 gateway sidecar unreachable at {sidecar_url}") from exc
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=502, detail="x402 gateway sidecar error") from exc
+    try:
+        return await get_x402_sidecar(sidecar_url).post_json("pay", {"contentId": content_id, "accessToken": access_token})
+    except httpx.RequestError as exc:
+        raise _service_unavailable(f"x402 gateway sidecar unreachable at {sidecar_url}") from exc
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=502, detail="x402 gateway sidecar error") from exc
 
 
 @router.post("/upload", response_model=ContentResponse)
@@ -353,7 +312,7 @@ async def upload_content(
 
 @router.get("", response_model=list[ContentListItem])
 async def list_content(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     ipfs: IPFSClient = Depends(get_ipfs_client),
 ) -> list[ContentListItem]:
     result = await session.execute(select(Content).order_by(Content.created_at.desc()).limit(100))
@@ -379,7 +338,7 @@ async def list_content(
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     ipfs: IPFSClient = Depends(get_ipfs_client),
 ) -> ContentResponse:
     result = await session.execute(select(Content).where(Content.id == content_id))
@@ -434,70 +393,54 @@ async def stream_content(
     ipfs: IPFSClient = Depends(get_ipfs_client),
 ) -> StreamResponse:
     user = await _require_user_for_stream(request, session)
-    result = await session.execute(select(Content).where(Content.id == content_id))
-    row = result.scalar_one_or_none()
-    if row is None:
+    context = await get_stream_context(session=session, content_id=content_id, chunk_seconds=_X402_CHUNK_SECONDS)
+    if context is None:
         raise HTTPException(status_code=404, detail="Not found")
-
-    creator_result = await session.execute(select(User).where(User.id == row.creator_id))
-    creator = creator_result.scalar_one_or_none()
-    seller_address = getattr(creator, "wallet_address", None) or settings.x402_default_seller_address
-    if not seller_address:
+    if not context.seller_address:
         raise _service_unavailable("Seller address not configured")
 
-    asset = settings.usdc_address or _ARC_TESTNET_USDC_ADDRESS
-    amount = int(row.price_per_second) * _X402_CHUNK_SECONDS
-
-    kind_extra: dict | None = None
-    if settings.x402_gateway_sidecar_url:
-        supported = await _get_gateway_supported_kinds(sidecar_url=settings.x402_gateway_sidecar_url)
-        if isinstance(supported, dict):
-            kinds = supported.get("kinds")
-            if isinstance(kinds, list):
-                for kind in kinds:
-                    if not isinstance(kind, dict):
-                        continue
-                    if kind.get("scheme") != "exact":
-                        continue
-                    if kind.get("network") != settings.x402_network:
-                        continue
-                    extra = kind.get("extra")
-                    if isinstance(extra, dict):
-                        kind_extra = extra
-                        break
-
-    accepts = [
-        build_exact_accept(
-            network=settings.x402_network,
-            asset=asset,
-            amount=amount,
-            pay_to=seller_address,
-            max_timeout_seconds=settings.x402_max_timeout_seconds,
-            extra=kind_extra or {"name": settings.usdc_name, "version": settings.usdc_version},
-        )
-    ]
-
-    credit = await _get_or_create_credit(session=session, user_id=user.id, content_id=row.id)
-    if int(credit.seconds_remaining) < _X402_CHUNK_SECONDS:
+    def _payment_required() -> JSONResponse:
         body = build_402_body(
             url=str(request.url),
-            description=f"Stream {row.title} ({_X402_CHUNK_SECONDS}s)",
+            description=f"Stream {context.title} ({_X402_CHUNK_SECONDS}s)",
             mime_type="application/json",
-            accepts=accepts,
+            accepts=list(context.accepts),
         )
         return JSONResponse(status_code=402, content=body)
 
+    gate = await consume_stream_credit(
+        session=session,
+        user_id=user.id,
+        content_id=context.content_id,
+        chunk_seconds=_X402_CHUNK_SECONDS,
+        amount=context.chunk_amount,
+    )
+    if gate is not None:
+        if not gate.allowed:
+            return _payment_required()
+        return StreamResponse(
+            playback_url=ipfs.playback_url(context.ipfs_cid),
+            seconds_remaining=gate.seconds_remaining,
+        )
+
+    credit = await _get_or_create_credit(session=session, user_id=user.id, content_id=context.content_id)
+    if int(credit.seconds_remaining) < _X402_CHUNK_SECONDS:
+        return _payment_required()
+
     credit.seconds_remaining = int(credit.seconds_remaining) - _X402_CHUNK_SECONDS
 
+    row = await session.get(Content, context.content_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
     channel = await _get_or_create_channel(session=session, user_id=user.id, content=row)
     now = _utcnow()
     channel.total_seconds_streamed = int(channel.total_seconds_streamed) + _X402_CHUNK_SECONDS
-    channel.total_amount_owed = int(channel.total_amount_owed) + amount
+    channel.total_amount_owed = int(channel.total_amount_owed) + context.chunk_amount
     channel.last_tick_at = now
 
     await session.commit()
     return StreamResponse(
-        playback_url=ipfs.playback_url(row.ipfs_cid),
+        playback_url=ipfs.playback_url(context.ipfs_cid),
         seconds_remaining=int(credit.seconds_remaining),
     )
 
@@ -507,6 +450,7 @@ async def pay_stream_content(
     content_id: str,
     request: Request,
     response: Response,
+    body: StreamPayRequest | None = None,
     session: AsyncSession = Depends(get_session),
     ipfs: IPFSClient = Depends(get_ipfs_client),
     circle: CircleWalletsClient = Depends(get_circle_wallets_client),
@@ -526,7 +470,11 @@ async def pay_stream_content(
     if not creator.wallet_address:
         raise HTTPException(status_code=400, detail="Creator wallet not available")
 
-    amount = int(content.price_per_second) * _X402_CHUNK_SECONDS
+    # One authorization covers every purchased chunk, so a prepaying viewer signs and settles once
+    # instead of once per _X402_CHUNK_SECONDS of playback.
+    chunks = await _prepay_chunks(session=session, user_id=user.id, content=content, body=body)
+    purchased_seconds = chunks * _X402_CHUNK_SECONDS
+    amount = int(content.price_per_second) * purchased_seconds
     if amount <= 0:
         raise HTTPException(status_code=400, detail="Invalid price")
 
@@ -538,7 +486,10 @@ async def pay_stream_content(
             raise HTTPException(status_code=400, detail="User wallet not available")
 
         chain = ChainClient.from_settings()
-        escrow_usdc = await _get_escrow_usdc_address(chain.config.escrow_address)
+        escrow_usdc = await get_escrow_usdc_address(chain.config.escrow_address)
+        if escrow_usdc != chain.config.usdc_address.lower():
+            # Re-verify once in case the escrow was redeployed behind the same settings.
+            escrow_usdc = await get_escrow_usdc_address(chain.config.escrow_address, refresh=True)
         if escrow_usdc != chain.config.usdc_address.lower():
             raise HTTPException(
                 status_code=400,
@@ -591,18 +542,26 @@ async def pay_stream_content(
         tx_id = f"simulated:{uuid4()}"
         payer = user.wallet_address or "unknown"
 
+    # Lock the credit row before the channel row, the same order the Redis write-back uses.
+    credit = await _get_or_create_credit(session=session, user_id=user.id, content_id=content.id)
+    credit.seconds_remaining = int(credit.seconds_remaining) + purchased_seconds
+
     channel = await _get_or_create_channel(session=session, user_id=user.id, content=content)
-    session.add(Settlement(channel_id=channel.id, amount=amount, tx_hash=tx_id))
+    now = _utcnow()
+    session.add(new_settlement(channel_id=channel.id, amount=amount, tx_id=tx_id, now=now))
+    await record_settlement_earnings(session, content_id=content.id, amount=amount)
     channel.total_amount_settled = int(channel.total_amount_settled) + amount
-    channel.last_settlement_at = _utcnow()
-
-    credit = await _get_or_create_credit(session=session, user_id=user.id, content_id=content.id)
-    credit.seconds_remaining = int(credit.seconds_remaining) + _X402_CHUNK_SECONDS
+    channel.last_settlement_at = now
 
-    await session.commit()
+    seconds_remaining = await commit_stream_purchase(
+        session=session, user_id=user.id, content_id=content.id, seconds=purchased_seconds
+    )
+    if seconds_remaining is None:
+        seconds_remaining = int(credit.seconds_remaining)
 
     response.headers["Payment-Response"] = encode_payment_response({"transaction": tx_id, "payer": payer})
     return StreamResponse(
         playback_url=ipfs.playback_url(content.ipfs_cid),
-        seconds_remaining=int(credit.seconds_remaining),
+        seconds_remaining=seconds_remaining,
+        seconds_purchased=purchased_seconds,
     )
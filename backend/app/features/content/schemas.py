@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ContentResponse(BaseModel):
@@ -39,3 +39,9 @@ class ContentListItem(BaseModel):
 class StreamResponse(BaseModel):
     playback_url: str
     seconds_remaining: int | None = None
+    seconds_purchased: int | None = None
+
+
+class StreamPayRequest(BaseModel):
+    chunks: int = Field(default=1, ge=1)
+    rest_of_video: bool = False
@@ -0,0 +1,535 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+import logging
+import time
+
+from sqlalchemy import event, inspect, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import Content, PaymentChannel, StreamCredit, User
+from app.platform.db.session import get_sessionmaker
+from app.platform.redis import get_redis
+from app.platform.services.x402 import build_exact_accept, get_gateway_supported_kinds, resolve_exact_kind_extra
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+_ARC_TESTNET_USDC_ADDRESS = "0x3600000000000000000000000000000000000000"
+_UNRESOLVED_CONTEXT_TTL_SECONDS = 3.0
+
+
+@dataclass(frozen=True)
+class StreamContext:
+    content_id: str
+    creator_id: str
+    title: str
+    ipfs_cid: str
+    price_per_second: int
+    seller_address: str | None
+    chunk_amount: int
+    accepts: tuple[dict, ...]
+    expires_at: float
+    generation: int | None = None
+
+
+# Per-process LRU of everything stream_content needs besides the viewer's credit. Entries expire
+# after STREAM_CONTEXT_TTL_SECONDS. Committed price, CID or creator wallet changes bump a Redis
+# generation that every process checks on lookup, so other workers drop their entries too; bulk
+# update() statements skip the ORM listeners and must call publish_stream_context_invalidation().
+# While Redis is unreachable, staleness is bounded by the TTL alone.
+_STREAM_CONTEXTS: OrderedDict[str, StreamContext] = OrderedDict()
+_GENERATION_KEY = "stream_context:generation"
+_PENDING_KEY = "stream_context_invalidations"
+
+_CONTEXT_LOOKUPS = metrics.counter("stream_context_lookups_total", "Stream gating context cache lookups by result")
+
+_publish_tasks: set[asyncio.Task] = set()
+
+
+def invalidate_stream_context(content_id: str) -> None:
+    _STREAM_CONTEXTS.pop(str(content_id), None)
+
+
+def invalidate_creator_stream_contexts(creator_id: str) -> None:
+    for content_id, context in list(_STREAM_CONTEXTS.items()):
+        if context.creator_id == str(creator_id):
+            _STREAM_CONTEXTS.pop(content_id, None)
+
+
+async def publish_stream_context_invalidation() -> None:
+    """Make every process rebuild its stream contexts; call after committing a bulk price or wallet update."""
+    _STREAM_CONTEXTS.clear()
+    try:
+        await get_redis().incr(_GENERATION_KEY)
+    except Exception:
+        logger.warning("Could not publish stream context invalidation", exc_info=True)
+
+
+async def _current_generation() -> int | None:
+    try:
+        value = await get_redis().get(_GENERATION_KEY)
+    except Exception:
+        logger.debug("Stream context generation unavailable", exc_info=True)
+        return None
+    return int(value or 0)
+
+
+def _mark_pending(target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Content, "after_update")
+def _content_updated(mapper, connection, target: Content) -> None:
+    state = inspect(target)
+    if state.attrs.price_per_second.history.has_changes() or state.attrs.ipfs_cid.history.has_changes():
+        invalidate_stream_context(target.id)
+        _mark_pending(target)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    if inspect(target).attrs.wallet_address.history.has_changes():
+        invalidate_creator_stream_contexts(target.id)
+        _mark_pending(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    # Publishing before commit would let another process cache the old row under the new generation.
+    if not session.info.pop(_PENDING_KEY, False):
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(publish_stream_context_invalidation())
+    except RuntimeError:
+        return
+    _publish_tasks.add(task)
+    task.add_done_callback(_publish_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def _build_stream_context(*, session: AsyncSession, content_id: str, chunk_seconds: int) -> StreamContext | None:
+    result = await session.execute(
+        select(Content.id, Content.creator_id, Content.title, Content.ipfs_cid, Content.price_per_second, User.wallet_address)
+        .outerjoin(User, User.id == Content.creator_id)
+        .where(Content.id == content_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    content_id, creator_id, title, ipfs_cid, price_per_second, creator_wallet = row
+    seller_address = creator_wallet or settings.x402_default_seller_address
+    chunk_amount = int(price_per_second) * chunk_seconds
+
+    kind_extra: dict | None = None
+    ttl_seconds = settings.stream_context_ttl_seconds
+    if settings.x402_gateway_sidecar_url:
+        supported = await get_gateway_supported_kinds(sidecar_url=settings.x402_gateway_sidecar_url)
+        kind_extra = resolve_exact_kind_extra(supported, network=settings.x402_network)
+        if supported is None:
+            # The refresher has not fetched the gateway's kinds yet; keep the fallback extra briefly.
+            ttl_seconds = min(ttl_seconds, _UNRESOLVED_CONTEXT_TTL_SECONDS)
+
+    accepts: tuple[dict, ...] = ()
+    if seller_address:
+        accepts = (
+            build_exact_accept(
+                network=settings.x402_network,
+                asset=settings.usdc_address or _ARC_TESTNET_USDC_ADDRESS,
+                amount=chunk_amount,
+                pay_to=seller_address,
+                max_timeout_seconds=settings.x402_max_timeout_seconds,
+                extra=kind_extra or {"name": settings.usdc_name, "version": settings.usdc_version},
+            ),
+        )
+
+    return StreamContext(
+        content_id=str(content_id),
+        creator_id=str(creator_id),
+        title=str(title),
+        ipfs_cid=str(ipfs_cid),
+        price_per_second=int(price_per_second),
+        seller_address=seller_address,
+        chunk_amount=chunk_amount,
+        accepts=accepts,
+        expires_at=time.monotonic() + ttl_seconds,
+    )
+
+
+async def get_stream_context(*, session: AsyncSession, content_id: str, chunk_seconds: int) -> StreamContext | None:
+    generation = await _current_generation()
+    cached = _STREAM_CONTEXTS.get(content_id)
+    if (
+        cached is not None
+        and cached.expires_at > time.monotonic()
+        and (generation is None or cached.generation is None or cached.generation == generation)
+    ):
+        _STREAM_CONTEXTS.move_to_end(content_id)
+        _CONTEXT_LOOKUPS.inc(result="hit")
+        return cached
+
+    _CONTEXT_LOOKUPS.inc(result="miss")
+    context = await _build_stream_context(session=session, content_id=content_id, chunk_seconds=chunk_seconds)
+    if context is None:
+        _STREAM_CONTEXTS.pop(content_id, None)
+        return None
+
+    context = replace(context, generation=generation)
+    _STREAM_CONTEXTS[content_id] = context
+    _STREAM_CONTEXTS.move_to_end(content_id)
+    while len(_STREAM_CONTEXTS) > max(1, settings.stream_context_cache_size):
+        _STREAM_CONTEXTS.popitem(last=False)
+    return context
+
+
+# Redis mirrors each (user, content) stream credit as a hash:
+#   seconds   - spendable seconds (Postgres seconds_remaining minus consumed)
+#   consumed  - seconds spent since the last write-back
+#   owed      - amount owed for those seconds, added to the active channel on write-back
+#   last_tick - epoch seconds of the last consumed chunk
+# Postgres stays the source of truth. Hydration, write-back and the purchase top-up all hold the
+# stream_credits row lock while touching Redis, so a purchase is never hidden or counted twice.
+_DIRTY_SET_KEY = "stream_credit:dirty"
+
+_CONSUME_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1, 0}
+end
+local seconds = tonumber(redis.call('HGET', KEYS[1], 'seconds') or '0')
+local chunk = tonumber(ARGV[1])
+if seconds < chunk then
+    return {0, seconds}
+end
+seconds = redis.call('HINCRBY', KEYS[1], 'seconds', -chunk)
+redis.call('HINCRBY', KEYS[1], 'consumed', chunk)
+redis.call('HINCRBY', KEYS[1], 'owed', ARGV[2])
+redis.call('HSET', KEYS[1], 'last_tick', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('SADD', KEYS[2], ARGV[4])
+return {1, seconds}
+"""
+
+_HYDRATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'seconds', ARGV[1], 'consumed', 0, 'owed', 0, 'last_tick', 0)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_CREDIT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local seconds = redis.call('HINCRBY', KEYS[1], 'seconds', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return seconds
+"""
+
+_TAKE_SCRIPT = """
+local values = redis.call('HMGET', KEYS[1], 'consumed', 'owed', 'last_tick')
+if ARGV[1] == '1' then
+    redis.call('DEL', KEYS[1])
+elseif values[1] then
+    redis.call('HSET', KEYS[1], 'consumed', 0, 'owed', 0)
+end
+return {tonumber(values[1] or '0'), tonumber(values[2] or '0'), tonumber(values[3] or '0')}
+"""
+
+_RESTORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'consumed', ARGV[1])
+redis.call('HINCRBY', KEYS[1], 'owed', ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[3])
+return 1
+"""
+
+_GATE_DECISIONS = metrics.counter("stream_credit_gate_total", "Stream credit gate decisions by backend and outcome")
+_FLUSHED_KEYS = metrics.counter("stream_credit_flushed_keys_total", "Stream credit keys written back to Postgres")
+_FLUSH_FAILURES = metrics.counter("stream_credit_flush_failures_total", "Stream credit write-back batches that failed")
+
+_scripts: dict[str, object] = {}
+
+
+def _script(name: str, source: str):
+    redis = get_redis()
+    cached = _scripts.get(name)
+    if cached is None or getattr(cached, "registered_client", None) is not redis:
+        cached = redis.register_script(source)
+        _scripts[name] = cached
+    return cached
+
+
+def stream_credit_key(user_id: str, content_id: str) -> str:
+    return f"stream_credit:{user_id}:{content_id}"
+
+
+def _member(user_id: str, content_id: str) -> str:
+    return f"{user_id}:{content_id}"
+
+
+@dataclass(frozen=True)
+class CreditGate:
+    allowed: bool
+    seconds_remaining: int
+
+
+@dataclass(frozen=True)
+class PendingUsage:
+    consumed_seconds: int
+    owed_amount: int
+    last_tick_at: datetime | None
+
+
+async def _hydrate(*, session: AsyncSession, user_id: str, content_id: str) -> None:
+    # FOR SHARE waits for an in-flight purchase or write-back on the same row, so the value
+    # seeded into Redis always reflects committed purchases and flushed consumption.
+    result = await session.execute(
+        select(StreamCredit.seconds_remaining)
+        .where(StreamCredit.user_id == user_id, StreamCredit.content_id == content_id)
+        .with_for_update(read=True)
+    )
+    seconds = int(result.scalar() or 0)
+    try:
+        await _script("hydrate", _HYDRATE_SCRIPT)(
+            keys=[stream_credit_key(user_id, content_id)],
+            args=[seconds, settings.stream_credit_cache_ttl_seconds],
+        )
+    finally:
+        # Commit rather than roll back so request-scoped objects loaded earlier are not expired.
+        await session.commit()
+
+
+async def consume_stream_credit(
+    *,
+    session: AsyncSession,
+    user_id: str,
+    content_id: str,
+    chunk_seconds: int,
+    amount: int,
+) -> CreditGate | None:
+    key = stream_credit_key(user_id, content_id)
+    args = [
+        chunk_seconds,
+        amount,
+        int(datetime.now(timezone.utc).timestamp()),
+        _member(user_id, content_id),
+        settings.stream_credit_cache_ttl_seconds,
+    ]
+    try:
+        consume = _script("consume", _CONSUME_SCRIPT)
+        status, seconds = await consume(keys=[key, _DIRTY_SET_KEY], args=args)
+        if int(status) == -1:
+            await _hydrate(session=session, user_id=user_id, content_id=content_id)
+            status, seconds = await consume(keys=[key, _DIRTY_SET_KEY], args=args)
+    except Exception:
+        logger.warning("Redis stream credit gate unavailable, falling back to Postgres", exc_info=True)
+        _GATE_DECISIONS.inc(backend="postgres", outcome="fallback")
+        return None
+
+    allowed = int(status) == 1
+    _GATE_DECISIONS.inc(backend="redis", outcome="allowed" if allowed else "payment_required")
+    return CreditGate(allowed=allowed, seconds_remaining=int(seconds))
+
+
+async def _take_pending(user_id: str, content_id: str, *, drop: bool) -> PendingUsage:
+    consumed, owed, last_tick = await _script("take", _TAKE_SCRIPT)(
+        keys=[stream_credit_key(user_id, content_id)],
+        args=["1" if drop else "0"],
+    )
+    last_tick_at = datetime.fromtimestamp(int(last_tick), tz=timezone.utc) if int(last_tick) else None
+    return PendingUsage(consumed_seconds=int(consumed), owed_amount=int(owed), last_tick_at=last_tick_at)
+
+
+async def _restore_pending(user_id: str, content_id: str, pending: PendingUsage) -> None:
+    restored = 0
+    try:
+        restored = await _script("restore", _RESTORE_SCRIPT)(
+            keys=[stream_credit_key(user_id, content_id), _DIRTY_SET_KEY],
+            args=[pending.consumed_seconds, pending.owed_amount, _member(user_id, content_id)],
+        )
+    except Exception:
+        logger.warning("Redis stream credit restore failed", exc_info=True)
+    if not restored:
+        logger.error("Lost %s pending stream seconds for %s/%s", pending.consumed_seconds, user_id, content_id)
+
+
+async def _apply_pending(
+    *,
+    session: AsyncSession,
+    credit: StreamCredit,
+    pending: PendingUsage,
+) -> None:
+    if pending.consumed_seconds <= 0:
+        return
+
+    credit.seconds_remaining = int(credit.seconds_remaining) - pending.consumed_seconds
+
+    channel_result = await session.execute(
+        select(PaymentChannel)
+        .where(
+            PaymentChannel.user_id == credit.user_id,
+            PaymentChannel.content_id == credit.content_id,
+            PaymentChannel.status == "active",
+        )
+        .order_by(PaymentChannel.opened_at.desc())
+        .limit(1)
+        .with_for_update(key_share=True)
+        .execution_options(populate_existing=True)
+    )
+    channel = channel_result.scalar_one_or_none()
+    if channel is None:
+        price_result = await session.execute(select(Content.price_per_second).where(Content.id == credit.content_id))
+        channel = PaymentChannel(
+            user_id=credit.user_id,
+            content_id=credit.content_id,
+            price_per_second_locked=int(price_result.scalar() or 0),
+            status="active",
+        )
+        session.add(channel)
+        await session.flush()
+
+    channel.total_seconds_streamed = int(channel.total_seconds_streamed) + pending.consumed_seconds
+    channel.total_amount_owed = int(channel.total_amount_owed) + pending.owed_amount
+    if pending.last_tick_at is not None:
+        channel.last_tick_at = pending.last_tick_at
+
+
+async def sync_stream_credit(*, session: AsyncSession, user_id: str, content_id: str) -> int | None:
+    """Write back and evict the Redis mirror for one credit; returns the committed seconds remaining."""
+    result = await session.execute(
+        select(StreamCredit)
+        .where(StreamCredit.user_id == user_id, StreamCredit.content_id == content_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    credit = result.scalar_one_or_none()
+
+    try:
+        pending = await _take_pending(user_id, content_id, drop=True)
+    except Exception:
+        logger.warning("Redis stream credit sync unavailable", exc_info=True)
+        await session.commit()
+        return int(credit.seconds_remaining) if credit is not None else None
+
+    if credit is None:
+        await session.commit()
+        return None
+
+    await _apply_pending(session=session, credit=credit, pending=pending)
+    await session.commit()
+    return int(credit.seconds_remaining)
+
+
+async def commit_stream_purchase(*, session: AsyncSession, user_id: str, content_id: str, seconds: int) -> int | None:
+    """Commit a purchase that added seconds to the locked credit row and top up its Redis mirror to match.
+
+    Returns the spendable seconds, or None when the credit is not mirrored and the row holds the answer.
+    """
+    key = stream_credit_key(user_id, content_id)
+    try:
+        # Still under the row lock: a hydrate waiting on it finds the key already topped up, and no Redis
+        # step is left after the commit that could strand an exhausted key in front of a paying viewer.
+        top_up = _script("credit", _CREDIT_SCRIPT)
+        mirrored = int(await top_up(keys=[key], args=[seconds, settings.stream_credit_cache_ttl_seconds]))
+    except Exception:
+        logger.warning("Redis stream credit top-up failed, evicting the mirror", exc_info=True)
+        await session.commit()
+        return await sync_stream_credit(session=session, user_id=user_id, content_id=content_id)
+
+    try:
+        await session.commit()
+    except Exception:
+        if mirrored >= 0:
+            try:
+                await top_up(keys=[key], args=[-seconds, settings.stream_credit_cache_ttl_seconds])
+            except Exception:
+                logger.error("Could not take back %s stream seconds for %s/%s", seconds, user_id, content_id)
+        raise
+    return mirrored if mirrored >= 0 else None
+
+
+async def flush_stream_credits(*, session: AsyncSession, limit: int) -> int:
+    redis = get_redis()
+    members = await redis.spop(_DIRTY_SET_KEY, limit)
+    if not members:
+        return 0
+
+    pairs = sorted({tuple(member.split(":", 1)) for member in members if ":" in member})
+    if not pairs:
+        return 0
+
+    # Credit rows are locked before their channels, in id order, matching the purchase path.
+    result = await session.execute(
+        select(StreamCredit)
+        .where(tuple_(StreamCredit.user_id, StreamCredit.content_id).in_(pairs))
+        .order_by(StreamCredit.id)
+        .with_for_update()
+    )
+    credits = list(result.scalars().all())
+
+    taken: list[tuple[StreamCredit, PendingUsage]] = []
+    try:
+        for credit in credits:
+            pending = await _take_pending(credit.user_id, credit.content_id, drop=False)
+            taken.append((credit, pending))
+            await _apply_pending(session=session, credit=credit, pending=pending)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        for credit, pending in taken:
+            if pending.consumed_seconds > 0:
+                await _restore_pending(credit.user_id, credit.content_id, pending)
+        raise
+
+    _FLUSHED_KEYS.inc(len(taken))
+    return len(taken)
+
+
+class StreamCreditFlusher(PeriodicWorker):
+    name = "stream_credit_flusher"
+
+    def interval_seconds(self) -> float:
+        return settings.stream_credit_flush_interval_seconds
+
+    async def run_once(self) -> bool:
+        async with get_sessionmaker()() as session:
+            try:
+                flushed = await flush_stream_credits(session=session, limit=settings.stream_credit_flush_batch_size)
+            except Exception:
+                _FLUSH_FAILURES.inc()
+                raise
+        return flushed >= settings.stream_credit_flush_batch_size
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        try:
+            await self.run_once()
+        except Exception:
+            logger.warning("Final stream credit write-back failed", exc_info=True)
+
+
+_flusher: StreamCreditFlusher | None = None
+
+
+def get_stream_credit_flusher() -> StreamCreditFlusher:
+    global _flusher
+    if _flusher is None:
+        _flusher = StreamCreditFlusher()
+    return _flusher
@@ -1,15 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import logging
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException
-import httpx
 from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from Crypto.Hash import keccak
-
 from app.features.creators.schemas import (
     CreatorContentEarningsItem,
     CreatorDashboardResponse,
@@ -18,10 +16,14 @@ from app.features.creators.schemas import (
 )
 from app.platform.config import settings
 from app.platform.db.models import Content, PaymentChannel, Settlement
+from app.platform.db.replica import get_current_reader, get_read_session
 from app.platform.db.session import get_session
 from app.platform.security import get_current_user
-from app.platform.services.circle_wallets import CircleWalletsClient
-from app.platform.services.chain import ChainClient
+from app.platform.services.circle_wallets import CircleWalletsClient, circle_signing_enabled, get_circle_wallets
+from app.platform.services.balances import read_escrow_creator_balances
+from app.platform.services.chain import ArcRpcError, ChainClient
+from app.platform.services.earnings import get_creator_content_earnings
+from app.platform.services.escrow_indexer import get_indexed_creator_balance
 
 try:
     from circle.web3.developer_controlled_wallets.exceptions import BadRequestException
@@ -29,6 +31,8 @@ except Exception:  # pragma: no cover
     BadRequestException = None  # type: ignore[assignment]
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/creators")
 
 
@@ -48,14 +52,25 @@ def _creator_share(amount_gross: int) -> int:
     return (int(amount_gross) * _CREATOR_SHARE_BPS) // _BPS_DENOMINATOR
 
 
+def _earnings_items(rows: list[tuple[str, str, int]]) -> list[CreatorContentEarningsItem]:
+    return [
+        CreatorContentEarningsItem(
+            content_id=content_id,
+            title=title,
+            amount_gross=gross,
+            amount_creator=_creator_share(gross),
+        )
+        for content_id, title, gross in rows
+    ]
+
+
 def get_circle_wallets_client() -> CircleWalletsClient:
-    return CircleWalletsClient()
+    return get_circle_wallets()
 
 
 def _live_withdraw_enabled() -> bool:
     return bool(
-        settings.circle_api_key
-        and settings.circle_entity_secret
+        circle_signing_enabled()
         and settings.arc_rpc_url
         and settings.arc_chain_id is not None
         and settings.usdc_address
@@ -63,50 +78,32 @@ def _live_withdraw_enabled() -> bool:
     )
 
 
-def _abi_function_selector(signature: str) -> str:
-    h = keccak.new(digest_bits=256)
-    h.update(signature.encode("utf-8"))
-    return h.hexdigest()[:8]
-
-
-def _abi_encode_address(address: str) -> str:
-    if not address or not isinstance(address, str):
-        raise ValueError("Invalid address")
-    if not address.startswith("0x") or len(address) != 42:
-        raise ValueError("Invalid address")
-    return address[2:].lower().rjust(64, "0")
-
-
-async def _arc_eth_call(to_address: str, data: str) -> str:
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "eth_call",
-        "params": [{"to": to_address, "data": data}, "latest"],
-    }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.post(settings.arc_rpc_url, json=payload)
-        resp.raise_for_status()
-        body = resp.json()
-    if "error" in body:
-        raise HTTPException(status_code=502, detail=f"Arc RPC error: {body['error']}")
-    return str(body.get("result") or "0x0")
-
-
-async def _get_escrow_creator_balance_minor(creator_wallet_address: str) -> int:
-    selector = _abi_function_selector("creatorBalances(address)")
-    calldata = "0x" + selector + _abi_encode_address(creator_wallet_address)
-    result = await _arc_eth_call(settings.escrow_address, calldata)
+async def _get_escrow_creator_balance_minor(creator_wallet_address: str, *, refresh: bool = False) -> int:
+    try:
+        balances = await read_escrow_creator_balances([creator_wallet_address], refresh=refresh)
+    except ArcRpcError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    return balances[creator_wallet_address.lower()]
+
+
+async def _dashboard_withdrawable_balance(session: AsyncSession, user) -> int | None:
+    """Escrow balance for the dashboard, or None when it cannot be determined; never fails the page."""
+    if not _live_withdraw_enabled() or not getattr(user, "wallet_address", None):
+        return None
+    balance = await get_indexed_creator_balance(session, user.wallet_address)
+    if balance is not None:
+        return balance
     try:
-        return int(result, 16)
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Arc RPC returned invalid value: {result}") from exc
+        return await _get_escrow_creator_balance_minor(user.wallet_address)
+    except (HTTPException, ValueError, RuntimeError):
+        logger.warning("Escrow balance lookup failed for creator %s", user.id, exc_info=True)
+        return None
 
 
 @router.get("/dashboard", response_model=CreatorDashboardResponse)
 async def creator_dashboard(
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_session),
 ) -> CreatorDashboardResponse:
     if not getattr(user, "is_creator", False):
         raise _forbidden()
@@ -116,12 +113,7 @@ async def creator_dashboard(
     )
     content_count = int(content_count_row.scalar() or 0)
 
-    withdrawable_balance: int | None = None
-    if _live_withdraw_enabled() and getattr(user, "wallet_address", None):
-        try:
-            withdrawable_balance = await _get_escrow_creator_balance_minor(user.wallet_address)
-        except Exception:
-            pass
+    withdrawable_balance = await _dashboard_withdrawable_balance(session, user)
 
     result = await session.execute(
         select(Settlement)
@@ -133,26 +125,7 @@ async def creator_dashboard(
     )
     settlements = list(result.scalars().all())
 
-    content_rows = await session.execute(
-        select(Content.id, Content.title, func.coalesce(func.sum(Settlement.amount), 0))
-        .select_from(Content)
-        .join(PaymentChannel, PaymentChannel.content_id == Content.id)
-        .join(Settlement, Settlement.channel_id == PaymentChannel.id)
-        .where(Content.creator_id == user.id)
-        .group_by(Content.id, Content.title)
-        .order_by(desc(func.coalesce(func.sum(Settlement.amount), 0)))
-    )
-    earnings_by_content: list[CreatorContentEarningsItem] = []
-    for content_id, title, gross_sum in content_rows.all():
-        gross_int = int(gross_sum or 0)
-        earnings_by_content.append(
-            CreatorContentEarningsItem(
-                content_id=str(content_id),
-                title=str(title),
-                amount_gross=gross_int,
-                amount_creator=_creator_share(gross_int),
-            )
-        )
+    earnings_by_content = _earnings_items(await get_creator_content_earnings(session, user.id))
 
     total_gross = sum(item.amount_gross for item in earnings_by_content)
     total_creator = sum(item.amount_creator for item in earnings_by_content)
@@ -176,6 +149,7 @@ async def creator_dashboard(
                     amount_gross=gross,
                     amount_creator=_creator_share(gross),
                     tx_hash=s.tx_hash,
+                    state=s.state,
                     created_at=s.created_at,
                 )
             )
@@ -193,41 +167,19 @@ async def creator_dashboard(
 
 @router.get("/content", response_model=list[CreatorContentEarningsItem])
 async def creator_content_earnings(
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[CreatorContentEarningsItem]:
     if not getattr(user, "is_creator", False):
         raise _forbidden()
 
-    rows = await session.execute(
-        select(Content.id, Content.title, func.coalesce(func.sum(Settlement.amount), 0))
-        .select_from(Content)
-        .join(PaymentChannel, PaymentChannel.content_id == Content.id)
-        .join(Settlement, Settlement.channel_id == PaymentChannel.id)
-        .where(Content.creator_id == user.id)
-        .group_by(Content.id, Content.title)
-        .order_by(desc(func.coalesce(func.sum(Settlement.amount), 0)))
-    )
-
-    items: list[CreatorContentEarningsItem] = []
-    for content_id, title, gross_sum in rows.all():
-        gross_int = int(gross_sum or 0)
-        items.append(
-            CreatorContentEarningsItem(
-                content_id=str(content_id),
-                title=str(title),
-                amount_gross=gross_int,
-                amount_creator=_creator_share(gross_int),
-            )
-        )
-
-    return items
+    return _earnings_items(await get_creator_content_earnings(session, user.id))
 
 
 @router.get("/settlements", response_model=list[CreatorSettlementItem])
 async def creator_settlements(
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[CreatorSettlementItem]:
     if not getattr(user, "is_creator", False):
         raise _forbidden()
@@ -261,6 +213,7 @@ async def creator_settlements(
                 amount_gross=gross,
                 amount_creator=_creator_share(gross),
                 tx_hash=s.tx_hash,
+                state=s.state,
                 created_at=s.created_at,
             )
         )
@@ -271,6 +224,7 @@ async def creator_settlements(
 @router.post("/withdraw", response_model=WithdrawResponse)
 async def withdraw_creator(
     user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
     circle: CircleWalletsClient = Depends(get_circle_wallets_client),
 ) -> WithdrawResponse:
     if not getattr(user, "is_creator", False):
@@ -282,7 +236,8 @@ async def withdraw_creator(
 
         creator_balance = None
         if getattr(user, "wallet_address", None):
-            creator_balance = await _get_escrow_creator_balance_minor(user.wallet_address)
+            # Always read the contract: a stale indexed balance would submit a withdraw that reverts.
+            creator_balance = await _get_escrow_creator_balance_minor(user.wallet_address, refresh=True)
             if creator_balance <= 0:
                 raise HTTPException(
                     status_code=400,
@@ -12,6 +12,7 @@ class CreatorSettlementItem(BaseModel):
     amount_gross: int
     amount_creator: int
     tx_hash: str
+    state: str | None = None
     created_at: datetime
 
 
@@ -1,8 +1,29 @@
-from fastapi import APIRouter
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.platform import metrics
+from app.platform.config import settings
 
 router = APIRouter()
 
+_bearer = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> None:
+    # Metrics stay unrouted unless an operator sets METRICS_TOKEN for the scraper.
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.metrics_token):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
 
 @router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def metrics_snapshot() -> dict[str, dict]:
+    return metrics.snapshot()
@@ -1,38 +1,58 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
-import secrets
-from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.features.content.services import sync_stream_credit
+from app.features.payments.services import (
+    TICK_SECONDS,
+    close_channel_row,
+    fold_pending_ticks,
+    lock_channel,
+    pending_channel_events,
+    record_tick,
+    record_tick_degraded,
+    restore_pending_ticks,
+    settle_unpaid_amount,
+)
 from app.features.payments.schemas import (
     ChannelCloseRequest,
     ChannelOpenRequest,
     ChannelResponse,
+    ChannelSocketFrame,
+    ChannelSocketOpen,
     ChannelTickRequest,
     TickResponse,
 )
+from app.platform import metrics
 from app.platform.config import settings
-from app.platform.db.models import Content, PaymentChannel, Settlement, User
-from app.platform.db.session import get_session
-from app.platform.redis import get_redis
-from app.platform.security.auth import get_current_user
-from app.platform.services.chain import ChainClient
-from app.platform.services.circle_wallets import CircleWalletsClient
+from app.platform.db.models import Content, PaymentChannel, User
+from app.platform.db.session import get_session, get_sessionmaker
+from app.platform.security.auth import authenticate_token, get_current_user
+from app.platform.services.circle_wallets import CircleBackpressureError, CircleWalletsClient, get_circle_wallets
 
 
 router = APIRouter(prefix="/payments/channel")
 
+_SOCKETS = metrics.gauge("channel_sockets_open", "Open payment channel WebSocket sessions")
+_SOCKET_FRAMES = metrics.counter("channel_socket_frames_total", "Payment channel WebSocket frames received by type")
+
+# WebSocket close codes: 1008 policy violation (auth/validation), 4404 channel not found or not owned.
+_WS_POLICY_VIOLATION = 1008
+_WS_NOT_FOUND = 4404
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
 def get_circle_wallets_client() -> CircleWalletsClient:
-    return CircleWalletsClient()
+    return get_circle_wallets()
 
 
 def _channel_response(channel: PaymentChannel) -> ChannelResponse:
@@ -54,116 +74,15 @@ def _channel_response(channel: PaymentChannel) -> ChannelResponse:
     )
 
 
-def _live_settlement_enabled() -> bool:
-    return bool(
-        settings.circle_api_key
-        and settings.circle_entity_secret
-        and settings.arc_rpc_url
-        and settings.arc_chain_id is not None
-        and settings.usdc_address
-        and settings.escrow_address
-    )
-
-
-async def _try_acquire_tick_slot(channel_id: str, now: datetime) -> bool:
-    slot = int(now.timestamp()) // 10
-    key = f"tick:{channel_id}:{slot}"
+def _settlement_due(channel: PaymentChannel, *, now: datetime, pending_owed: int) -> bool:
+    if int(channel.total_amount_owed) + pending_owed - int(channel.total_amount_settled) <= 0:
+        return False
+    since = channel.last_settlement_at or channel.opened_at
+    return now - since >= timedelta(seconds=120)
 
-    try:
-        redis = get_redis()
-        return bool(await redis.set(key, "1", ex=12, nx=True))
-    except Exception:
-        return True
-
-
-async def _settle_unpaid_amount(
-    *,
-    session: AsyncSession,
-    circle: CircleWalletsClient,
-    channel: PaymentChannel,
-    content: Content,
-    viewer: User,
-    creator: User,
-    now: datetime,
-    force: bool,
-) -> tuple[bool, str | None, int | None]:
-    if channel.status != "active":
-        return False, None, None
-
-    unpaid = int(channel.total_amount_owed - channel.total_amount_settled)
-    if unpaid <= 0:
-        return False, None, None
-
-    if not force:
-        if channel.last_settlement_at is not None:
-            if now - channel.last_settlement_at < timedelta(seconds=120):
-                return False, None, None
-        else:
-            if now - channel.opened_at < timedelta(seconds=120):
-                return False, None, None
-
-    tx_id: str
-    if _live_settlement_enabled():
-        if not viewer.circle_wallet_id or not viewer.wallet_address:
-            raise HTTPException(status_code=400, detail="User wallet not available")
-        if not creator.wallet_address:
-            raise HTTPException(status_code=400, detail="Creator wallet not available")
-
-        chain = ChainClient.from_settings()
-
-        nonce = "0x" + secrets.token_hex(32)
-        valid_after = int(now.timestamp()) - 5
-        valid_before = int((now + timedelta(minutes=5)).timestamp())
-
-        typed_data = chain.erc3009_receive_with_authorization_typed_data(
-            from_address=viewer.wallet_address,
-            to_address=chain.config.escrow_address,
-            value=unpaid,
-            valid_after=valid_after,
-            valid_before=valid_before,
-            nonce=nonce,
-        )
 
-        signature = await circle.sign_typed_data(
-            wallet_id=viewer.circle_wallet_id,
-            blockchain=settings.circle_blockchain,
-            typed_data=typed_data,
-            memo=f"musetub:settle:{channel.id}",
-        )
-
-        tx_id = await circle.create_contract_execution_transaction(
-            wallet_id=viewer.circle_wallet_id,
-            blockchain=settings.circle_blockchain,
-            contract_address=chain.config.escrow_address,
-            abi_function_signature="streamWithAuthorization(address,address,uint256,uint256,uint256,bytes32,bytes)",
-            abi_parameters=[
-                viewer.wallet_address,
-                creator.wallet_address,
-                unpaid,
-                valid_after,
-                valid_before,
-                nonce,
-                signature,
-            ],
-            ref_id=f"channel:{channel.id}",
-        )
-    else:
-        tx_id = f"simulated:{uuid4()}"
-
-    session.add(Settlement(channel_id=channel.id, amount=unpaid, tx_hash=tx_id))
-    channel.total_amount_settled += unpaid
-    channel.last_settlement_at = now
-
-    return True, tx_id, unpaid
-
-
-@router.post("/open", response_model=ChannelResponse)
-async def open_channel(
-    body: ChannelOpenRequest,
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
-) -> ChannelResponse:
-    result = await session.execute(select(Content).where(Content.id == body.content_id))
+async def _open_channel(*, session: AsyncSession, user: User, content_id: str) -> ChannelResponse:
+    result = await session.execute(select(Content).where(Content.id == content_id))
     content = result.scalar_one_or_none()
     if content is None:
         raise HTTPException(status_code=404, detail="Not found")
@@ -181,17 +100,13 @@ async def open_channel(
     return _channel_response(channel)
 
 
-@router.post("/tick", response_model=TickResponse)
-async def tick_channel(
-    body: ChannelTickRequest,
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
-    circle: CircleWalletsClient = Depends(get_circle_wallets_client),
+async def _tick_channel(
+    *, session: AsyncSession, circle: CircleWalletsClient, user: User, channel_id: str
 ) -> TickResponse:
     now = _utcnow()
 
     result = await session.execute(
-        select(PaymentChannel).where(PaymentChannel.id == body.channel_id, PaymentChannel.user_id == user.id).with_for_update()
+        select(PaymentChannel).where(PaymentChannel.id == channel_id, PaymentChannel.user_id == user.id)
     )
     channel = result.scalar_one_or_none()
     if channel is None:
@@ -199,39 +114,71 @@ async def tick_channel(
     if channel.status != "active":
         raise HTTPException(status_code=400, detail="Channel is not active")
 
-    ok = await _try_acquire_tick_slot(channel.id, now)
-    if not ok:
-        await session.refresh(channel)
-        base = _channel_response(channel)
-        return TickResponse(**base.model_dump(), tick_seconds=0, did_settle=False, settlement_tx_id=None, settlement_amount=None)
+    # Slot dedup and counter update happen in one Redis script (or, when Redis is down, one insert into
+    # channel_events); the channel row is only locked when a settlement is due.
+    tick = await record_tick(channel=channel, now=now)
+    if tick is None:
+        counted = await record_tick_degraded(session=session, channel=channel, now=now)
+        pending_seconds = pending_owed = 0
+    else:
+        counted = tick.counted
+        pending_seconds, pending_owed = tick.pending_seconds, tick.pending_owed
+    tick_seconds = TICK_SECONDS if counted else 0
 
-    tick_seconds = 10
-    channel.total_seconds_streamed += tick_seconds
-    channel.total_amount_owed += int(channel.price_per_second_locked) * tick_seconds
-    channel.last_tick_at = now
+    logged = await pending_channel_events(session, channel.id)
+    pending_seconds += logged.seconds
+    pending_owed += logged.owed
 
-    content_row = await session.execute(select(Content).where(Content.id == channel.content_id))
-    content = content_row.scalar_one_or_none()
-    if content is None:
-        raise HTTPException(status_code=404, detail="Not found")
+    if not _settlement_due(channel, now=now, pending_owed=pending_owed):
+        await session.commit()
+        ticked_at = [t for t in (channel.last_tick_at, logged.last_tick_at, now if counted else None) if t is not None]
+        base = _channel_response(channel)
+        return TickResponse(
+            **base.model_copy(
+                update={
+                    "total_seconds_streamed": channel.total_seconds_streamed + pending_seconds,
+                    "total_amount_owed": channel.total_amount_owed + pending_owed,
+                    "last_tick_at": max(ticked_at, default=None),
+                }
+            ).model_dump(),
+            tick_seconds=tick_seconds,
+            did_settle=False,
+            settlement_tx_id=None,
+            settlement_amount=None,
+        )
 
-    creator_row = await session.execute(select(User).where(User.id == content.creator_id))
-    creator = creator_row.scalar_one_or_none()
-    if creator is None:
-        raise HTTPException(status_code=404, detail="Not found")
+    channel = (await session.execute(lock_channel(channel.id))).scalar_one()
+    if channel.status != "active":
+        raise HTTPException(status_code=400, detail="Channel is not active")
 
-    did_settle, tx_id, settled_amount = await _settle_unpaid_amount(
-        session=session,
-        circle=circle,
-        channel=channel,
-        content=content,
-        viewer=user,
-        creator=creator,
-        now=now,
-        force=False,
-    )
+    folded = await fold_pending_ticks(session, channel)
+    try:
+        content_row = await session.execute(select(Content).where(Content.id == channel.content_id))
+        content = content_row.scalar_one_or_none()
+        if content is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        creator_row = await session.execute(select(User).where(User.id == content.creator_id))
+        creator = creator_row.scalar_one_or_none()
+        if creator is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        did_settle, tx_id, settled_amount = await settle_unpaid_amount(
+            session=session,
+            circle=circle,
+            channel=channel,
+            content=content,
+            viewer=user,
+            creator=creator,
+            now=now,
+            force=False,
+        )
 
-    await session.commit()
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        await restore_pending_ticks(channel.id, folded)
+        raise
     await session.refresh(channel)
 
     base = _channel_response(channel)
@@ -244,49 +191,54 @@ async def tick_channel(
     )
 
 
-@router.post("/close", response_model=TickResponse)
-async def close_channel(
-    body: ChannelCloseRequest,
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
-    circle: CircleWalletsClient = Depends(get_circle_wallets_client),
+async def _close_channel(
+    *, session: AsyncSession, circle: CircleWalletsClient, user: User, channel_id: str
 ) -> TickResponse:
     now = _utcnow()
 
-    result = await session.execute(
-        select(PaymentChannel).where(PaymentChannel.id == body.channel_id, PaymentChannel.user_id == user.id).with_for_update()
+    # Fold Redis-held stream usage into the channel first; the credit row is locked before the channel row.
+    content_id_row = await session.execute(
+        select(PaymentChannel.content_id).where(PaymentChannel.id == channel_id, PaymentChannel.user_id == user.id)
     )
-    channel = result.scalar_one_or_none()
-    if channel is None:
+    content_id = content_id_row.scalar_one_or_none()
+    if content_id is None:
         raise HTTPException(status_code=404, detail="Not found")
+    await sync_stream_credit(session=session, user_id=user.id, content_id=str(content_id))
+
+    channel = (await session.execute(lock_channel(channel_id))).scalar_one()
     if channel.status != "active":
         raise HTTPException(status_code=400, detail="Channel is not active")
 
-    content_row = await session.execute(select(Content).where(Content.id == channel.content_id))
-    content = content_row.scalar_one_or_none()
-    if content is None:
-        raise HTTPException(status_code=404, detail="Not found")
-
-    creator_row = await session.execute(select(User).where(User.id == content.creator_id))
-    creator = creator_row.scalar_one_or_none()
-    if creator is None:
-        raise HTTPException(status_code=404, detail="Not found")
-
-    did_settle, tx_id, settled_amount = await _settle_unpaid_amount(
-        session=session,
-        circle=circle,
-        channel=channel,
-        content=content,
-        viewer=user,
-        creator=creator,
-        now=now,
-        force=True,
-    )
+    folded = await fold_pending_ticks(session, channel)
+    try:
+        content_row = await session.execute(select(Content).where(Content.id == channel.content_id))
+        content = content_row.scalar_one_or_none()
+        if content is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        creator_row = await session.execute(select(User).where(User.id == content.creator_id))
+        creator = creator_row.scalar_one_or_none()
+        if creator is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        did_settle, tx_id, settled_amount = await settle_unpaid_amount(
+            session=session,
+            circle=circle,
+            channel=channel,
+            content=content,
+            viewer=user,
+            creator=creator,
+            now=now,
+            force=True,
+        )
 
-    channel.status = "closed"
-    channel.closed_at = now
+        close_channel_row(session, channel, now=now)
 
-    await session.commit()
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        await restore_pending_ticks(channel.id, folded)
+        raise
     await session.refresh(channel)
 
     base = _channel_response(channel)
@@ -297,3 +249,133 @@ async def close_channel(
         settlement_tx_id=tx_id,
         settlement_amount=settled_amount,
     )
+
+
+@router.post("/open", response_model=ChannelResponse)
+async def open_channel(
+    body: ChannelOpenRequest,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> ChannelResponse:
+    return await _open_channel(session=session, user=user, content_id=body.content_id)
+
+
+@router.post("/tick", response_model=TickResponse)
+async def tick_channel(
+    body: ChannelTickRequest,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    circle: CircleWalletsClient = Depends(get_circle_wallets_client),
+) -> TickResponse:
+    return await _tick_channel(session=session, circle=circle, user=user, channel_id=body.channel_id)
+
+
+@router.post("/close", response_model=TickResponse)
+async def close_channel(
+    body: ChannelCloseRequest,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    circle: CircleWalletsClient = Depends(get_circle_wallets_client),
+) -> TickResponse:
+    return await _close_channel(session=session, circle=circle, user=user, channel_id=body.channel_id)
+
+
+async def _send_tick(websocket: WebSocket, frame_type: str, tick: TickResponse) -> None:
+    await websocket.send_json({"type": frame_type, **tick.model_dump(mode="json")})
+    if tick.did_settle:
+        await websocket.send_json(
+            {
+                "type": "settlement",
+                "channel_id": tick.id,
+                "settlement_tx_id": tick.settlement_tx_id,
+                "settlement_amount": tick.settlement_amount,
+                "total_amount_settled": tick.total_amount_settled,
+            }
+        )
+
+
+@router.websocket("/ws")
+async def channel_socket(
+    websocket: WebSocket,
+    circle: CircleWalletsClient = Depends(get_circle_wallets_client),
+) -> None:
+    """Authenticates once, then treats each {"type": "tick"} frame as a channel tick.
+
+    The first frame must be {"type": "open", "token": ..., "content_id" | "channel_id": ...}; a new
+    channel is opened for content_id, an existing active one is attached to for channel_id.
+    """
+    await websocket.accept()
+    _SOCKETS.inc()
+    try:
+        try:
+            opening = ChannelSocketOpen.model_validate(
+                await asyncio.wait_for(websocket.receive_json(), timeout=settings.channel_socket_idle_timeout_seconds)
+            )
+        except (ValidationError, ValueError, asyncio.TimeoutError):
+            await websocket.close(code=_WS_POLICY_VIOLATION)
+            return
+
+        try:
+            async with get_sessionmaker()() as session:
+                user = await authenticate_token(session, opening.token)
+                if opening.channel_id:
+                    result = await session.execute(
+                        select(PaymentChannel).where(
+                            PaymentChannel.id == opening.channel_id,
+                            PaymentChannel.user_id == user.id,
+                            PaymentChannel.status == "active",
+                        )
+                    )
+                    channel = result.scalar_one_or_none()
+                    if channel is None:
+                        raise HTTPException(status_code=404, detail="Not found")
+                    opened = _channel_response(channel)
+                elif opening.content_id:
+                    opened = await _open_channel(session=session, user=user, content_id=opening.content_id)
+                else:
+                    raise HTTPException(status_code=400, detail="content_id or channel_id required")
+                await session.commit()
+        except HTTPException as exc:
+            await websocket.close(code=_WS_NOT_FOUND if exc.status_code == 404 else _WS_POLICY_VIOLATION)
+            return
+
+        await websocket.send_json({"type": "channel", **opened.model_dump(mode="json")})
+
+        while True:
+            try:
+                frame = ChannelSocketFrame.model_validate(
+                    await asyncio.wait_for(websocket.receive_json(), timeout=settings.channel_socket_idle_timeout_seconds)
+                )
+            except asyncio.TimeoutError:
+                await websocket.close()
+                return
+            except (ValidationError, ValueError):
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Invalid frame"})
+                continue
+
+            _SOCKET_FRAMES.inc(type=frame.type)
+            try:
+                async with get_sessionmaker()() as session:
+                    if frame.type == "tick":
+                        tick = await _tick_channel(session=session, circle=circle, user=user, channel_id=opened.id)
+                    else:
+                        tick = await _close_channel(session=session, circle=circle, user=user, channel_id=opened.id)
+            except HTTPException as exc:
+                await websocket.send_json({"type": "error", "status": exc.status_code, "detail": exc.detail})
+                if exc.status_code in (400, 404):
+                    await websocket.close()
+                    return
+                continue
+            except CircleBackpressureError:
+                await websocket.send_json({"type": "error", "status": 503, "detail": "Payment signer busy, retry shortly"})
+                continue
+
+            if frame.type == "close":
+                await _send_tick(websocket, "closed", tick)
+                await websocket.close()
+                return
+            await _send_tick(websocket, "tick", tick)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _SOCKETS.dec()
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from typing import Literal
+
 from pydantic import BaseModel
 
 
@@ -15,6 +17,17 @@ class ChannelCloseRequest(BaseModel):
     channel_id: str
 
 
+class ChannelSocketOpen(BaseModel):
+    type: Literal["open"]
+    token: str
+    content_id: str | None = None
+    channel_id: str | None = None
+
+
+class ChannelSocketFrame(BaseModel):
+    type: Literal["tick", "close"]
+
+
 class ChannelResponse(BaseModel):
     id: str
     user_id: str
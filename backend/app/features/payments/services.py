@@ -0,0 +1,538 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import secrets
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import ChannelEvent, Content, PaymentChannel, User
+from app.platform.db.session import get_sessionmaker
+from app.platform.redis import get_redis
+from app.platform.services.chain import ChainClient
+from app.platform.services.circle_wallets import CircleWalletsClient, circle_signing_enabled, get_circle_wallets
+from app.platform.services.earnings import record_settlement_earnings
+from app.platform.services.settlements import new_settlement
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 10
+
+# Ticks are deduplicated per 10s slot and accumulated per channel in Redis:
+#   tick:{channel_id}:{slot}   - SET NX marker for the slot
+#   channel_ticks:{channel_id} - hash of seconds/owed/last_tick not yet folded into payment_channels
+# The flusher drains those accumulators into channel_events with plain inserts; the row's counters are a
+# snapshot that channel_events rows with compacted = false are added on top of. Events are folded into the
+# snapshot under the row lock when a settlement is due, on close, by the sweeper and by the flusher's
+# compaction pass. Row locks here are FOR NO KEY UPDATE so they never block the FK check of an event insert.
+_DIRTY_SET_KEY = "channel_ticks:dirty"
+
+_TICK_SCRIPT = """
+if not redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1]) then
+    return {0, tonumber(redis.call('HGET', KEYS[2], 'seconds') or '0'), tonumber(redis.call('HGET', KEYS[2], 'owed') or '0')}
+end
+local seconds = redis.call('HINCRBY', KEYS[2], 'seconds', ARGV[2])
+local owed = redis.call('HINCRBY', KEYS[2], 'owed', ARGV[3])
+redis.call('HSET', KEYS[2], 'last_tick', ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+redis.call('SADD', KEYS[3], ARGV[6])
+return {1, seconds, owed}
+"""
+
+_TAKE_SCRIPT = """
+local values = redis.call('HMGET', KEYS[1], 'seconds', 'owed', 'last_tick')
+redis.call('DEL', KEYS[1])
+return {tonumber(values[1] or '0'), tonumber(values[2] or '0'), tonumber(values[3] or '0')}
+"""
+
+_RESTORE_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], 'seconds', ARGV[1])
+redis.call('HINCRBY', KEYS[1], 'owed', ARGV[2])
+if tonumber(redis.call('HGET', KEYS[1], 'last_tick') or '0') < tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'last_tick', ARGV[3])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SADD', KEYS[2], ARGV[5])
+return 1
+"""
+
+_SWEPT = metrics.counter("channel_sweeper_channels_total", "Idle channels handled by the sweeper by outcome")
+_SWEEP_BACKLOG = metrics.gauge("channel_sweeper_backlog", "Idle active channels found by the last sweeper pass")
+_TICKS = metrics.counter("channel_ticks_total", "Channel ticks by accounting path and outcome")
+_DEGRADED = metrics.gauge("channel_tick_degraded", "1 while channel ticks are falling back to Postgres dedup")
+
+_scripts: dict[str, object] = {}
+
+
+def _script(name: str, source: str):
+    redis = get_redis()
+    cached = _scripts.get(name)
+    if cached is None or getattr(cached, "registered_client", None) is not redis:
+        cached = redis.register_script(source)
+        _scripts[name] = cached
+    return cached
+
+
+def _tick_slot(now: datetime) -> int:
+    return int(now.timestamp()) // TICK_SECONDS
+
+
+def _accumulator_key(channel_id: str) -> str:
+    return f"channel_ticks:{channel_id}"
+
+
+@dataclass(frozen=True)
+class TickResult:
+    counted: bool
+    pending_seconds: int
+    pending_owed: int
+
+
+@dataclass(frozen=True)
+class PendingTicks:
+    seconds: int
+    owed: int
+    last_tick_at: datetime | None
+
+
+async def record_tick(*, channel: PaymentChannel, now: datetime) -> TickResult | None:
+    """Dedup and accumulate one tick in Redis; returns None when Redis is unavailable."""
+    amount = int(channel.price_per_second_locked) * TICK_SECONDS
+    try:
+        counted, seconds, owed = await _script("tick", _TICK_SCRIPT)(
+            keys=[f"tick:{channel.id}:{_tick_slot(now)}", _accumulator_key(channel.id), _DIRTY_SET_KEY],
+            args=[
+                TICK_SECONDS + 2,
+                TICK_SECONDS,
+                amount,
+                int(now.timestamp()),
+                settings.channel_tick_accumulator_ttl_seconds,
+                channel.id,
+            ],
+        )
+    except Exception:
+        logger.warning("Redis tick dedup unavailable, using Postgres slot check", exc_info=True)
+        _DEGRADED.set(1)
+        return None
+
+    _DEGRADED.set(0)
+    result = TickResult(counted=bool(int(counted)), pending_seconds=int(seconds), pending_owed=int(owed))
+    _TICKS.inc(path="redis", outcome="counted" if result.counted else "duplicate")
+    return result
+
+
+async def record_tick_degraded(*, session: AsyncSession, channel: PaymentChannel, now: datetime) -> bool:
+    """Postgres fallback: the unique (channel_id, tick_slot) index allows at most one tick per slot."""
+    result = await session.execute(
+        pg_insert(ChannelEvent)
+        .values(
+            channel_id=channel.id,
+            kind="tick",
+            tick_slot=_tick_slot(now),
+            seconds=TICK_SECONDS,
+            amount=int(channel.price_per_second_locked) * TICK_SECONDS,
+            created_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["channel_id", "tick_slot"], index_where=ChannelEvent.tick_slot.is_not(None))
+        .returning(ChannelEvent.id)
+    )
+    counted = result.first() is not None
+    _TICKS.inc(path="degraded", outcome="counted" if counted else "duplicate")
+    return counted
+
+
+async def pending_channel_events(session: AsyncSession, channel_id: str) -> PendingTicks:
+    result = await session.execute(
+        select(
+            func.coalesce(func.sum(ChannelEvent.seconds), 0),
+            func.coalesce(func.sum(ChannelEvent.amount), 0),
+            func.max(ChannelEvent.created_at),
+        ).where(ChannelEvent.channel_id == channel_id, ChannelEvent.kind == "tick", ChannelEvent.compacted.is_(False))
+    )
+    seconds, owed, last_tick_at = result.one()
+    return PendingTicks(seconds=int(seconds), owed=int(owed), last_tick_at=last_tick_at)
+
+
+async def _compact_channel_events(session: AsyncSession, channel: PaymentChannel) -> None:
+    result = await session.execute(
+        update(ChannelEvent)
+        .where(ChannelEvent.channel_id == channel.id, ChannelEvent.compacted.is_(False))
+        .values(compacted=True)
+        .returning(ChannelEvent.kind, ChannelEvent.seconds, ChannelEvent.amount, ChannelEvent.created_at)
+    )
+    seconds = owed = 0
+    last_tick_at = None
+    for kind, event_seconds, amount, created_at in result.all():
+        if kind != "tick":
+            continue
+        seconds += int(event_seconds)
+        owed += int(amount)
+        if last_tick_at is None or created_at > last_tick_at:
+            last_tick_at = created_at
+    if seconds or owed:
+        _apply_pending(channel, PendingTicks(seconds=seconds, owed=owed, last_tick_at=last_tick_at))
+
+
+def close_channel_row(session: AsyncSession, channel: PaymentChannel, *, now: datetime) -> None:
+    channel.status = "closed"
+    channel.closed_at = now
+    session.add(ChannelEvent(channel_id=channel.id, kind="close", compacted=True, created_at=now))
+
+
+def _live_settlement_enabled() -> bool:
+    return bool(
+        circle_signing_enabled()
+        and settings.arc_rpc_url
+        and settings.arc_chain_id is not None
+        and settings.usdc_address
+        and settings.escrow_address
+    )
+
+
+async def settle_unpaid_amount(
+    *,
+    session: AsyncSession,
+    circle: CircleWalletsClient,
+    channel: PaymentChannel,
+    content: Content,
+    viewer: User,
+    creator: User,
+    now: datetime,
+    force: bool,
+) -> tuple[bool, str | None, int | None]:
+    if channel.status != "active":
+        return False, None, None
+
+    unpaid = int(channel.total_amount_owed - channel.total_amount_settled)
+    if unpaid <= 0:
+        return False, None, None
+
+    if not force:
+        if channel.last_settlement_at is not None:
+            if now - channel.last_settlement_at < timedelta(seconds=120):
+                return False, None, None
+        else:
+            if now - channel.opened_at < timedelta(seconds=120):
+                return False, None, None
+
+    tx_id: str
+    if _live_settlement_enabled():
+        if not viewer.circle_wallet_id or not viewer.wallet_address:
+            raise HTTPException(status_code=400, detail="User wallet not available")
+        if not creator.wallet_address:
+            raise HTTPException(status_code=400, detail="Creator wallet not available")
+
+        chain = ChainClient.from_settings()
+
+        nonce = "0x" + secrets.token_hex(32)
+        valid_after = int(now.timestamp()) - 5
+        valid_before = int((now + timedelta(minutes=5)).timestamp())
+
+        typed_data = chain.erc3009_receive_with_authorization_typed_data(
+            from_address=viewer.wallet_address,
+            to_address=chain.config.escrow_address,
+            value=unpaid,
+            valid_after=valid_after,
+            valid_before=valid_before,
+            nonce=nonce,
+        )
+
+        signature = await circle.sign_typed_data(
+            wallet_id=viewer.circle_wallet_id,
+            blockchain=settings.circle_blockchain,
+            typed_data=typed_data,
+            memo=f"musetub:settle:{channel.id}",
+        )
+
+        tx_id = await circle.create_contract_execution_transaction(
+            wallet_id=viewer.circle_wallet_id,
+            blockchain=settings.circle_blockchain,
+            contract_address=chain.config.escrow_address,
+            abi_function_signature="streamWithAuthorization(address,address,uint256,uint256,uint256,bytes32,bytes)",
+            abi_parameters=[
+                viewer.wallet_address,
+                creator.wallet_address,
+                unpaid,
+                valid_after,
+                valid_before,
+                nonce,
+                signature,
+            ],
+            ref_id=f"channel:{channel.id}",
+        )
+    else:
+        tx_id = f"simulated:{uuid4()}"
+
+    session.add(new_settlement(channel_id=channel.id, amount=unpaid, tx_id=tx_id, now=now))
+    await record_settlement_earnings(session, content_id=channel.content_id, amount=unpaid)
+    session.add(ChannelEvent(channel_id=channel.id, kind="settlement", amount=unpaid, compacted=True, created_at=now))
+    channel.total_amount_settled += unpaid
+    channel.last_settlement_at = now
+
+    return True, tx_id, unpaid
+
+
+async def _take_pending(channel_id: str) -> PendingTicks:
+    seconds, owed, last_tick = await _script("take", _TAKE_SCRIPT)(keys=[_accumulator_key(channel_id)], args=[])
+    last_tick_at = datetime.fromtimestamp(int(last_tick), tz=timezone.utc) if int(last_tick) else None
+    return PendingTicks(seconds=int(seconds), owed=int(owed), last_tick_at=last_tick_at)
+
+
+async def _restore_pending(channel_id: str, pending: PendingTicks) -> None:
+    last_tick = int(pending.last_tick_at.timestamp()) if pending.last_tick_at else 0
+    try:
+        await _script("restore", _RESTORE_SCRIPT)(
+            keys=[_accumulator_key(channel_id), _DIRTY_SET_KEY],
+            args=[pending.seconds, pending.owed, last_tick, settings.channel_tick_accumulator_ttl_seconds, channel_id],
+        )
+    except Exception:
+        logger.error("Lost %s pending tick seconds for channel %s", pending.seconds, channel_id, exc_info=True)
+
+
+def _apply_pending(channel: PaymentChannel, pending: PendingTicks) -> None:
+    channel.total_seconds_streamed = int(channel.total_seconds_streamed) + pending.seconds
+    channel.total_amount_owed = int(channel.total_amount_owed) + pending.owed
+    if pending.last_tick_at is not None:
+        if channel.last_tick_at is None or pending.last_tick_at > channel.last_tick_at:
+            channel.last_tick_at = pending.last_tick_at
+
+
+async def fold_pending_ticks(session: AsyncSession, channel: PaymentChannel) -> PendingTicks | None:
+    """Fold logged events and Redis-held ticks into a channel the caller has locked.
+
+    Returns what was taken from Redis so the caller can restore it if its transaction fails.
+    """
+    await _compact_channel_events(session, channel)
+    try:
+        pending = await _take_pending(channel.id)
+    except Exception:
+        logger.warning("Redis tick fold unavailable for channel %s", channel.id, exc_info=True)
+        return None
+    if pending.seconds <= 0 and pending.owed <= 0:
+        return None
+    _apply_pending(channel, pending)
+    return pending
+
+
+def lock_channel(channel_id: str):
+    return (
+        select(PaymentChannel)
+        .where(PaymentChannel.id == channel_id)
+        .with_for_update(key_share=True)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def restore_pending_ticks(channel_id: str, pending: PendingTicks | None) -> None:
+    if pending is not None:
+        await _restore_pending(channel_id, pending)
+
+
+async def flush_pending_ticks(*, session: AsyncSession, limit: int) -> int:
+    members = await get_redis().spop(_DIRTY_SET_KEY, limit)
+    if not members:
+        return 0
+
+    # Hold the row locks close takes until the events commit: a close either finishes first and is skipped
+    # here, or waits and compacts these events, so no tick is logged against a channel after it closed.
+    result = await session.execute(
+        select(PaymentChannel.id)
+        .where(PaymentChannel.id.in_(set(members)), PaymentChannel.status == "active")
+        .order_by(PaymentChannel.id)
+        .with_for_update(key_share=True)
+    )
+    active = {str(channel_id) for channel_id in result.scalars().all()}
+
+    taken: list[tuple[str, PendingTicks]] = []
+    try:
+        for channel_id in sorted(set(members)):
+            pending = await _take_pending(channel_id)
+            if pending.seconds <= 0 and pending.owed <= 0:
+                continue
+            if channel_id not in active:
+                logger.warning("Dropping %s pending tick seconds for inactive channel %s", pending.seconds, channel_id)
+                continue
+            taken.append((channel_id, pending))
+            session.add(
+                ChannelEvent(
+                    channel_id=channel_id,
+                    kind="tick",
+                    seconds=pending.seconds,
+                    amount=pending.owed,
+                    created_at=pending.last_tick_at or datetime.now(timezone.utc),
+                )
+            )
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        for channel_id, pending in taken:
+            await _restore_pending(channel_id, pending)
+        raise
+
+    return len(members)
+
+
+async def compact_channel_events(*, session: AsyncSession, limit: int) -> int:
+    result = await session.execute(
+        select(ChannelEvent.channel_id).where(ChannelEvent.compacted.is_(False)).distinct().limit(limit)
+    )
+    channel_ids = sorted(str(channel_id) for channel_id in result.scalars().all())
+    if not channel_ids:
+        return 0
+
+    locked = await session.execute(
+        select(PaymentChannel)
+        .where(PaymentChannel.id.in_(channel_ids))
+        .order_by(PaymentChannel.id)
+        .with_for_update(key_share=True, skip_locked=True)
+        .execution_options(populate_existing=True)
+    )
+    for channel in locked.scalars().all():
+        await _compact_channel_events(session, channel)
+    await session.commit()
+    return len(channel_ids)
+
+
+class ChannelTickFlusher(PeriodicWorker):
+    name = "channel_tick_flusher"
+
+    def interval_seconds(self) -> float:
+        return settings.channel_tick_flush_interval_seconds
+
+    async def run_once(self) -> bool:
+        batch_size = settings.channel_tick_flush_batch_size
+        async with get_sessionmaker()() as session:
+            flushed = await flush_pending_ticks(session=session, limit=batch_size)
+        async with get_sessionmaker()() as session:
+            compacted = await compact_channel_events(session=session, limit=batch_size)
+        return flushed >= batch_size or compacted >= batch_size
+
+
+def _idle_since():
+    return func.coalesce(PaymentChannel.last_tick_at, PaymentChannel.opened_at)
+
+
+async def _sweep_channel(*, circle: CircleWalletsClient, channel_id: str, idle_before: datetime) -> str:
+    async with get_sessionmaker()() as session:
+        result = await session.execute(
+            select(PaymentChannel)
+            .where(PaymentChannel.id == channel_id, PaymentChannel.status == "active")
+            .with_for_update(key_share=True, skip_locked=True)
+        )
+        channel = result.scalar_one_or_none()
+        if channel is None:
+            return "skipped"
+
+        folded = await fold_pending_ticks(session, channel)
+        try:
+            if (channel.last_tick_at or channel.opened_at) >= idle_before:
+                await session.commit()
+                return "skipped"
+
+            content = await session.get(Content, channel.content_id)
+            viewer = await session.get(User, channel.user_id)
+            creator = await session.get(User, content.creator_id) if content is not None else None
+
+            # Prepaid purchases are already counted in total_amount_settled, so this only charges
+            # what the channel owes beyond them.
+            now = datetime.now(timezone.utc)
+            did_settle = False
+            if content is not None and viewer is not None and creator is not None:
+                did_settle, _, _ = await settle_unpaid_amount(
+                    session=session,
+                    circle=circle,
+                    channel=channel,
+                    content=content,
+                    viewer=viewer,
+                    creator=creator,
+                    now=now,
+                    force=True,
+                )
+
+            close_channel_row(session, channel, now=now)
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            await restore_pending_ticks(channel_id, folded)
+            raise
+
+    return "settled" if did_settle else "closed"
+
+
+async def sweep_idle_channels(*, circle: CircleWalletsClient, now: datetime, limit: int) -> int:
+    idle_before = now - timedelta(seconds=settings.channel_idle_timeout_seconds)
+    async with get_sessionmaker()() as session:
+        result = await session.execute(
+            select(PaymentChannel.id)
+            .where(PaymentChannel.status == "active", _idle_since() < idle_before)
+            .order_by(_idle_since())
+            .limit(limit)
+        )
+        channel_ids = [str(channel_id) for channel_id in result.scalars().all()]
+    _SWEEP_BACKLOG.set(len(channel_ids))
+
+    semaphore = asyncio.Semaphore(max(1, settings.channel_sweep_concurrency))
+
+    async def _run(channel_id: str) -> str:
+        async with semaphore:
+            try:
+                outcome = await _sweep_channel(circle=circle, channel_id=channel_id, idle_before=idle_before)
+            except Exception:
+                logger.warning("Failed to sweep idle channel %s", channel_id, exc_info=True)
+                outcome = "failed"
+        _SWEPT.inc(outcome=outcome)
+        return outcome
+
+    outcomes = await asyncio.gather(*(_run(channel_id) for channel_id in channel_ids))
+    return sum(1 for outcome in outcomes if outcome in ("closed", "settled"))
+
+
+class ChannelSweeper(PeriodicWorker):
+    name = "channel_sweeper"
+
+    def __init__(self, circle: CircleWalletsClient | None = None) -> None:
+        super().__init__()
+        self._circle = circle
+
+    def enabled(self) -> bool:
+        return settings.channel_idle_timeout_seconds > 0
+
+    def interval_seconds(self) -> float:
+        return settings.channel_sweep_interval_seconds
+
+    async def run_once(self) -> bool:
+        swept = await sweep_idle_channels(
+            circle=self._circle or get_circle_wallets(),
+            now=datetime.now(timezone.utc),
+            limit=settings.channel_sweep_batch_size,
+        )
+        return swept >= settings.channel_sweep_batch_size
+
+
+_flusher: ChannelTickFlusher | None = None
+
+
+def get_channel_tick_flusher() -> ChannelTickFlusher:
+    global _flusher
+    if _flusher is None:
+        _flusher = ChannelTickFlusher()
+    return _flusher
+
+
+_sweeper: ChannelSweeper | None = None
+
+
+def get_channel_sweeper() -> ChannelSweeper:
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = ChannelSweeper()
+    return _sweeper
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.features.auth.schemas import MeResponse
 from app.features.users.schemas import UserHistoryItem, UserSpendingResponse
 from app.platform.db.models import Content, PaymentChannel
-from app.platform.db.session import get_session
+from app.platform.db.replica import get_current_reader, get_read_session
 from app.platform.security import get_current_user
 
 router = APIRouter(prefix="/users")
@@ -24,8 +24,8 @@ async def me(user=Depends(get_current_user)) -> MeResponse:
 
 @router.get("/me/history", response_model=list[UserHistoryItem])
 async def my_history(
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[UserHistoryItem]:
     result = await session.execute(
         select(
@@ -64,8 +64,8 @@ async def my_history(
 
 @router.get("/me/spending", response_model=UserSpendingResponse)
 async def my_spending(
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_reader),
+    session: AsyncSession = Depends(get_read_session),
 ) -> UserSpendingResponse:
     result = await session.execute(
         select(
@@ -1,61 +1,30 @@
 from __future__ import annotations
 
-from Crypto.Hash import keccak
 from fastapi import APIRouter, Depends, HTTPException
-import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.features.wallets.schemas import ArcBlockHeightResponse
+from app.features.wallets.schemas import BulkBalancesRequest
+from app.features.wallets.schemas import BulkBalancesResponse
 from app.features.wallets.schemas import CircleTransactionResponse
 from app.features.wallets.schemas import FundTestnetResponse
 from app.features.wallets.schemas import UsdcBalanceResponse
+from app.features.wallets.schemas import WalletBalanceItem
 from app.platform.config import settings
+from app.platform.db.models import Content, PaymentChannel, Settlement
+from app.platform.db.session import get_session
 from app.platform.security import get_current_user
-from app.platform.services.circle_wallets import CircleWalletsClient
-from app.platform.services.chain import usdc_minor_units_to_decimal
+from app.platform.services.balances import read_escrow_creator_balances, read_usdc_balances
+from app.platform.services.block_height import get_block_height_tracker
+from app.platform.services.circle_wallets import CircleWalletsClient, circle_signing_enabled, get_circle_wallets
+from app.platform.services.chain import abi_encode_address, usdc_minor_units_to_decimal
 
 router = APIRouter(prefix="/wallets")
 
 
 def get_circle_wallets_client() -> CircleWalletsClient:
-    return CircleWalletsClient()
-
-
-async def _arc_rpc(method: str, params: list) -> dict:
-    if not settings.arc_rpc_url:
-        raise RuntimeError("ARC RPC not configured")
-
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params,
-    }
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.post(settings.arc_rpc_url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-
-    if isinstance(data, dict) and data.get("error"):
-        raise RuntimeError(f"ARC RPC error: {data['error']}")
-
-    if not isinstance(data, dict) or "result" not in data:
-        raise RuntimeError("ARC RPC returned no result")
-
-    return data
-
-
-def _erc20_balance_of_calldata(address: str) -> str:
-    if not isinstance(address, str) or not address.startswith("0x") or len(address) != 42:
-        raise ValueError("Invalid address")
-
-    k = keccak.new(digest_bits=256)
-    k.update(b"balanceOf(address)")
-    selector = k.digest()[:4].hex()
-
-    addr_hex = address[2:].lower()
-    padded = ("0" * 24) + addr_hex
-    return "0x" + selector + padded
+    return get_circle_wallets()
 
 
 @router.post("/fund-testnet", response_model=FundTestnetResponse)
@@ -73,12 +42,7 @@ async def fund_testnet(user=Depends(get_current_user)) -> FundTestnetResponse:
 
 @router.get("/arc-block-height", response_model=ArcBlockHeightResponse)
 async def arc_block_height() -> ArcBlockHeightResponse:
-    data = await _arc_rpc("eth_blockNumber", [])
-    result = data.get("result")
-    if not isinstance(result, str) or not result.startswith("0x"):
-        raise RuntimeError("ARC RPC returned invalid blockNumber")
-
-    return ArcBlockHeightResponse(block_height=int(result, 16))
+    return ArcBlockHeightResponse(block_height=await get_block_height_tracker().current())
 
 
 @router.get("/usdc-balance", response_model=UsdcBalanceResponse)
@@ -88,17 +52,8 @@ async def usdc_balance(user=Depends(get_current_user)) -> UsdcBalanceResponse:
     if not settings.usdc_address:
         raise RuntimeError("USDC address not configured")
 
-    call = {
-        "to": settings.usdc_address,
-        "data": _erc20_balance_of_calldata(user.wallet_address),
-    }
-
-    data = await _arc_rpc("eth_call", [call, "latest"])
-    result = data.get("result")
-    if not isinstance(result, str) or not result.startswith("0x"):
-        raise RuntimeError("ARC RPC returned invalid eth_call result")
-
-    balance_minor = int(result, 16)
+    balances = await read_usdc_balances([user.wallet_address])
+    balance_minor = balances[user.wallet_address.lower()]
     balance = str(usdc_minor_units_to_decimal(balance_minor))
 
     return UsdcBalanceResponse(
@@ -109,13 +64,69 @@ async def usdc_balance(user=Depends(get_current_user)) -> UsdcBalanceResponse:
     )
 
 
+@router.post("/balances", response_model=BulkBalancesResponse)
+async def bulk_balances(payload: BulkBalancesRequest, user=Depends(get_current_user)) -> BulkBalancesResponse:
+    if not settings.usdc_address:
+        raise RuntimeError("USDC address not configured")
+    if payload.include_escrow and not settings.escrow_address:
+        raise RuntimeError("Escrow address not configured")
+    for address in payload.addresses:
+        try:
+            abi_encode_address(address)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid address: {address}")
+
+    usdc = await read_usdc_balances(payload.addresses)
+    escrow = await read_escrow_creator_balances(payload.addresses) if payload.include_escrow else {}
+
+    items = []
+    for address in dict.fromkeys(a.lower() for a in payload.addresses):
+        items.append(
+            WalletBalanceItem(
+                wallet_address=address,
+                balance_minor=usdc[address],
+                balance=str(usdc_minor_units_to_decimal(usdc[address])),
+                escrow_balance_minor=escrow.get(address),
+            )
+        )
+    return BulkBalancesResponse(
+        usdc_address=settings.usdc_address,
+        escrow_address=settings.escrow_address if payload.include_escrow else None,
+        items=items,
+    )
+
+
 @router.get("/transactions/{tx_id}", response_model=CircleTransactionResponse)
 async def circle_transaction(
     tx_id: str,
     user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
     circle: CircleWalletsClient = Depends(get_circle_wallets_client),
 ) -> CircleTransactionResponse:
-    if not settings.circle_api_key or not settings.circle_entity_secret:
+    # Settlement transactions are tracked by the reconciler; serve those from the database.
+    result = await session.execute(
+        select(Settlement, PaymentChannel.user_id, Content.creator_id)
+        .join(PaymentChannel, PaymentChannel.id == Settlement.channel_id)
+        .join(Content, Content.id == PaymentChannel.content_id)
+        .where(Settlement.tx_hash == tx_id)
+        .limit(1)
+    )
+    row = result.first()
+    if row is not None:
+        settlement, viewer_id, creator_id = row
+        if user.id not in (str(viewer_id), str(creator_id)):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return CircleTransactionResponse(
+            id=settlement.tx_hash,
+            state=settlement.state,
+            tx_hash=settlement.chain_tx_hash,
+            block_height=settlement.block_height,
+            error_reason=settlement.error_reason,
+            create_date=settlement.created_at,
+            update_date=settlement.updated_at,
+        )
+
+    if not circle_signing_enabled():
         raise RuntimeError("Circle Wallets not configured")
 
     tx = await circle.get_transaction(tx_id=tx_id)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -19,6 +19,24 @@ class UsdcBalanceResponse(BaseModel):
     balance: str
 
 
+class BulkBalancesRequest(BaseModel):
+    addresses: list[str] = Field(min_length=1, max_length=500)
+    include_escrow: bool = False
+
+
+class WalletBalanceItem(BaseModel):
+    wallet_address: str
+    balance_minor: int
+    balance: str
+    escrow_balance_minor: int | None = None
+
+
+class BulkBalancesResponse(BaseModel):
+    usdc_address: str
+    escrow_address: str | None = None
+    items: list[WalletBalanceItem]
+
+
 class CircleTransactionResponse(BaseModel):
     id: str
     state: str
@@ -1,12 +1,73 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.v1 import api_v1_router
+from app.features.content.services import get_stream_credit_flusher
+from app.features.payments.services import get_channel_sweeper, get_channel_tick_flusher
 from app.platform.config import settings
+from app.platform.db.replica import get_replica_lag_monitor
+from app.platform.db.session import dispose_engine
+from app.platform.redis import close_redis
+from app.platform.services.block_height import get_block_height_tracker
+from app.platform.services.chain import close_arc_rpc
+from app.platform.services.circle_wallets import CircleBackpressureError, get_circle_wallets
+from app.platform.services.escrow_indexer import get_escrow_log_indexer
+from app.platform.services.settlements import get_settlement_reconciler
+from app.platform.services.wallet_pool import get_wallet_pool_replenisher
+from app.platform.services.x402 import close_x402_sidecar, get_supported_kinds_refresher
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Resolved first so a refused signer configuration stops startup before any worker runs.
+    circle = get_circle_wallets()
+    replica_lag = get_replica_lag_monitor()
+    replica_lag.start()
+    await circle.start()
+    wallet_pool = get_wallet_pool_replenisher()
+    wallet_pool.start()
+    supported_kinds = get_supported_kinds_refresher()
+    supported_kinds.start()
+    stream_credits = get_stream_credit_flusher()
+    stream_credits.start()
+    channel_ticks = get_channel_tick_flusher()
+    channel_ticks.start()
+    channel_sweeper = get_channel_sweeper()
+    channel_sweeper.start()
+    settlements = get_settlement_reconciler()
+    settlements.start()
+    block_height = get_block_height_tracker()
+    block_height.start()
+    escrow_indexer = get_escrow_log_indexer()
+    escrow_indexer.start()
+    try:
+        yield
+    finally:
+        await escrow_indexer.aclose()
+        await block_height.aclose()
+        await settlements.aclose()
+        await channel_sweeper.aclose()
+        await channel_ticks.aclose()
+        await stream_credits.aclose()
+        await supported_kinds.aclose()
+        await wallet_pool.aclose()
+        await circle.aclose()
+        await replica_lag.aclose()
+        await close_arc_rpc()
+        await close_x402_sidecar()
+        await close_redis()
+        await dispose_engine()
+
+
+async def _circle_backpressure_handler(request: Request, exc: CircleBackpressureError) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "Payment signer busy, retry shortly"}, headers={"Retry-After": "1"})
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="MuseTub API")
+    app = FastAPI(title="MuseTub API", lifespan=_lifespan)
 
     allowed_origins = [o.strip() for o in str(settings.allowed_origins).split(",") if o.strip()]
 
@@ -18,6 +79,7 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_exception_handler(CircleBackpressureError, _circle_backpressure_handler)
     app.include_router(api_v1_router, prefix="/api/v1")
     return app
 
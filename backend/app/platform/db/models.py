@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func, text
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -22,6 +22,26 @@ class User(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class CircleWalletPoolEntry(Base):
+    __tablename__ = "circle_wallet_pool"
+    __table_args__ = (
+        Index(
+            "ix_circle_wallet_pool_unclaimed",
+            "blockchain",
+            "created_at",
+            postgresql_where=text("claimed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    circle_wallet_id: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
+    wallet_address: Mapped[str] = mapped_column(String(128), nullable=False)
+    blockchain: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    claimed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class CreatorPolicy(Base):
     __tablename__ = "creator_policies"
 
@@ -75,9 +95,24 @@ class StreamCredit(Base):
 
 class PaymentChannel(Base):
     __tablename__ = "payment_channels"
+    __table_args__ = (
+        Index(
+            "ix_payment_channels_active_idle",
+            text("coalesce(last_tick_at, opened_at)"),
+            postgresql_where=text("status = 'active'"),
+        ),
+        Index(
+            "ix_payment_channels_active_user_content",
+            "user_id",
+            "content_id",
+            "opened_at",
+            postgresql_where=text("status = 'active'"),
+        ),
+        Index("ix_payment_channels_user_opened", "user_id", "opened_at"),
+    )
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"))
     content_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("content.id", ondelete="CASCADE"), index=True)
 
     price_per_second_locked: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -94,18 +129,92 @@ class PaymentChannel(Base):
     closed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
+class ChannelEvent(Base):
+    __tablename__ = "channel_events"
+    __table_args__ = (
+        Index(
+            "uq_channel_events_tick_slot",
+            "channel_id",
+            "tick_slot",
+            unique=True,
+            postgresql_where=text("tick_slot IS NOT NULL"),
+        ),
+        Index("ix_channel_events_uncompacted", "channel_id", postgresql_where=text("NOT compacted")),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    channel_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("payment_channels.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    tick_slot: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    seconds: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    compacted: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text("false"))
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class Settlement(Base):
     __tablename__ = "settlements"
+    __table_args__ = (
+        Index("ix_settlements_tx_hash", "tx_hash"),
+        Index("ix_settlements_pending_check", "next_check_at", postgresql_where=text("next_check_at IS NOT NULL")),
+        Index("ix_settlements_channel_created", "channel_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     channel_id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
         ForeignKey("payment_channels.id", ondelete="CASCADE"),
-        index=True,
     )
     amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Circle transaction id (or simulated:<uuid>); the on-chain hash lands in chain_tx_hash once known.
     tx_hash: Mapped[str] = mapped_column(String(128), nullable=False)
+    state: Mapped[str] = mapped_column(String(32), nullable=False, server_default=text("'INITIATED'"))
+    chain_tx_hash: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    block_height: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    error_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    check_attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    next_check_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class CreatorContentEarnings(Base):
+    __tablename__ = "creator_content_earnings"
+    __table_args__ = (Index("ix_creator_content_earnings_creator_gross", "creator_id", "amount_gross"),)
+
+    content_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("content.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    creator_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    amount_gross: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    settlement_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ChainCursor(Base):
+    __tablename__ = "chain_cursors"
+
+    name: Mapped[str] = mapped_column(String(128), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class EscrowCreatorBalance(Base):
+    __tablename__ = "escrow_creator_balances"
+
+    escrow_address: Mapped[str] = mapped_column(String(42), primary_key=True)
+    creator_address: Mapped[str] = mapped_column(String(42), primary_key=True)
+    balance: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    total_streamed: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    total_withdrawn: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    last_block: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class AICache(Base):
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import User
+from app.platform.db.session import get_replica_sessionmaker, get_sessionmaker, has_recent_write
+from app.platform.security.auth import authenticate_token, token_subject
+from app.platform.workers import PeriodicWorker
+
+_bearer = HTTPBearer(auto_error=False)
+
+# Replay lag is zero while the replica has applied everything it received; otherwise it is
+# the age of the last replayed transaction.
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+_REPLICA_LAG = metrics.gauge("db_replica_lag_seconds", "Replica replay lag at the last check")
+_READ_ROUTES = metrics.counter("db_read_sessions_total", "Read-only sessions by target database")
+
+_replica_healthy = False
+
+
+def replica_usable() -> bool:
+    return bool(settings.database_replica_url) and _replica_healthy
+
+
+async def check_replica_lag() -> float | None:
+    global _replica_healthy
+    maker = get_replica_sessionmaker()
+    if maker is None:
+        return None
+    try:
+        async with maker() as session:
+            lag = float((await session.execute(_LAG_SQL)).scalar() or 0.0)
+    except Exception:
+        _replica_healthy = False
+        raise
+    _REPLICA_LAG.set(lag)
+    _replica_healthy = lag <= settings.db_replica_max_lag_seconds
+    return lag
+
+
+class ReplicaLagMonitor(PeriodicWorker):
+    name = "db_replica_lag"
+
+    def enabled(self) -> bool:
+        return bool(settings.database_replica_url)
+
+    def interval_seconds(self) -> float:
+        return settings.db_replica_check_interval_seconds
+
+    async def run_once(self) -> bool:
+        await check_replica_lag()
+        return False
+
+
+_monitor: ReplicaLagMonitor | None = None
+
+
+def get_replica_lag_monitor() -> ReplicaLagMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = ReplicaLagMonitor()
+    return _monitor
+
+
+async def get_read_session(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+) -> AsyncIterator[AsyncSession]:
+    """Session for read-only routes: the replica when it is caught up and the caller has not just written."""
+    maker = get_replica_sessionmaker() if replica_usable() else None
+    if maker is not None and credentials is not None:
+        subject = token_subject(credentials.credentials)
+        if subject is not None and await has_recent_write(subject):
+            maker = None
+
+    _READ_ROUTES.inc(target="replica" if maker is not None else "primary")
+    async with (maker or get_sessionmaker())() as session:
+        yield session
+
+
+async def get_current_reader(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    session: AsyncSession = Depends(get_read_session),
+) -> User:
+    """get_current_user for read-only routes, resolved on the route's read session instead of the primary."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    try:
+        return await authenticate_token(session, credentials.credentials)
+    except HTTPException:
+        # A lagging replica may not have the account yet; only the primary can say it does not exist.
+        async with get_sessionmaker()() as primary:
+            return await authenticate_token(primary, credentials.credentials)
@@ -1,28 +1,161 @@
 from collections.abc import AsyncIterator
+import logging
+import time
+from uuid import uuid4
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from app.platform import metrics
 from app.platform.config import settings
+from app.platform.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_POOL_CHECKOUT = metrics.histogram("db_pool_checkout_seconds", "Time spent waiting for a pooled database connection")
+_POOL_CHECKED_OUT = metrics.gauge("db_pool_checked_out", "Database connections currently checked out of the pool")
+_POOL_CONNECTS = metrics.counter("db_pool_connects_total", "New database connections opened by the pool")
 
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_replica_engine: AsyncEngine | None = None
+_replica_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _POOL_CHECKOUT.observe(time.perf_counter() - start)
+
+
+def _engine_options() -> dict:
+    connect_args: dict = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+    if settings.db_pgbouncer_mode:
+        # PgBouncer in transaction mode hands each transaction a different server connection,
+        # so named prepared statements cannot be cached or reused.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+
+    options: dict = {"pool_pre_ping": True, "connect_args": connect_args}
+    if settings.db_pool_size <= 0:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=_TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    return options
+
+
+def _instrument(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        _POOL_CONNECTS.inc()
+
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        _POOL_CHECKED_OUT.set(pool.checkedout())
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        _POOL_CHECKED_OUT.set(pool.checkedout())
 
 
 def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
-        _engine = create_async_engine(settings.database_url, pool_pre_ping=True, poolclass=NullPool)
+        _engine = create_async_engine(settings.database_url, **_engine_options())
+        _instrument(_engine)
     return _engine
 
 
 def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     global _sessionmaker
     if _sessionmaker is None:
-        _sessionmaker = async_sessionmaker(get_engine(), expire_on_commit=False)
+        _sessionmaker = async_sessionmaker(get_engine(), class_=_FencedSession, expire_on_commit=False)
     return _sessionmaker
 
 
+def get_replica_sessionmaker() -> async_sessionmaker[AsyncSession] | None:
+    global _replica_engine, _replica_sessionmaker
+    if not settings.database_replica_url:
+        return None
+    if _replica_sessionmaker is None:
+        _replica_engine = create_async_engine(settings.database_replica_url, **_engine_options())
+        _replica_sessionmaker = async_sessionmaker(_replica_engine, expire_on_commit=False)
+    return _replica_sessionmaker
+
+
+# Sessions note when they write so commit can fence that user's reads onto the primary
+# until the replica has had time to catch up (read-your-writes).
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_dml(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+def _recent_write_key(user_id: str) -> str:
+    return f"db:recent_write:{user_id}"
+
+
+async def mark_recent_write(user_id: str) -> None:
+    try:
+        await get_redis().set(_recent_write_key(user_id), "1", ex=max(1, int(settings.db_read_your_writes_seconds)))
+    except Exception:
+        logger.warning("Could not record recent write for %s", user_id, exc_info=True)
+
+
+async def has_recent_write(user_id: str) -> bool:
+    try:
+        return bool(await get_redis().exists(_recent_write_key(user_id)))
+    except Exception:
+        # Without the fence we cannot tell, so read from the primary.
+        return True
+
+
+class _FencedSession(AsyncSession):
+    async def commit(self) -> None:
+        # Fence before committing, so it is in place before the caller can see the write or get a response.
+        user_id = self.info.get("user_id")
+        if user_id and settings.database_replica_url:
+            await self.flush()
+            if self.info.pop("wrote", False):
+                await mark_recent_write(user_id)
+        await super().commit()
+
+
 async def get_session() -> AsyncIterator[AsyncSession]:
     async with get_sessionmaker()() as session:
         yield session
+
+
+async def dispose_engine() -> None:
+    global _engine, _sessionmaker, _replica_engine, _replica_sessionmaker
+    engines = (_engine, _replica_engine)
+    _engine = _sessionmaker = _replica_engine = _replica_sessionmaker = None
+    for engine in engines:
+        if engine is not None:
+            await engine.dispose()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+import threading
+import time
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+class Counter:
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = [{"labels": dict(k), "value": v} for k, v in self._values.items()]
+        return {"type": "counter", "description": self.description, "values": values}
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["type"] = "gauge"
+        return data
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.description = description
+        self._buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[tuple[str, str], ...], dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * (len(self._buckets) + 1), "sum": 0.0, "count": 0}
+                self._series[key] = series
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(_label_key(labels))
+        return int(series["count"]) if series else 0
+
+    def snapshot(self) -> dict:
+        values = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip([*map(str, self._buckets), "+Inf"], series["counts"]):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                values.append({"labels": dict(key), "buckets": buckets, "sum": series["sum"], "count": series["count"]})
+        return {"type": "histogram", "description": self.description, "values": values}
+
+
+_registry: dict[str, Counter | Gauge | Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = factory()
+            _registry[name] = metric
+        return metric
+
+
+def counter(name: str, description: str) -> Counter:
+    return _get_or_create(name, lambda: Counter(name, description))
+
+
+def gauge(name: str, description: str) -> Gauge:
+    return _get_or_create(name, lambda: Gauge(name, description))
+
+
+def histogram(name: str, description: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(name, lambda: Histogram(name, description, buckets))
+
+
+def snapshot() -> dict[str, dict]:
+    with _registry_lock:
+        metrics = dict(_registry)
+    return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
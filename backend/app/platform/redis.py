@@ -10,3 +10,11 @@ def get_redis() -> Redis:
     if _redis is None:
         _redis = from_url(settings.redis_url, decode_responses=True)
     return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    client = _redis
+    _redis = None
+    if client is not None:
+        await client.aclose()
@@ -17,22 +17,21 @@ def _unauthorized() -> HTTPException:
     return HTTPException(status_code=401, detail="Unauthorized")
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
-    session: AsyncSession = Depends(get_session),
-) -> User:
-    if credentials is None:
-        raise _unauthorized()
-
-    token = credentials.credentials
-
+def token_subject(token: str) -> str | None:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-    except JWTError as exc:
-        raise _unauthorized() from exc
+    except JWTError:
+        return None
 
     subject = payload.get("sub")
     if not isinstance(subject, str) or not subject:
+        return None
+    return subject
+
+
+async def authenticate_token(session: AsyncSession, token: str) -> User:
+    subject = token_subject(token)
+    if subject is None:
         raise _unauthorized()
 
     result = await session.execute(select(User).where(User.id == subject))
@@ -40,4 +39,15 @@ async def get_current_user(
     if user is None:
         raise _unauthorized()
 
+    session.info["user_id"] = str(user.id)
     return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    if credentials is None:
+        raise _unauthorized()
+
+    return await authenticate_token(session, credentials.credentials)
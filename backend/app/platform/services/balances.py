@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.services.chain import abi_encode_address, function_selector, get_arc_rpc
+
+BALANCE_OF = "balanceOf(address)"
+CREATOR_BALANCES = "creatorBalances(address)"
+
+_BALANCE_LOOKUPS = metrics.counter("balance_reader_lookups_total", "Balance reads by contract function and cache result")
+
+# (rpc_url, contract, selector, holder) -> (expires_at, balance)
+_BALANCES: dict[tuple[str, str, str, str], tuple[float, int]] = {}
+
+
+def _decode_uint(result: str) -> int:
+    return int(result, 16) if result not in ("0x", "") else 0
+
+
+async def read_balances(
+    contract: str, signature: str, holders: list[str], *, refresh: bool = False
+) -> dict[str, int]:
+    """Read a uint256 ``signature(address)`` view for many holders, batching cache misses into JSON-RPC batches."""
+    rpc = get_arc_rpc()
+    selector = function_selector(signature)
+    contract = contract.lower()
+    now = time.monotonic()
+
+    balances: dict[str, int] = {}
+    missing: list[str] = []
+    for holder in dict.fromkeys(address.lower() for address in holders):
+        cached = None if refresh else _BALANCES.get((rpc.rpc_url, contract, selector, holder))
+        if cached is not None and cached[0] > now:
+            _BALANCE_LOOKUPS.inc(function=signature, result="hit")
+            balances[holder] = cached[1]
+        else:
+            _BALANCE_LOOKUPS.inc(function=signature, result="miss")
+            missing.append(holder)
+
+    if not missing:
+        return balances
+
+    size = max(1, settings.arc_balance_batch_size)
+    chunks = [missing[i : i + size] for i in range(0, len(missing), size)]
+    results = await asyncio.gather(
+        *(rpc.eth_calls([(contract, selector + abi_encode_address(holder)) for holder in chunk]) for chunk in chunks)
+    )
+
+    expires_at = time.monotonic() + settings.arc_balance_cache_ttl_seconds
+    for chunk, chunk_results in zip(chunks, results):
+        for holder, result in zip(chunk, chunk_results):
+            balance = _decode_uint(result)
+            balances[holder] = balance
+            if len(_BALANCES) >= settings.arc_balance_cache_size:
+                _BALANCES.pop(next(iter(_BALANCES)), None)
+            _BALANCES[(rpc.rpc_url, contract, selector, holder)] = (expires_at, balance)
+    return balances
+
+
+async def read_usdc_balances(holders: list[str], *, refresh: bool = False) -> dict[str, int]:
+    if not settings.usdc_address:
+        raise RuntimeError("USDC address not configured")
+    return await read_balances(settings.usdc_address, BALANCE_OF, holders, refresh=refresh)
+
+
+async def read_escrow_creator_balances(creators: list[str], *, refresh: bool = False) -> dict[str, int]:
+    if not settings.escrow_address:
+        raise RuntimeError("Escrow address not configured")
+    return await read_balances(settings.escrow_address, CREATOR_BALANCES, creators, refresh=refresh)
+
+
+def forget_balances() -> None:
+    _BALANCES.clear()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from redis.asyncio import Redis
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.redis import get_redis
+from app.platform.services.chain import ArcRpcClient, get_arc_rpc
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+# Latest head shared across processes; it expires after one poll interval so a single
+# process polls the node per interval and the rest adopt its answer.
+_REDIS_KEY = "arc:block_height"
+
+_HEIGHT = metrics.gauge("arc_block_height", "Latest Arc block height seen by the tracker")
+_REFRESHES = metrics.counter("arc_block_height_refreshes_total", "Block height refreshes by source")
+
+
+class BlockHeightTracker(PeriodicWorker):
+    """Polls the Arc head on a fixed cadence and serves it from memory."""
+
+    name = "arc_block_height"
+
+    def __init__(self, rpc: ArcRpcClient | None = None, redis: Redis | None = None) -> None:
+        super().__init__()
+        self._rpc = rpc
+        self._redis = redis
+        self._height: int | None = None
+        self._observed_at = 0.0
+        self._advanced = asyncio.Condition()
+
+    def enabled(self) -> bool:
+        return bool(settings.arc_rpc_url)
+
+    def interval_seconds(self) -> float:
+        return settings.arc_block_poll_interval_seconds
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _observe(self, height: int) -> None:
+        self._observed_at = time.monotonic()
+        if self._height is not None and height <= self._height:
+            return
+        self._height = height
+        _HEIGHT.set(height)
+        async with self._advanced:
+            self._advanced.notify_all()
+
+    async def refresh(self) -> int:
+        redis = self._redis or get_redis()
+        try:
+            shared = await redis.get(_REDIS_KEY)
+        except Exception:
+            logger.debug("Shared block height unavailable", exc_info=True)
+            shared = None
+        if shared is not None:
+            _REFRESHES.inc(source="redis")
+            await self._observe(int(shared))
+            return self._height or int(shared)
+
+        height = await (self._rpc or get_arc_rpc()).block_number()
+        _REFRESHES.inc(source="rpc")
+        await self._observe(height)
+        try:
+            await redis.set(_REDIS_KEY, height, px=max(1, int(self.interval_seconds() * 1000)))
+        except Exception:
+            logger.debug("Could not share block height", exc_info=True)
+        return self._height or height
+
+    async def run_once(self) -> bool:
+        await self.refresh()
+        return False
+
+    async def current(self) -> int:
+        """Latest known height, refreshed inline when the cached value is older than two poll intervals."""
+        if self._height is not None and time.monotonic() - self._observed_at <= 2 * self.interval_seconds():
+            return self._height
+        return await self.refresh()
+
+    async def wait_for_block(self, block: int, *, timeout: float | None = None) -> int:
+        """Return once the head reaches ``block``; raises TimeoutError after ``timeout`` seconds."""
+
+        async def _wait() -> int:
+            while self._height is None or self._height < block:
+                if self.running:
+                    async with self._advanced:
+                        await self._advanced.wait_for(lambda: self._height is not None and self._height >= block)
+                else:
+                    await self.refresh()
+                    if self._height < block:
+                        await asyncio.sleep(self.interval_seconds())
+            return self._height
+
+        return await asyncio.wait_for(_wait(), timeout=timeout)
+
+
+_tracker: BlockHeightTracker | None = None
+
+
+def get_block_height_tracker() -> BlockHeightTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = BlockHeightTracker()
+    return _tracker
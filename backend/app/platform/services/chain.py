@@ -1,13 +1,257 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_DOWN
+import itertools
+import random
+import time
+from typing import Any
 
+from Crypto.Hash import keccak
+import httpx
+
+from app.platform import metrics
 from app.platform.config import settings
 
 
 USDC_DECIMALS = 6
 
+_RPC_LATENCY = metrics.histogram("arc_rpc_latency_seconds", "Arc JSON-RPC HTTP round-trip latency by method")
+_RPC_CALLS = metrics.counter("arc_rpc_calls_total", "Arc JSON-RPC calls by method, including calls sent in batches")
+_RPC_ERRORS = metrics.counter("arc_rpc_errors_total", "Arc JSON-RPC failures by method and kind")
+_RPC_RETRIES = metrics.counter("arc_rpc_retries_total", "Arc JSON-RPC HTTP retries by method")
+
+_RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+class ArcRpcError(RuntimeError):
+    pass
+
+
+def keccak256(data: bytes) -> bytes:
+    k = keccak.new(digest_bits=256)
+    k.update(data)
+    return k.digest()
+
+
+def function_selector(signature: str) -> str:
+    return "0x" + keccak256(signature.encode("utf-8"))[:4].hex()
+
+
+def event_topic(signature: str) -> str:
+    return "0x" + keccak256(signature.encode("utf-8")).hex()
+
+
+def abi_encode_address(address: str) -> str:
+    if not isinstance(address, str) or not address.startswith("0x") or len(address) != 42:
+        raise ValueError("Invalid address")
+    return address[2:].lower().rjust(64, "0")
+
+
+def _abi_word(kind: str, value: Any) -> bytes:
+    if kind == "address":
+        return bytes.fromhex(abi_encode_address(value))
+    if kind == "bool":
+        return int(bool(value)).to_bytes(32, "big")
+    if kind.startswith("uint"):
+        number = int(value, 16) if isinstance(value, str) and value.startswith("0x") else int(value)
+        return number.to_bytes(32, "big")
+    if kind.startswith("bytes") and kind != "bytes":
+        raw = bytes.fromhex(str(value).removeprefix("0x"))
+        if len(raw) != int(kind[5:]):
+            raise ValueError(f"Invalid {kind}")
+        return raw.ljust(32, b"\0")
+    raise ValueError(f"Unsupported ABI type {kind}")
+
+
+def abi_encode_call(signature: str, params: list) -> str:
+    """Calldata for ``name(type,...)`` with static types plus dynamic ``bytes``/``string`` (no tuples or arrays)."""
+    inner = signature[signature.index("(") + 1 : -1]
+    kinds = [kind.strip() for kind in inner.split(",")] if inner else []
+    if len(kinds) != len(params):
+        raise ValueError("ABI parameter count mismatch")
+
+    head = b""
+    tail = b""
+    for kind, value in zip(kinds, params):
+        if kind in ("bytes", "string"):
+            raw = str(value).encode("utf-8") if kind == "string" else bytes.fromhex(str(value).removeprefix("0x"))
+            head += (32 * len(kinds) + len(tail)).to_bytes(32, "big")
+            tail += len(raw).to_bytes(32, "big") + raw.ljust((len(raw) + 31) // 32 * 32, b"\0")
+        else:
+            head += _abi_word(kind, value)
+    return function_selector(signature) + (head + tail).hex()
+
+
+class ArcRpcClient:
+    """JSON-RPC client over one pooled HTTP connection set, with batching and retries."""
+
+    def __init__(
+        self,
+        rpc_url: str,
+        *,
+        timeout: float = 10.0,
+        max_connections: int | None = None,
+        max_retries: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.rpc_url = rpc_url
+        self._timeout = timeout
+        self._max_connections = max_connections or settings.arc_rpc_max_connections
+        self._max_retries = settings.arc_rpc_max_retries if max_retries is None else max_retries
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._ids = itertools.count(1)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                ),
+            )
+        return self._client
+
+    async def _post(self, label: str, payload: dict | list) -> Any:
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                resp = await self._get_client().post(self.rpc_url, json=payload)
+                if resp.status_code in _RETRYABLE_STATUS and attempt < self._max_retries:
+                    raise httpx.HTTPStatusError("retryable status", request=resp.request, response=resp)
+                resp.raise_for_status()
+                try:
+                    return resp.json()
+                except ValueError as exc:
+                    _RPC_ERRORS.inc(method=label, kind="decode")
+                    raise ArcRpcError("ARC RPC returned invalid JSON") from exc
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                retryable = isinstance(exc, httpx.TransportError) or exc.response.status_code in _RETRYABLE_STATUS
+                if not retryable or attempt >= self._max_retries:
+                    _RPC_ERRORS.inc(method=label, kind="http")
+                    raise ArcRpcError(f"ARC RPC request failed: {exc}") from exc
+                _RPC_RETRIES.inc(method=label)
+                delay = settings.arc_rpc_retry_backoff_seconds * (2**attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                attempt += 1
+            finally:
+                _RPC_LATENCY.observe(time.perf_counter() - start, method=label)
+
+    @staticmethod
+    def _result(method: str, body: Any) -> Any:
+        if isinstance(body, dict) and body.get("error"):
+            _RPC_ERRORS.inc(method=method, kind="rpc")
+            raise ArcRpcError(f"ARC RPC error: {body['error']}")
+        if not isinstance(body, dict) or "result" not in body:
+            _RPC_ERRORS.inc(method=method, kind="rpc")
+            raise ArcRpcError("ARC RPC returned no result")
+        return body["result"]
+
+    async def call(self, method: str, params: list) -> Any:
+        _RPC_CALLS.inc(method=method)
+        body = await self._post(method, {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params})
+        return self._result(method, body)
+
+    async def batch(self, calls: list[tuple[str, list]]) -> list[Any]:
+        """Send several calls in one JSON-RPC batch array; results come back in call order."""
+        if not calls:
+            return []
+        if len(calls) == 1:
+            return [await self.call(*calls[0])]
+
+        requests = []
+        for method, params in calls:
+            _RPC_CALLS.inc(method=method)
+            requests.append({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params})
+
+        body = await self._post("batch", requests)
+        if not isinstance(body, list):
+            _RPC_ERRORS.inc(method="batch", kind="rpc")
+            raise ArcRpcError(f"ARC RPC batch returned {type(body).__name__}")
+
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        return [self._result(request["method"], by_id.get(request["id"])) for request in requests]
+
+    async def eth_call(self, to_address: str, data: str, block: str = "latest") -> str:
+        result = await self.call("eth_call", [{"to": to_address, "data": data}, block])
+        if not isinstance(result, str) or not result.startswith("0x"):
+            raise ArcRpcError("ARC RPC returned invalid eth_call result")
+        return result
+
+    async def eth_calls(self, calls: list[tuple[str, str]], block: str = "latest") -> list[str]:
+        results = await self.batch([("eth_call", [{"to": to, "data": data}, block]) for to, data in calls])
+        for result in results:
+            if not isinstance(result, str) or not result.startswith("0x"):
+                raise ArcRpcError("ARC RPC returned invalid eth_call result")
+        return results
+
+    async def get_logs(self, *, address: str, topics: list, from_block: int, to_block: int) -> list[dict]:
+        result = await self.call(
+            "eth_getLogs",
+            [{"address": address, "topics": topics, "fromBlock": hex(from_block), "toBlock": hex(to_block)}],
+        )
+        if not isinstance(result, list):
+            raise ArcRpcError("ARC RPC returned invalid eth_getLogs result")
+        return result
+
+    async def block_number(self) -> int:
+        result = await self.call("eth_blockNumber", [])
+        if not isinstance(result, str) or not result.startswith("0x"):
+            raise ArcRpcError("ARC RPC returned invalid blockNumber")
+        return int(result, 16)
+
+    async def aclose(self) -> None:
+        client = self._client
+        self._client = None
+        if client is not None:
+            await client.aclose()
+
+
+# Keyed by RPC URL so a changed ARC_RPC_URL gets its own pool and the old one is still closed on shutdown.
+_arc_rpcs: dict[str, ArcRpcClient] = {}
+
+
+def get_arc_rpc() -> ArcRpcClient:
+    if not settings.arc_rpc_url:
+        raise RuntimeError("ARC RPC not configured")
+    client = _arc_rpcs.get(settings.arc_rpc_url)
+    if client is None:
+        client = _arc_rpcs[settings.arc_rpc_url] = ArcRpcClient(settings.arc_rpc_url)
+    return client
+
+
+# Escrow contracts are immutable, so their usdc() answer is memoized per (rpc_url, escrow_address).
+_ESCROW_USDC: dict[tuple[str, str], str] = {}
+
+
+async def get_escrow_usdc_address(escrow_address: str, *, refresh: bool = False) -> str:
+    rpc = get_arc_rpc()
+    key = (rpc.rpc_url, escrow_address.lower())
+    cached = _ESCROW_USDC.get(key)
+    if cached is not None and not refresh:
+        return cached
+
+    result = await rpc.eth_call(escrow_address, function_selector("usdc()"))
+    address = ("0x" + result[-40:]).lower()
+    _ESCROW_USDC[key] = address
+    return address
+
+
+def forget_escrow_config() -> None:
+    _ESCROW_USDC.clear()
+
+
+async def close_arc_rpc() -> None:
+    clients = list(_arc_rpcs.values())
+    _arc_rpcs.clear()
+    for client in clients:
+        await client.aclose()
+
 
 @dataclass(frozen=True)
 class ChainConfig:
@@ -59,31 +303,15 @@ class ChainClient:
         valid_before: int,
         nonce: str,
     ) -> dict:
-        return {
-            "types": {
-                "EIP712Domain": [
-                    {"name": "name", "type": "string"},
-                    {"name": "version", "type": "string"},
-                    {"name": "chainId", "type": "uint256"},
-                    {"name": "verifyingContract", "type": "address"},
-                ],
-                "ReceiveWithAuthorization": [
-                    {"name": "from", "type": "address"},
-                    {"name": "to", "type": "address"},
-                    {"name": "value", "type": "uint256"},
-                    {"name": "validAfter", "type": "uint256"},
-                    {"name": "validBefore", "type": "uint256"},
-                    {"name": "nonce", "type": "bytes32"},
-                ],
-            },
-            "primaryType": "ReceiveWithAuthorization",
-            "domain": {
+        return erc3009_typed_data(
+            primary_type="ReceiveWithAuthorization",
+            domain={
                 "name": self._config.usdc_name,
                 "version": self._config.usdc_version,
                 "chainId": self._config.chain_id,
                 "verifyingContract": self._config.usdc_address,
             },
-            "message": {
+            message={
                 "from": from_address,
                 "to": to_address,
                 "value": value,
@@ -91,7 +319,35 @@ class ChainClient:
                 "validBefore": valid_before,
                 "nonce": nonce,
             },
-        }
+        )
+
+
+_ERC3009_AUTHORIZATION_FIELDS = [
+    {"name": "from", "type": "address"},
+    {"name": "to", "type": "address"},
+    {"name": "value", "type": "uint256"},
+    {"name": "validAfter", "type": "uint256"},
+    {"name": "validBefore", "type": "uint256"},
+    {"name": "nonce", "type": "bytes32"},
+]
+
+
+def erc3009_typed_data(*, primary_type: str, domain: dict, message: dict) -> dict:
+    """EIP-712 typed data for an ERC-3009 Receive/TransferWithAuthorization."""
+    return {
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"},
+            ],
+            primary_type: list(_ERC3009_AUTHORIZATION_FIELDS),
+        },
+        "primaryType": primary_type,
+        "domain": domain,
+        "message": message,
+    }
 
 
 def usdc_decimal_to_minor_units(amount: Decimal) -> int:
@@ -1,12 +1,29 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import asyncio
+import functools
 import json
+import logging
+import time
 from uuid import uuid4
 
 from circle.web3 import developer_controlled_wallets, utils
 
+from app.platform import metrics
 from app.platform.config import settings
 
+logger = logging.getLogger(__name__)
+
+_CALL_LATENCY = metrics.histogram("circle_call_latency_seconds", "Latency of blocking Circle SDK calls by operation")
+_CALLS_IN_FLIGHT = metrics.gauge("circle_calls_in_flight", "Circle SDK calls submitted to the executor and not yet finished")
+_CALLS_REJECTED = metrics.counter("circle_calls_rejected_total", "Circle SDK calls refused because the executor queue was full")
+_CALL_ERRORS = metrics.counter("circle_call_errors_total", "Circle SDK calls that raised")
+
+
+class CircleBackpressureError(RuntimeError):
+    pass
+
 
 @dataclass(frozen=True)
 class CreatedWallet:
@@ -15,6 +32,53 @@ class CreatedWallet:
 
 
 class CircleWalletsClient:
+    def __init__(self, *, ciphertext_pool_size: int | None = None, ciphertext_low_watermark: int | None = None) -> None:
+        self._client = None
+        self._ciphertexts: deque[str] = deque()
+        self._pool_size = max(
+            0,
+            settings.circle_ciphertext_pool_size if ciphertext_pool_size is None else ciphertext_pool_size,
+        )
+        self._low_watermark = min(
+            self._pool_size,
+            settings.circle_ciphertext_low_watermark if ciphertext_low_watermark is None else ciphertext_low_watermark,
+        )
+        self._refill_task: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_workers = max(1, settings.circle_executor_max_workers)
+        self._capacity = self._max_workers + max(0, settings.circle_executor_queue_limit)
+        self._pending = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="circle-sdk")
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        # Circle SDK calls are blocking; they get their own pool so a settlement burst neither starves
+        # nor is starved by other asyncio.to_thread users, and excess load is refused instead of queued forever.
+        if self._pending >= self._capacity:
+            _CALLS_REJECTED.inc(operation=operation)
+            raise CircleBackpressureError(f"Circle executor saturated ({self._pending} calls pending)")
+
+        self._pending += 1
+        _CALLS_IN_FLIGHT.inc(operation=operation)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args))
+        except Exception:
+            _CALL_ERRORS.inc(operation=operation)
+            raise
+        finally:
+            self._pending -= 1
+            _CALLS_IN_FLIGHT.dec(operation=operation)
+            _CALL_LATENCY.observe(time.perf_counter() - start, operation=operation)
+
+    @property
+    def pending_calls(self) -> int:
+        return self._pending
+
     def _init_client(self):
         if not settings.circle_api_key or not settings.circle_entity_secret:
             raise RuntimeError("Circle Wallets not configured")
@@ -29,11 +93,79 @@ class CircleWalletsClient:
             raise RuntimeError("Circle Wallets not configured")
         return utils.generate_entity_secret_ciphertext(settings.circle_api_key, settings.circle_entity_secret)
 
+    async def _get_client(self):
+        # Building the SDK client fetches the entity public key, so it happens once and off the event loop.
+        if self._client is None:
+            self._client = await self._run("init_client", self._init_client)
+        return self._client
+
+    async def _take_ciphertext(self) -> str:
+        # Ciphertexts are single-use; each call consumes one and the pool is topped up in the background.
+        if self._ciphertexts:
+            ciphertext = self._ciphertexts.popleft()
+        else:
+            ciphertext = await self._run("ciphertext", self._entity_secret_ciphertext)
+
+        if len(self._ciphertexts) <= self._low_watermark:
+            self._schedule_refill()
+        return ciphertext
+
+    def _schedule_refill(self) -> None:
+        if self._pool_size <= 0:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while len(self._ciphertexts) < self._pool_size:
+            try:
+                ciphertext = await self._run("ciphertext", self._entity_secret_ciphertext)
+            except Exception:
+                logger.warning("Circle entity secret ciphertext refill failed", exc_info=True)
+                return
+            self._ciphertexts.append(ciphertext)
+
+    @property
+    def ciphertext_pool_depth(self) -> int:
+        return len(self._ciphertexts)
+
+    async def start(self) -> None:
+        if not settings.circle_api_key or not settings.circle_entity_secret:
+            return
+        try:
+            await self._get_client()
+        except Exception:
+            logger.warning("Circle Wallets client warm-up failed", exc_info=True)
+            return
+        self._schedule_refill()
+
+    async def aclose(self) -> None:
+        task = self._refill_task
+        self._refill_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._ciphertexts.clear()
+        executor = self._executor
+        self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     async def create_developer_wallet(self) -> CreatedWallet:
+        wallets = await self.create_developer_wallets(count=1)
+        return wallets[0]
+
+    async def create_developer_wallets(self, *, count: int) -> list[CreatedWallet]:
         if not settings.circle_api_key or not settings.circle_wallet_set_id or not settings.circle_entity_secret:
             raise RuntimeError("Circle Wallets not configured")
+        if count < 1:
+            raise ValueError("count must be positive")
 
-        client = self._init_client()
+        client = await self._get_client()
 
         api_instance = developer_controlled_wallets.WalletsApi(client)
 
@@ -41,30 +173,32 @@ class CircleWalletsClient:
             {
                 "accountType": "EOA",
                 "blockchains": [settings.circle_blockchain],
-                "count": 1,
+                "count": count,
                 "walletSetId": settings.circle_wallet_set_id,
             }
         )
 
-        response = await asyncio.to_thread(api_instance.create_wallet, request)
+        response = await self._run("create_wallet", api_instance.create_wallet, request)
 
         data = getattr(response, "data", None)
         wallets = getattr(data, "wallets", None) if data is not None else None
         if not wallets:
             raise RuntimeError("Circle wallet creation returned no wallets")
 
-        wallet = wallets[0]
-        actual = getattr(wallet, "actual_instance", wallet)
+        created: list[CreatedWallet] = []
+        for wallet in wallets:
+            actual = getattr(wallet, "actual_instance", wallet)
 
-        wallet_id = getattr(actual, "id", None)
-        address = getattr(actual, "address", None)
-        if not wallet_id or not address:
-            raise RuntimeError("Circle wallet creation returned invalid wallet")
+            wallet_id = getattr(actual, "id", None)
+            address = getattr(actual, "address", None)
+            if not wallet_id or not address:
+                raise RuntimeError("Circle wallet creation returned invalid wallet")
+            created.append(CreatedWallet(circle_wallet_id=str(wallet_id), wallet_address=str(address)))
 
-        return CreatedWallet(circle_wallet_id=str(wallet_id), wallet_address=str(address))
+        return created
 
     async def sign_typed_data(self, *, wallet_id: str, blockchain: str, typed_data: dict, memo: str | None = None) -> str:
-        client = self._init_client()
+        client = await self._get_client()
         api_instance = developer_controlled_wallets.SigningApi(client)
 
         request = developer_controlled_wallets.SignTypedDataRequest.from_dict(
@@ -72,11 +206,11 @@ class CircleWalletsClient:
                 "walletId": wallet_id,
                 "data": json.dumps(typed_data, separators=(",", ":"), sort_keys=True),
                 "memo": memo or "",
-                "entitySecretCiphertext": self._entity_secret_ciphertext(),
+                "entitySecretCiphertext": await self._take_ciphertext(),
             }
         )
 
-        response = await asyncio.to_thread(api_instance.sign_typed_data, request)
+        response = await self._run("sign", api_instance.sign_typed_data, request)
         data = getattr(response, "data", None)
         signature = getattr(data, "signature", None) if data is not None else None
         if not signature:
@@ -95,7 +229,7 @@ class CircleWalletsClient:
         fee_level: str = "MEDIUM",
         ref_id: str | None = None,
     ) -> str:
-        client = self._init_client()
+        client = await self._get_client()
         api_instance = developer_controlled_wallets.TransactionsApi(client)
 
         request = developer_controlled_wallets.CreateContractExecutionTransactionForDeveloperRequest.from_dict(
@@ -108,7 +242,7 @@ class CircleWalletsClient:
                 "abiParameters": abi_parameters,
                 "feeLevel": fee_level,
                 "refId": ref_id or "",
-                "entitySecretCiphertext": self._entity_secret_ciphertext(),
+                "entitySecretCiphertext": await self._take_ciphertext(),
             }
         )
 
@@ -117,7 +251,7 @@ class CircleWalletsClient:
             method = getattr(api_instance, "create_contract_execution_transaction", None)
         if method is None:
             raise RuntimeError("Circle Transactions API missing contract execution method")
-        response = await asyncio.to_thread(method, request)
+        response = await self._run("execute", method, request)
         data = getattr(response, "data", None)
         tx_id = getattr(data, "id", None) if data is not None else None
         if not tx_id:
@@ -126,10 +260,10 @@ class CircleWalletsClient:
         return str(tx_id)
 
     async def get_transaction(self, *, tx_id: str) -> dict:
-        client = self._init_client()
+        client = await self._get_client()
         api_instance = developer_controlled_wallets.TransactionsApi(client)
 
-        response = await asyncio.to_thread(api_instance.get_transaction, tx_id)
+        response = await self._run("get_transaction", api_instance.get_transaction, tx_id)
         data = getattr(response, "data", None)
         tx = getattr(data, "transaction", None) if data is not None else None
         if tx is None:
@@ -140,3 +274,39 @@ class CircleWalletsClient:
             return to_dict()
         # Fallback: best-effort conversion
         return dict(tx)
+
+
+_LOCAL_SIGNER_ENVIRONMENTS = frozenset({"development", "test"})
+
+
+def _require_local_signer_allowed() -> None:
+    # The local signer moves no funds but still grants stream credit and completes settlements,
+    # so it must never run beside real Circle credentials or outside a dev/test deployment.
+    if settings.circle_api_key or settings.circle_entity_secret or settings.circle_wallet_set_id:
+        raise RuntimeError("CIRCLE_SIGNER_BACKEND=local cannot be combined with Circle credentials")
+    if settings.app_env not in _LOCAL_SIGNER_ENVIRONMENTS:
+        raise RuntimeError(f"CIRCLE_SIGNER_BACKEND=local is not allowed with APP_ENV={settings.app_env}")
+
+
+def circle_signing_enabled() -> bool:
+    """True when wallets can sign and execute, via Circle or the offline local signer."""
+    if settings.circle_signer_backend == "local":
+        _require_local_signer_allowed()
+        return True
+    return bool(settings.circle_api_key and settings.circle_entity_secret)
+
+
+_circle_wallets: CircleWalletsClient | None = None
+
+
+def get_circle_wallets() -> CircleWalletsClient:
+    global _circle_wallets
+    if _circle_wallets is None:
+        if settings.circle_signer_backend == "local":
+            _require_local_signer_allowed()
+            from app.platform.services.local_signer import LocalSignerClient
+
+            _circle_wallets = LocalSignerClient()
+        else:
+            _circle_wallets = CircleWalletsClient()
+    return _circle_wallets
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from sqlalchemy import BigInteger, delete, desc, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform.db.models import Content, CreatorContentEarnings, PaymentChannel, Settlement
+from app.platform.db.session import dispose_engine, get_sessionmaker
+
+_COLUMNS = ["content_id", "creator_id", "amount_gross", "settlement_count"]
+
+
+async def record_settlement_earnings(session: AsyncSession, *, content_id: str, amount: int) -> None:
+    """Add one settlement to its content's rollup row; call in the transaction that inserts the settlement."""
+    stmt = pg_insert(CreatorContentEarnings).from_select(
+        _COLUMNS,
+        select(Content.id, Content.creator_id, literal(int(amount), BigInteger), literal(1)).where(Content.id == content_id),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CreatorContentEarnings.content_id],
+            set_={
+                "amount_gross": CreatorContentEarnings.amount_gross + stmt.excluded.amount_gross,
+                "settlement_count": CreatorContentEarnings.settlement_count + 1,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def get_creator_content_earnings(session: AsyncSession, creator_id: str) -> list[tuple[str, str, int]]:
+    """(content_id, title, gross) for each of a creator's earning content, highest gross first."""
+    rows = await session.execute(
+        select(Content.id, Content.title, CreatorContentEarnings.amount_gross)
+        .select_from(CreatorContentEarnings)
+        .join(Content, Content.id == CreatorContentEarnings.content_id)
+        .where(CreatorContentEarnings.creator_id == creator_id)
+        .order_by(desc(CreatorContentEarnings.amount_gross))
+    )
+    return [(str(content_id), str(title), int(gross)) for content_id, title, gross in rows.all()]
+
+
+async def rebuild_creator_earnings(session: AsyncSession, *, creator_id: str | None = None) -> int:
+    """Recompute rollup rows from settlements, for one creator or everyone; returns the rows written.
+
+    The table lock waits out in-flight settlement transactions and holds new ones until the caller commits,
+    so increments are neither lost nor counted twice.
+    """
+    await session.execute(text("LOCK TABLE creator_content_earnings IN EXCLUSIVE MODE"))
+
+    cleared = delete(CreatorContentEarnings)
+    totals = (
+        select(Content.id, Content.creator_id, func.sum(Settlement.amount), func.count())
+        .select_from(Settlement)
+        .join(PaymentChannel, PaymentChannel.id == Settlement.channel_id)
+        .join(Content, Content.id == PaymentChannel.content_id)
+        .group_by(Content.id, Content.creator_id)
+    )
+    if creator_id is not None:
+        cleared = cleared.where(CreatorContentEarnings.creator_id == creator_id)
+        totals = totals.where(Content.creator_id == creator_id)
+
+    await session.execute(cleared)
+    result = await session.execute(pg_insert(CreatorContentEarnings).from_select(_COLUMNS, totals))
+    return int(result.rowcount or 0)
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the creator_content_earnings rollup from settlements.")
+    parser.add_argument("--creator-id", help="only rebuild this creator's rows")
+    args = parser.parse_args()
+    try:
+        async with get_sessionmaker()() as session:
+            written = await rebuild_creator_earnings(session, creator_id=args.creator_id)
+            await session.commit()
+    finally:
+        await dispose_engine()
+    print(f"rebuilt {written} creator_content_earnings rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from ecdsa import SECP256k1
+from ecdsa.ellipticcurve import INFINITY, PointJacobi
+
+from app.platform.services.chain import keccak256
+
+_CURVE = SECP256k1.curve
+_G = SECP256k1.generator
+_N = SECP256k1.order
+_P = _CURVE.p()
+
+
+def _encode_value(kind: str, value) -> bytes:
+    if kind == "string":
+        return keccak256(str(value).encode("utf-8"))
+    if kind == "bytes":
+        return keccak256(bytes.fromhex(str(value).removeprefix("0x")))
+    if kind == "address":
+        raw = bytes.fromhex(str(value).removeprefix("0x"))
+        if len(raw) != 20:
+            raise ValueError("invalid address")
+        return raw.rjust(32, b"\0")
+    if kind == "bool":
+        return int(bool(value)).to_bytes(32, "big")
+    if kind.startswith("uint"):
+        number = int(value, 16) if isinstance(value, str) and value.startswith("0x") else int(value)
+        if number < 0 or number.bit_length() > int(kind[4:] or 256):
+            raise ValueError(f"{kind} out of range")
+        return number.to_bytes(32, "big")
+    if kind.startswith("bytes"):
+        raw = bytes.fromhex(str(value).removeprefix("0x"))
+        if len(raw) != int(kind[5:]):
+            raise ValueError(f"invalid {kind}")
+        return raw.ljust(32, b"\0")
+    raise ValueError(f"unsupported EIP-712 type {kind}")
+
+
+def hash_struct(name: str, fields: list[dict], data: dict) -> bytes:
+    """hashStruct for flat structs (no nested struct or array members)."""
+    signature = f"{name}(" + ",".join(f"{field['type']} {field['name']}" for field in fields) + ")"
+    encoded = keccak256(signature.encode("utf-8"))
+    for field in fields:
+        encoded += _encode_value(field["type"], data[field["name"]])
+    return keccak256(encoded)
+
+
+def hash_typed_data(typed_data: dict) -> bytes:
+    types = typed_data["types"]
+    primary = typed_data["primaryType"]
+    domain = hash_struct("EIP712Domain", types["EIP712Domain"], typed_data["domain"])
+    message = hash_struct(primary, types[primary], typed_data["message"])
+    return keccak256(b"\x19\x01" + domain + message)
+
+
+def recover_address(digest: bytes, signature: bytes) -> str:
+    """Recover the signer of a 65-byte (r, s, v) secp256k1 signature, rejecting malleable high-s values."""
+    if len(signature) != 65:
+        raise ValueError("signature must be 65 bytes")
+    r = int.from_bytes(signature[:32], "big")
+    s = int.from_bytes(signature[32:64], "big")
+    v = signature[64] - 27 if signature[64] >= 27 else signature[64]
+    if v not in (0, 1) or not 0 < r < _N or not 0 < s <= _N // 2:
+        raise ValueError("invalid signature")
+
+    alpha = (pow(r, 3, _P) + 7) % _P
+    y = pow(alpha, (_P + 1) // 4, _P)
+    if y * y % _P != alpha:
+        raise ValueError("invalid signature")
+    if y % 2 != v:
+        y = _P - y
+
+    e = int.from_bytes(digest, "big") % _N
+    r_inv = pow(r, -1, _N)
+    point = PointJacobi(_CURVE, r, y, 1, _N) * (s * r_inv % _N) + _G * (-e * r_inv % _N)
+    if point == INFINITY:
+        raise ValueError("invalid signature")
+    public_key = point.x().to_bytes(32, "big") + point.y().to_bytes(32, "big")
+    return "0x" + keccak256(public_key)[-20:].hex()
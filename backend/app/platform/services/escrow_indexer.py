@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import ChainCursor, EscrowCreatorBalance
+from app.platform.db.session import get_sessionmaker
+from app.platform.services.block_height import get_block_height_tracker
+from app.platform.services.chain import ArcRpcClient, event_topic, get_arc_rpc
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+STREAMED_TOPIC = event_topic("Streamed(address,address,uint256,uint256,uint256)")
+CREATOR_WITHDRAWN_TOPIC = event_topic("CreatorWithdrawn(address,uint256)")
+
+# Arbitrary constant shared by every indexer so only one process advances the cursor at a time.
+_INDEX_LOCK_KEY = 72_040_001
+
+_LOGS = metrics.counter("escrow_indexer_logs_total", "Escrow logs applied by event")
+_INDEXED_BLOCK = metrics.gauge("escrow_indexer_block", "Last confirmed block applied by the escrow indexer")
+_LAG = metrics.gauge("escrow_indexer_lag_blocks", "Confirmed blocks not yet applied by the escrow indexer")
+
+
+def escrow_indexer_enabled() -> bool:
+    return bool(settings.arc_rpc_url and settings.escrow_address)
+
+
+def _cursor_name(escrow_address: str) -> str:
+    return f"escrow_logs:{escrow_address.lower()}"
+
+
+def _topic_address(topic: str) -> str:
+    return ("0x" + topic[-40:]).lower()
+
+
+def _words(data: str) -> list[int]:
+    payload = data[2:] if data.startswith("0x") else data
+    return [int(payload[i : i + 64], 16) for i in range(0, len(payload), 64)]
+
+
+@dataclass
+class _CreatorDelta:
+    streamed: int = 0
+    withdrawn: int = 0
+    last_block: int = 0
+
+
+def _aggregate(logs: list[dict]) -> dict[str, _CreatorDelta]:
+    deltas: dict[str, _CreatorDelta] = {}
+    for log in logs:
+        if log.get("removed"):
+            continue
+        topics = log.get("topics") or []
+        if not topics:
+            continue
+        block = int(log["blockNumber"], 16)
+        if topics[0] == STREAMED_TOPIC and len(topics) >= 3:
+            creator = _topic_address(topics[2])
+            delta = deltas.setdefault(creator, _CreatorDelta())
+            delta.streamed += _words(log["data"])[1]
+            _LOGS.inc(event="Streamed")
+        elif topics[0] == CREATOR_WITHDRAWN_TOPIC and len(topics) >= 2:
+            creator = _topic_address(topics[1])
+            delta = deltas.setdefault(creator, _CreatorDelta())
+            delta.withdrawn += _words(log["data"])[0]
+            _LOGS.inc(event="CreatorWithdrawn")
+        else:
+            continue
+        delta.last_block = max(delta.last_block, block)
+    return deltas
+
+
+async def index_escrow_logs(*, session: AsyncSession, rpc: ArcRpcClient, escrow_address: str, head: int) -> bool:
+    """Apply one block range of confirmed escrow logs; returns True while still catching up."""
+    escrow = escrow_address.lower()
+    locked = await session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _INDEX_LOCK_KEY})
+    if not locked.scalar():
+        await session.rollback()
+        return False
+
+    cursor = await session.get(ChainCursor, _cursor_name(escrow))
+    next_block = cursor.block_number + 1 if cursor is not None else settings.escrow_indexer_start_block
+
+    confirmed = head - settings.escrow_indexer_confirmations
+    if confirmed < next_block:
+        await session.rollback()
+        _LAG.set(0)
+        return False
+
+    to_block = min(confirmed, next_block + max(1, settings.escrow_indexer_block_range) - 1)
+    logs = await rpc.get_logs(
+        address=escrow_address,
+        topics=[[STREAMED_TOPIC, CREATOR_WITHDRAWN_TOPIC]],
+        from_block=next_block,
+        to_block=to_block,
+    )
+
+    for creator, delta in _aggregate(logs).items():
+        net = delta.streamed - delta.withdrawn
+        stmt = pg_insert(EscrowCreatorBalance).values(
+            escrow_address=escrow,
+            creator_address=creator,
+            balance=max(net, 0),
+            total_streamed=delta.streamed,
+            total_withdrawn=delta.withdrawn,
+            last_block=delta.last_block,
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[EscrowCreatorBalance.escrow_address, EscrowCreatorBalance.creator_address],
+                set_={
+                    "balance": func.greatest(EscrowCreatorBalance.balance + net, 0),
+                    "total_streamed": EscrowCreatorBalance.total_streamed + delta.streamed,
+                    "total_withdrawn": EscrowCreatorBalance.total_withdrawn + delta.withdrawn,
+                    "last_block": stmt.excluded.last_block,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    if cursor is None:
+        session.add(ChainCursor(name=_cursor_name(escrow), block_number=to_block))
+    else:
+        cursor.block_number = to_block
+    await session.commit()
+
+    _INDEXED_BLOCK.set(to_block)
+    _LAG.set(confirmed - to_block)
+    return to_block < confirmed
+
+
+async def get_indexed_creator_balance(session: AsyncSession, creator_address: str) -> int | None:
+    """Locally indexed escrow balance for display, or None while the indexer has not caught up to the chain.
+
+    Withdrawals must not rely on this value; they read the contract directly.
+    """
+    if not escrow_indexer_enabled():
+        return None
+    escrow = settings.escrow_address.lower()
+    cursor = await session.get(ChainCursor, _cursor_name(escrow))
+    if cursor is None:
+        return None
+    try:
+        head = await get_block_height_tracker().current()
+    except Exception:
+        logger.debug("Block height unavailable; not trusting the escrow index", exc_info=True)
+        return None
+    if cursor.block_number < head - settings.escrow_indexer_confirmations:
+        return None
+    result = await session.execute(
+        select(EscrowCreatorBalance.balance).where(
+            EscrowCreatorBalance.escrow_address == escrow,
+            EscrowCreatorBalance.creator_address == creator_address.lower(),
+        )
+    )
+    return int(result.scalar() or 0)
+
+
+class EscrowLogIndexer(PeriodicWorker):
+    name = "escrow_log_indexer"
+
+    def enabled(self) -> bool:
+        return escrow_indexer_enabled()
+
+    def interval_seconds(self) -> float:
+        return settings.escrow_indexer_interval_seconds
+
+    async def run_once(self) -> bool:
+        head = await get_block_height_tracker().current()
+        async with get_sessionmaker()() as session:
+            return await index_escrow_logs(
+                session=session, rpc=get_arc_rpc(), escrow_address=settings.escrow_address, head=head
+            )
+
+
+_indexer: EscrowLogIndexer | None = None
+
+
+def get_escrow_log_indexer() -> EscrowLogIndexer:
+    global _indexer
+    if _indexer is None:
+        _indexer = EscrowLogIndexer()
+    return _indexer
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import json
+import sqlite3
+import time
+from uuid import uuid4
+
+from ecdsa import SECP256k1, SigningKey
+from ecdsa.util import sigencode_string_canonize
+
+from app.platform.config import settings
+from app.platform.services.chain import abi_encode_call, keccak256
+from app.platform.services.circle_wallets import CircleWalletsClient, CreatedWallet
+from app.platform.services.eip712 import hash_typed_data, recover_address
+
+
+class LocalSignerClient(CircleWalletsClient):
+    """Offline stand-in for Circle developer wallets, for benchmarking the live payment paths.
+
+    Wallet keys are derived from ``local_signer_seed`` and the wallet id, so they survive restarts without
+    being stored. Contract executions are ABI-encoded and recorded in memory, or in SQLite when
+    ``local_signer_db_path`` is set, and report COMPLETE once ``local_signer_confirm_seconds`` have passed.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: str | None = None,
+        latency_seconds: float | None = None,
+        confirm_seconds: float | None = None,
+        db_path: str | None = None,
+    ) -> None:
+        super().__init__(ciphertext_pool_size=0)
+        self._seed = settings.local_signer_seed if seed is None else seed
+        self._latency = settings.local_signer_latency_ms / 1000 if latency_seconds is None else latency_seconds
+        self._confirm_seconds = settings.local_signer_confirm_seconds if confirm_seconds is None else confirm_seconds
+        self._db_path = settings.local_signer_db_path if db_path is None else db_path
+        self._transactions: dict[str, dict] = {}
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = asyncio.Lock()
+
+    def _key(self, wallet_id: str) -> SigningKey:
+        secret = int.from_bytes(keccak256(f"{self._seed}:{wallet_id}".encode("utf-8")), "big")
+        return SigningKey.from_secret_exponent(secret % (SECP256k1.order - 1) + 1, curve=SECP256k1)
+
+    def wallet_address(self, wallet_id: str) -> str:
+        return "0x" + keccak256(self._key(wallet_id).get_verifying_key().to_string())[-20:].hex()
+
+    async def _delay(self) -> None:
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+
+    def _open_db(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self._db_path, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS local_transactions (id TEXT PRIMARY KEY, body TEXT NOT NULL)")
+        db.commit()
+        return db
+
+    async def _db_call(self, fn, *args):
+        async with self._db_lock:
+            if self._db is None:
+                self._db = await asyncio.to_thread(self._open_db)
+            return await asyncio.to_thread(fn, self._db, *args)
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, tx: dict) -> None:
+        db.execute("INSERT INTO local_transactions (id, body) VALUES (?, ?)", (tx["id"], json.dumps(tx)))
+        db.commit()
+
+    @staticmethod
+    def _select(db: sqlite3.Connection, tx_id: str) -> dict | None:
+        row = db.execute("SELECT body FROM local_transactions WHERE id = ?", (tx_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def start(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        db = self._db
+        self._db = None
+        if db is not None:
+            await asyncio.to_thread(db.close)
+
+    async def create_developer_wallets(self, *, count: int) -> list[CreatedWallet]:
+        if count < 1:
+            raise ValueError("count must be positive")
+        await self._delay()
+        wallet_ids = [f"local-{uuid4()}" for _ in range(count)]
+        return [CreatedWallet(circle_wallet_id=wallet_id, wallet_address=self.wallet_address(wallet_id)) for wallet_id in wallet_ids]
+
+    async def sign_typed_data(self, *, wallet_id: str, blockchain: str, typed_data: dict, memo: str | None = None) -> str:
+        await self._delay()
+        digest = hash_typed_data(typed_data)
+        key = self._key(wallet_id)
+        signer = "0x" + keccak256(key.get_verifying_key().to_string())[-20:].hex()
+        rs = key.sign_digest_deterministic(digest, sigencode=sigencode_string_canonize)
+        for v in (27, 28):
+            if recover_address(digest, rs + bytes([v])) == signer:
+                return "0x" + (rs + bytes([v])).hex()
+        raise RuntimeError("Local signer produced an unrecoverable signature")
+
+    async def create_contract_execution_transaction(
+        self,
+        *,
+        wallet_id: str,
+        blockchain: str,
+        contract_address: str,
+        abi_function_signature: str,
+        abi_parameters: list,
+        fee_level: str = "MEDIUM",
+        ref_id: str | None = None,
+    ) -> str:
+        await self._delay()
+        calldata = abi_encode_call(abi_function_signature, abi_parameters)
+        tx_id = str(uuid4())
+        tx = {
+            "id": tx_id,
+            "walletId": wallet_id,
+            "blockchain": blockchain,
+            "contractAddress": contract_address,
+            "abiFunctionSignature": abi_function_signature,
+            "callData": calldata,
+            "refId": ref_id or "",
+            "txHash": "0x" + keccak256(tx_id.encode("utf-8") + bytes.fromhex(calldata[2:])).hex(),
+            "createdAt": time.time(),
+            "createDate": datetime.now(timezone.utc).isoformat(),
+        }
+        if self._db_path:
+            await self._db_call(self._insert, tx)
+        else:
+            self._transactions[tx_id] = tx
+        return tx_id
+
+    async def get_transaction(self, *, tx_id: str) -> dict:
+        await self._delay()
+        tx = await self._db_call(self._select, tx_id) if self._db_path else self._transactions.get(tx_id)
+        if tx is None:
+            raise RuntimeError("Circle get_transaction returned no transaction")
+
+        confirmed_at = tx["createdAt"] + self._confirm_seconds
+        result = {key: value for key, value in tx.items() if key not in ("callData", "createdAt")}
+        if time.time() >= confirmed_at:
+            # One pseudo-block per second keeps block heights monotonic without a chain.
+            result.update(
+                state="COMPLETE",
+                blockHeight=int(confirmed_at),
+                updateDate=datetime.fromtimestamp(confirmed_at, timezone.utc).isoformat(),
+            )
+        else:
+            result.update(state="SENT", txHash=None, updateDate=tx["createDate"])
+        return result
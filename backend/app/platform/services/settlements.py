@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import Settlement
+from app.platform.db.session import get_sessionmaker
+from app.platform.services.circle_wallets import CircleWalletsClient, circle_signing_enabled, get_circle_wallets
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+SIMULATED_STATE = "SIMULATED"
+FINAL_STATES = frozenset({"COMPLETE", "FAILED", "CANCELLED", "DENIED", SIMULATED_STATE})
+
+_POLLS = metrics.counter("settlement_reconciler_polls_total", "Circle transaction polls by resulting state")
+_PENDING = metrics.gauge("settlement_reconciler_due", "Settlements claimed by the last reconciler pass")
+
+
+def new_settlement(*, channel_id: str, amount: int, tx_id: str, now: datetime) -> Settlement:
+    if tx_id.startswith("simulated:"):
+        return Settlement(channel_id=channel_id, amount=amount, tx_hash=tx_id, state=SIMULATED_STATE, updated_at=now)
+    return Settlement(channel_id=channel_id, amount=amount, tx_hash=tx_id, state="INITIATED", next_check_at=now)
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = settings.settlement_reconcile_backoff_seconds * (2 ** min(attempts, 16))
+    return timedelta(seconds=min(seconds, settings.settlement_reconcile_max_backoff_seconds))
+
+
+def reconciler_enabled() -> bool:
+    return circle_signing_enabled()
+
+
+async def _claim_due(session: AsyncSession, *, now: datetime, limit: int) -> list[tuple[str, str, int]]:
+    due = (
+        select(Settlement.id)
+        .where(Settlement.next_check_at.is_not(None), Settlement.next_check_at <= now)
+        .order_by(Settlement.next_check_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    # Push next_check_at out by a lease so another process skips these rows while we poll Circle.
+    result = await session.execute(
+        update(Settlement)
+        .where(Settlement.id.in_(due))
+        .values(next_check_at=now + timedelta(seconds=settings.settlement_reconcile_lease_seconds))
+        .returning(Settlement.id, Settlement.tx_hash, Settlement.check_attempts)
+    )
+    claimed = [(str(row[0]), str(row[1]), int(row[2])) for row in result.all()]
+    await session.commit()
+    return claimed
+
+
+async def _poll(circle: CircleWalletsClient, tx_id: str) -> dict | None:
+    try:
+        return await circle.get_transaction(tx_id=tx_id)
+    except Exception:
+        logger.warning("Circle transaction poll failed for %s", tx_id, exc_info=True)
+        return None
+
+
+async def reconcile_settlements(*, session: AsyncSession, circle: CircleWalletsClient, now: datetime, limit: int) -> int:
+    claimed = await _claim_due(session, now=now, limit=limit)
+    _PENDING.set(len(claimed))
+    if not claimed:
+        return 0
+
+    transactions = await asyncio.gather(*(_poll(circle, tx_id) for _, tx_id, _ in claimed))
+
+    for (settlement_id, _, attempts), tx in zip(claimed, transactions):
+        values: dict = {"check_attempts": attempts + 1, "next_check_at": now + _backoff(attempts)}
+        if tx is None:
+            _POLLS.inc(state="error")
+        else:
+            state = str(tx.get("state") or "UNKNOWN")
+            _POLLS.inc(state=state)
+            values.update(
+                state=state,
+                chain_tx_hash=tx.get("txHash"),
+                block_height=int(tx["blockHeight"]) if tx.get("blockHeight") is not None else None,
+                error_reason=(str(tx["errorReason"])[:255] if tx.get("errorReason") else None),
+                updated_at=now,
+            )
+            if state in FINAL_STATES:
+                values["next_check_at"] = None
+        await session.execute(update(Settlement).where(Settlement.id == settlement_id).values(**values))
+    await session.commit()
+    return len(claimed)
+
+
+class SettlementReconciler(PeriodicWorker):
+    name = "settlement_reconciler"
+
+    def __init__(self, circle: CircleWalletsClient | None = None) -> None:
+        super().__init__()
+        self._circle = circle
+
+    def enabled(self) -> bool:
+        return reconciler_enabled()
+
+    def interval_seconds(self) -> float:
+        return settings.settlement_reconcile_interval_seconds
+
+    async def run_once(self) -> bool:
+        async with get_sessionmaker()() as session:
+            reconciled = await reconcile_settlements(
+                session=session,
+                circle=self._circle or get_circle_wallets(),
+                now=datetime.now(timezone.utc),
+                limit=settings.settlement_reconcile_batch_size,
+            )
+        return reconciled >= settings.settlement_reconcile_batch_size
+
+
+_reconciler: SettlementReconciler | None = None
+
+
+def get_settlement_reconciler() -> SettlementReconciler:
+    global _reconciler
+    if _reconciler is None:
+        _reconciler = SettlementReconciler()
+    return _reconciler
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.db.models import CircleWalletPoolEntry
+from app.platform.db.session import get_sessionmaker
+from app.platform.services.circle_wallets import CircleWalletsClient, CreatedWallet, get_circle_wallets
+from app.platform.workers import PeriodicWorker
+
+# Arbitrary constant shared by every replenisher so only one process tops up the pool at a time.
+_REPLENISH_LOCK_KEY = 72_028_001
+
+_CLAIMS = metrics.counter("wallet_pool_claims_total", "Registration wallet claims by outcome (hit or miss)")
+_CREATED = metrics.counter("wallet_pool_wallets_created_total", "Wallets created by the pool replenisher")
+_AVAILABLE = metrics.gauge("wallet_pool_available", "Unclaimed pooled wallets at last replenisher pass")
+
+
+def wallet_pool_enabled() -> bool:
+    return bool(
+        settings.circle_api_key
+        and settings.circle_entity_secret
+        and settings.circle_wallet_set_id
+        and settings.circle_wallet_pool_target > 0
+    )
+
+
+async def claim_pooled_wallet(session: AsyncSession) -> CreatedWallet | None:
+    next_unclaimed = (
+        select(CircleWalletPoolEntry.id)
+        .where(
+            CircleWalletPoolEntry.claimed_at.is_(None),
+            CircleWalletPoolEntry.blockchain == settings.circle_blockchain,
+        )
+        .order_by(CircleWalletPoolEntry.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(CircleWalletPoolEntry)
+        .where(CircleWalletPoolEntry.id == next_unclaimed)
+        .values(claimed_at=func.now())
+        .returning(CircleWalletPoolEntry.circle_wallet_id, CircleWalletPoolEntry.wallet_address)
+    )
+    row = result.first()
+    if row is None:
+        _CLAIMS.inc(result="miss")
+        return None
+
+    _CLAIMS.inc(result="hit")
+    return CreatedWallet(circle_wallet_id=str(row[0]), wallet_address=str(row[1]))
+
+
+async def count_available_wallets(session: AsyncSession) -> int:
+    result = await session.execute(
+        select(func.count())
+        .select_from(CircleWalletPoolEntry)
+        .where(
+            CircleWalletPoolEntry.claimed_at.is_(None),
+            CircleWalletPoolEntry.blockchain == settings.circle_blockchain,
+        )
+    )
+    return int(result.scalar() or 0)
+
+
+async def replenish_wallet_pool(*, session: AsyncSession, circle: CircleWalletsClient) -> int:
+    target = settings.circle_wallet_pool_target
+    batch_size = max(1, settings.circle_wallet_pool_batch_size)
+    created = 0
+
+    while True:
+        locked = await session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REPLENISH_LOCK_KEY}
+        )
+        if not locked.scalar():
+            await session.rollback()
+            return created
+
+        available = await count_available_wallets(session)
+        _AVAILABLE.set(available)
+        deficit = target - available
+        if deficit <= 0:
+            await session.rollback()
+            return created
+
+        wallets = await circle.create_developer_wallets(count=min(deficit, batch_size))
+        session.add_all(
+            CircleWalletPoolEntry(
+                circle_wallet_id=wallet.circle_wallet_id,
+                wallet_address=wallet.wallet_address,
+                blockchain=settings.circle_blockchain,
+            )
+            for wallet in wallets
+        )
+        await session.commit()
+
+        created += len(wallets)
+        _CREATED.inc(len(wallets))
+        _AVAILABLE.set(available + len(wallets))
+
+
+class WalletPoolReplenisher(PeriodicWorker):
+    name = "wallet_pool_replenisher"
+
+    def __init__(self, circle: CircleWalletsClient | None = None) -> None:
+        super().__init__()
+        self._circle = circle
+
+    def enabled(self) -> bool:
+        return wallet_pool_enabled()
+
+    def interval_seconds(self) -> float:
+        return settings.circle_wallet_pool_interval_seconds
+
+    async def run_once(self) -> bool:
+        circle = self._circle or get_circle_wallets()
+        async with get_sessionmaker()() as session:
+            await replenish_wallet_pool(session=session, circle=circle)
+        return False
+
+
+_replenisher: WalletPoolReplenisher | None = None
+
+
+def get_wallet_pool_replenisher() -> WalletPoolReplenisher:
+    global _replenisher
+    if _replenisher is None:
+        _replenisher = WalletPoolReplenisher()
+    return _replenisher
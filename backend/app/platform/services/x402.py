@@ -1,9 +1,132 @@
+import asyncio
 import base64
 import json
 from dataclasses import dataclass
+import logging
+import random
+import time
 
 import httpx
 
+from app.platform import metrics
+from app.platform.config import settings
+from app.platform.redis import get_redis
+from app.platform.services.chain import erc3009_typed_data
+from app.platform.services.eip712 import hash_typed_data, recover_address
+from app.platform.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+# Last known good /supported document. Redis holds the cluster copy; each process mirrors it
+# here so readers never wait on the sidecar or Redis once warm.
+_SUPPORTED_CACHE: dict | None = None
+_SUPPORTED_REDIS_KEY = "x402:supported_kinds"
+_SUPPORTED_LOCK_KEY = "x402:supported_kinds:refresh"
+
+_SUPPORTED_READS = metrics.counter("x402_supported_kinds_reads_total", "Supported-kinds reads by source")
+_SUPPORTED_REFRESHES = metrics.counter("x402_supported_kinds_refreshes_total", "Supported-kinds sidecar refreshes by outcome")
+
+_SIDECAR_LATENCY = metrics.histogram("x402_sidecar_latency_seconds", "x402 gateway sidecar HTTP latency by endpoint")
+_SIDECAR_ERRORS = metrics.counter("x402_sidecar_errors_total", "x402 gateway sidecar failures by endpoint and kind")
+_SIDECAR_RETRIES = metrics.counter("x402_sidecar_retries_total", "x402 gateway sidecar retries by endpoint")
+
+_NONCE_CLAIMS = metrics.counter("x402_nonce_claims_total", "Authorization nonce claims by outcome")
+_LOCAL_VERIFICATIONS = metrics.counter("x402_local_verifications_total", "Local x402 payment pre-verification by outcome")
+
+_SIDECAR_TIMEOUTS = {"supported": 10.0, "verify-settle": 10.0, "pay": 30.0}
+_RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+# Failures where the request never reached the sidecar, so even payment calls are safe to resend.
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class GatewaySidecarClient:
+    """Pooled client for the x402 gateway sidecar. Only idempotent GETs retry on HTTP errors."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_connections: int | None = None,
+        max_retries: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._max_connections = max_connections or settings.x402_sidecar_max_connections
+        self._max_retries = settings.x402_sidecar_max_retries if max_retries is None else max_retries
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                ),
+            )
+        return self._client
+
+    async def request(self, method: str, endpoint: str, *, json_body: dict | None = None) -> httpx.Response:
+        idempotent = method == "GET"
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                resp = await self._get_client().request(
+                    method, f"/{endpoint}", json=json_body, timeout=_SIDECAR_TIMEOUTS.get(endpoint, 10.0)
+                )
+                if idempotent and resp.status_code in _RETRYABLE_STATUS and attempt < self._max_retries:
+                    raise httpx.HTTPStatusError("retryable status", request=resp.request, response=resp)
+                resp.raise_for_status()
+                return resp
+            except httpx.HTTPError as exc:
+                if isinstance(exc, httpx.HTTPStatusError):
+                    retryable = idempotent and exc.response.status_code in _RETRYABLE_STATUS
+                else:
+                    retryable = idempotent or isinstance(exc, _UNSENT_ERRORS)
+                if not retryable or attempt >= self._max_retries:
+                    _SIDECAR_ERRORS.inc(endpoint=endpoint, kind=type(exc).__name__)
+                    raise
+                _SIDECAR_RETRIES.inc(endpoint=endpoint)
+                delay = settings.x402_sidecar_retry_backoff_seconds * (2**attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                attempt += 1
+            finally:
+                _SIDECAR_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+
+    async def get_json(self, endpoint: str) -> object:
+        return (await self.request("GET", endpoint)).json()
+
+    async def post_json(self, endpoint: str, body: dict) -> object:
+        return (await self.request("POST", endpoint, json_body=body)).json()
+
+    async def aclose(self) -> None:
+        client = self._client
+        self._client = None
+        if client is not None:
+            await client.aclose()
+
+
+# Keyed by base URL so a changed sidecar URL gets its own pool and the old one is still closed on shutdown.
+_sidecars: dict[str, GatewaySidecarClient] = {}
+
+
+def get_x402_sidecar(sidecar_url: str) -> GatewaySidecarClient:
+    base_url = sidecar_url.rstrip("/")
+    client = _sidecars.get(base_url)
+    if client is None:
+        client = _sidecars[base_url] = GatewaySidecarClient(base_url)
+    return client
+
+
+async def close_x402_sidecar() -> None:
+    clients = list(_sidecars.values())
+    _sidecars.clear()
+    for client in clients:
+        await client.aclose()
+
 
 @dataclass(frozen=True)
 class X402Settlement:
@@ -11,6 +134,12 @@ class X402Settlement:
     payer: str
 
 
+class PaymentVerificationError(ValueError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
 def decode_payment_signature(header_value: str) -> dict:
     raw = base64.b64decode(header_value.encode("utf-8"))
     obj = json.loads(raw.decode("utf-8"))
@@ -49,23 +178,249 @@ def build_exact_accept(*, network: str, asset: str, amount: int, pay_to: str, ma
     }
 
 
+async def fetch_gateway_supported_kinds(*, sidecar_url: str) -> dict | None:
+    try:
+        data = await get_x402_sidecar(sidecar_url).get_json("supported")
+    except (httpx.HTTPError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def _load_shared_supported_kinds() -> dict | None:
+    global _SUPPORTED_CACHE
+    try:
+        raw = await get_redis().get(_SUPPORTED_REDIS_KEY)
+    except Exception:
+        logger.debug("Shared supported kinds unavailable", exc_info=True)
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        _SUPPORTED_CACHE = data
+        return data
+    return None
+
+
+async def get_gateway_supported_kinds(*, sidecar_url: str) -> dict | None:
+    """Serve the last known good document; the refresher is the only caller of the sidecar."""
+    if _SUPPORTED_CACHE is not None:
+        _SUPPORTED_READS.inc(source="memory")
+        return _SUPPORTED_CACHE
+
+    data = await _load_shared_supported_kinds()
+    if data is not None:
+        _SUPPORTED_READS.inc(source="redis")
+        return data
+
+    _SUPPORTED_READS.inc(source="miss")
+    get_supported_kinds_refresher().notify()
+    return None
+
+
+async def refresh_gateway_supported_kinds(*, sidecar_url: str) -> dict | None:
+    global _SUPPORTED_CACHE
+    redis = get_redis()
+    interval_ms = max(1, int(settings.x402_supported_refresh_interval_seconds * 1000))
+    try:
+        leader = bool(await redis.set(_SUPPORTED_LOCK_KEY, "1", nx=True, px=interval_ms))
+    except Exception:
+        logger.debug("Supported kinds refresh lock unavailable", exc_info=True)
+        leader = True
+
+    if leader:
+        data = await fetch_gateway_supported_kinds(sidecar_url=sidecar_url)
+        if data is None:
+            _SUPPORTED_REFRESHES.inc(outcome="error")
+        else:
+            _SUPPORTED_REFRESHES.inc(outcome="ok")
+            _SUPPORTED_CACHE = data
+            try:
+                await redis.set(
+                    _SUPPORTED_REDIS_KEY,
+                    json.dumps(data, separators=(",", ":")),
+                    ex=settings.x402_supported_cache_ttl_seconds,
+                )
+            except Exception:
+                logger.debug("Could not share supported kinds", exc_info=True)
+            return data
+
+    return await _load_shared_supported_kinds() or _SUPPORTED_CACHE
+
+
+class SupportedKindsRefresher(PeriodicWorker):
+    name = "x402_supported_kinds"
+
+    def enabled(self) -> bool:
+        return bool(settings.x402_gateway_sidecar_url)
+
+    def interval_seconds(self) -> float:
+        return settings.x402_supported_refresh_interval_seconds
+
+    async def run_once(self) -> bool:
+        await refresh_gateway_supported_kinds(sidecar_url=settings.x402_gateway_sidecar_url)
+        return False
+
+
+_refresher: SupportedKindsRefresher | None = None
+
+
+def get_supported_kinds_refresher() -> SupportedKindsRefresher:
+    global _refresher
+    if _refresher is None:
+        _refresher = SupportedKindsRefresher()
+    return _refresher
+
+
+def resolve_exact_kind_extra(supported: dict | None, *, network: str) -> dict | None:
+    if not isinstance(supported, dict):
+        return None
+    kinds = supported.get("kinds")
+    if not isinstance(kinds, list):
+        return None
+    for kind in kinds:
+        if not isinstance(kind, dict):
+            continue
+        if kind.get("scheme") != "exact":
+            continue
+        if kind.get("network") != network:
+            continue
+        extra = kind.get("extra")
+        if isinstance(extra, dict):
+            return extra
+    return None
+
+
+# ReceiveWithAuthorization matches ChainClient; TransferWithAuthorization is what x402 exact clients sign.
+_AUTHORIZATION_TYPES = ("ReceiveWithAuthorization", "TransferWithAuthorization")
+# Like the facilitator, require a few seconds of validity left so settlement can still land.
+_VALID_BEFORE_MARGIN_SECONDS = 6
+
+
+def _check_exact_payment(payment_payload: dict, requirements: dict, now: int) -> str:
+    try:
+        network = str(requirements["network"])
+        if requirements.get("scheme") != "exact" or not network.startswith("eip155:"):
+            raise PaymentVerificationError("unsupported_scheme")
+        chain_id = int(network.split(":", 1)[1])
+        authorization = payment_payload["payload"]["authorization"]
+        signature = bytes.fromhex(str(payment_payload["payload"]["signature"]).removeprefix("0x"))
+        payer = str(authorization["from"]).lower()
+        value = int(authorization["value"])
+        valid_after = int(authorization["validAfter"])
+        valid_before = int(authorization["validBefore"])
+        amount = int(requirements["amount"])
+        pay_to = str(requirements["payTo"]).lower()
+        extra = requirements.get("extra") or {}
+    except PaymentVerificationError:
+        raise
+    except (KeyError, TypeError, ValueError) as exc:
+        raise PaymentVerificationError("invalid_payload") from exc
+
+    if str(authorization.get("to", "")).lower() != pay_to:
+        raise PaymentVerificationError("recipient_mismatch")
+    # The exact scheme only requires the authorization to cover the amount; paying more is the payer's call.
+    if value < amount:
+        raise PaymentVerificationError("amount_mismatch")
+    if valid_after > now:
+        raise PaymentVerificationError("not_yet_valid")
+    if valid_before < now + _VALID_BEFORE_MARGIN_SECONDS:
+        raise PaymentVerificationError("expired")
+
+    domain = {
+        "name": extra.get("name") or settings.usdc_name,
+        "version": extra.get("version") or settings.usdc_version,
+        "chainId": chain_id,
+        "verifyingContract": extra.get("verifyingContract") or requirements.get("asset"),
+    }
+    for primary_type in _AUTHORIZATION_TYPES:
+        typed_data = erc3009_typed_data(primary_type=primary_type, domain=domain, message=authorization)
+        try:
+            signer = recover_address(hash_typed_data(typed_data), signature)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise PaymentVerificationError("invalid_signature") from exc
+        if signer == payer:
+            return payer
+    raise PaymentVerificationError("invalid_signature")
+
+
+def verify_exact_payment(*, payment_payload: dict, requirements: dict, now: int | None = None) -> str:
+    """Check an exact-scheme ERC-3009 payment in process; returns the payer or raises PaymentVerificationError.
+
+    No route accepts a client-signed x402 payload yet (stream payments go through /pay or the sidecar's
+    /pay), so this only runs via verify_and_settle_via_sidecar for whichever ingress adopts it.
+    """
+    if now is None:
+        now = int(time.time())
+    try:
+        payer = _check_exact_payment(payment_payload, requirements, now)
+    except PaymentVerificationError as exc:
+        _LOCAL_VERIFICATIONS.inc(outcome=exc.reason)
+        raise
+    _LOCAL_VERIFICATIONS.inc(outcome="ok")
+    return payer
+
+
+# Used nonces are remembered until the authorization could no longer execute anyway, plus clock-skew slack.
+_NONCE_TTL_SLACK_SECONDS = 60
+
+
+def _nonce_key(payer: str, nonce: str) -> str:
+    return f"x402:nonce:{payer.lower()}:{nonce.lower()}"
+
+
+async def claim_authorization_nonce(*, payer: str, nonce: str, valid_before: int, now: int | None = None) -> bool:
+    """Record (payer, nonce) until validBefore; False means the authorization was already submitted.
+
+    Only verify_and_settle_via_sidecar claims nonces, and no route calls it yet, so replays are not
+    rejected at the API edge until a client-signed payment ingress exists.
+    """
+    if now is None:
+        now = int(time.time())
+    ttl = max(1, valid_before - now + _NONCE_TTL_SLACK_SECONDS)
+    try:
+        claimed = bool(await get_redis().set(_nonce_key(payer, nonce), "1", nx=True, ex=ttl))
+    except Exception:
+        # The facilitator and the token contract still refuse replays; the index only short-circuits them.
+        logger.warning("Nonce index unavailable; forwarding payment without replay check", exc_info=True)
+        _NONCE_CLAIMS.inc(outcome="unavailable")
+        return True
+    _NONCE_CLAIMS.inc(outcome="claimed" if claimed else "replayed")
+    return claimed
+
+
+async def release_authorization_nonce(*, payer: str, nonce: str) -> None:
+    try:
+        await get_redis().delete(_nonce_key(payer, nonce))
+    except Exception:
+        logger.warning("Could not release nonce for %s", payer, exc_info=True)
+
+
 async def verify_and_settle_via_sidecar(*, sidecar_url: str, payment_payload: dict, requirements: dict) -> X402Settlement:
-    timeout = httpx.Timeout(10.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(
-            f"{sidecar_url.rstrip('/')}/verify-settle",
-            json={"paymentPayload": payment_payload, "requirements": requirements},
+    payer = verify_exact_payment(payment_payload=payment_payload, requirements=requirements)
+    authorization = payment_payload["payload"]["authorization"]
+    nonce = str(authorization["nonce"])
+    if not await claim_authorization_nonce(payer=payer, nonce=nonce, valid_before=int(authorization["validBefore"])):
+        raise PaymentVerificationError("nonce_replayed")
+
+    try:
+        data = await get_x402_sidecar(sidecar_url).post_json(
+            "verify-settle", {"paymentPayload": payment_payload, "requirements": requirements}
         )
-        resp.raise_for_status()
-        data = resp.json()
+    except Exception:
+        # Let the viewer retry the same authorization; the chain rejects it if it did settle.
+        await release_authorization_nonce(payer=payer, nonce=nonce)
+        raise
+    if not isinstance(data, dict):
+        raise ValueError("invalid sidecar response")
 
     transaction = data.get("transaction")
-    payer = data.get("payer")
+    settled_payer = data.get("payer")
     if not isinstance(transaction, str) or not transaction:
         raise ValueError("missing transaction")
-    if not isinstance(payer, str) or not payer:
-        payer = "unknown"
-    return X402Settlement(transaction=transaction, payer=payer)
+    if not isinstance(settled_payer, str) or not settled_payer:
+        settled_payer = payer
+    return X402Settlement(transaction=transaction, payer=settled_payer)
 
 
 async def verify_and_settle_simulated(*, payment_payload: dict) -> X402Settlement:
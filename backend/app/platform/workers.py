@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+import time
+
+from app.platform import metrics
+
+logger = logging.getLogger(__name__)
+
+_RUNS = metrics.counter("worker_runs_total", "Background worker passes by worker and outcome")
+_RUN_LATENCY = metrics.histogram("worker_run_seconds", "Duration of background worker passes")
+
+
+class PeriodicWorker(ABC):
+    """Runs ``run_once`` on an interval in the background until closed.
+
+    ``run_once`` returns True when it stopped at a batch limit and should run again immediately.
+    """
+
+    name = "worker"
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+
+    def enabled(self) -> bool:
+        return True
+
+    @abstractmethod
+    def interval_seconds(self) -> float: ...
+
+    @abstractmethod
+    async def run_once(self) -> bool: ...
+
+    def notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            more = False
+            start = time.perf_counter()
+            try:
+                more = bool(await self.run_once())
+                _RUNS.inc(worker=self.name, outcome="ok")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                _RUNS.inc(worker=self.name, outcome="error")
+                logger.warning("%s pass failed", self.name, exc_info=True)
+            finally:
+                _RUN_LATENCY.observe(time.perf_counter() - start, worker=self.name)
+
+            if more:
+                await asyncio.sleep(0)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds())
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        if not self.enabled():
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+
+    async def aclose(self) -> None:
+        task = self._task
+        self._task = None
+        self._wake = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,73 @@
+import os
+import asyncio
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.main import create_app
+from app.platform.config import settings
+from app.platform.db.models import CircleWalletPoolEntry
+
+
+@pytest.mark.asyncio
+async def test_register_claims_pooled_wallet(monkeypatch: pytest.MonkeyPatch) -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    monkeypatch.setattr(settings, "circle_api_key", "key")
+    monkeypatch.setattr(settings, "circle_entity_secret", "secret")
+    monkeypatch.setattr(settings, "circle_wallet_set_id", "ws")
+
+    engine = create_async_engine(database_url, pool_pre_ping=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            await connection.execute(text("CREATE SCHEMA public"))
+
+        alembic_cfg = Config("alembic.ini")
+        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessionmaker() as session:
+            session.add(
+                CircleWalletPoolEntry(
+                    circle_wallet_id="cw_pooled",
+                    wallet_address="0xpooled",
+                    blockchain=settings.circle_blockchain,
+                )
+            )
+            await session.commit()
+
+        app = create_app()
+
+        from app.features.auth.routes import get_circle_client
+
+        class _UnusedCircle:
+            async def create_developer_wallet(self):
+                raise AssertionError("registration should use the pooled wallet")
+
+        app.dependency_overrides[get_circle_client] = lambda: _UnusedCircle()
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            register = await client.post(
+                "/api/v1/auth/register",
+                json={"email": f"pool-{uuid.uuid4()}@example.com", "password": "pass1234", "is_creator": False},
+            )
+            assert register.status_code == 200
+            token = register.json()["access_token"]
+
+            me = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+            assert me.json()["circle_wallet_id"] == "cw_pooled"
+            assert me.json()["wallet_address"] == "0xpooled"
+
+        async with sessionmaker() as session:
+            entry = (await session.execute(select(CircleWalletPoolEntry))).scalar_one()
+            assert entry.claimed_at is not None
+    finally:
+        await engine.dispose()
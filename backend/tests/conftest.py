@@ -0,0 +1,12 @@
+import pytest_asyncio
+
+from app.platform.db.session import dispose_engine
+from app.platform.redis import close_redis
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _dispose_pooled_engine():
+    # Each test runs on its own event loop; pooled asyncpg and Redis connections must not leak into the next one.
+    yield
+    await close_redis()
+    await dispose_engine()
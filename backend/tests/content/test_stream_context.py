@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.features.content import services
+from app.platform.config import settings
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _Session:
+    def __init__(self, row):
+        self.row = row
+        self.calls = 0
+
+    async def execute(self, statement):
+        self.calls += 1
+        return _Result(self.row)
+
+
+class _Redis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    async def get(self, key: str):
+        return self.values.get(key)
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.fixture(autouse=True)
+def _clear_contexts(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(services, "get_redis", lambda: _Redis())
+    monkeypatch.setattr(settings, "x402_gateway_sidecar_url", None)
+    monkeypatch.setattr(settings, "usdc_address", "0x0000000000000000000000000000000000000001")
+    services._STREAM_CONTEXTS.clear()
+    yield
+    services._STREAM_CONTEXTS.clear()
+
+
+@pytest.mark.asyncio
+async def test_stream_context_is_cached_per_content() -> None:
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    first = await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    second = await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert session.calls == 1
+    assert first is second
+    assert first.chunk_amount == 70
+    assert first.accepts[0]["amount"] == "70"
+    assert first.accepts[0]["payTo"] == "0xseller"
+
+
+@pytest.mark.asyncio
+async def test_stream_context_invalidation_by_content_and_creator() -> None:
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    services.invalidate_stream_context("c1")
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    services.invalidate_creator_stream_contexts("creator1")
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert session.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_context_without_seller_has_no_accepts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "x402_default_seller_address", None)
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, None))
+
+    context = await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert context.seller_address is None
+    assert context.accepts == ()
+
+
+@pytest.mark.asyncio
+async def test_stream_context_dropped_when_another_process_publishes(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis = _Redis()
+    monkeypatch.setattr(services, "get_redis", lambda: redis)
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    await redis.incr("stream_context:generation")
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert session.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_context_served_from_cache_when_redis_is_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _BrokenRedis:
+        async def get(self, key: str):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(services, "get_redis", lambda: _BrokenRedis())
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert session.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_context_cache_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "stream_context_cache_size", 2)
+    session = _Session(("c", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    await services.get_stream_context(session=session, content_id="c2", chunk_seconds=10)
+    await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+    await services.get_stream_context(session=session, content_id="c3", chunk_seconds=10)
+
+    assert list(services._STREAM_CONTEXTS) == ["c1", "c3"]
+
+
+@pytest.mark.asyncio
+async def test_committed_orm_change_publishes_new_generation(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis = _Redis()
+    monkeypatch.setattr(services, "get_redis", lambda: redis)
+    session = Session()
+
+    services._publish_after_commit(session)
+    session.info[services._PENDING_KEY] = True
+    services._publish_after_commit(session)
+    await asyncio.gather(*services._publish_tasks)
+
+    assert redis.values == {"stream_context:generation": 1}
+    assert services._PENDING_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_stream_context_with_fallback_extra_expires_quickly(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def supported_kinds(*, sidecar_url: str):
+        return None
+
+    monkeypatch.setattr(settings, "x402_gateway_sidecar_url", "http://sidecar")
+    monkeypatch.setattr(settings, "stream_context_ttl_seconds", 60.0)
+    monkeypatch.setattr(services, "get_gateway_supported_kinds", supported_kinds)
+    session = _Session(("c1", "creator1", "Title", "bafy", 7, "0xseller"))
+
+    context = await services.get_stream_context(session=session, content_id="c1", chunk_seconds=10)
+
+    assert context.accepts[0]["extra"] == {"name": settings.usdc_name, "version": settings.usdc_version}
+    assert context.expires_at - time.monotonic() <= services._UNRESOLVED_CONTEXT_TTL_SECONDS
@@ -0,0 +1,126 @@
+import os
+import asyncio
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.features.content import services as content_services
+from app.main import create_app
+
+
+@pytest.mark.asyncio
+async def test_stream_credits_are_consumed_in_redis_and_written_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+    if not os.environ.get("REDIS_URL"):
+        pytest.skip("REDIS_URL not set")
+
+    engine = create_async_engine(database_url, pool_pre_ping=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            await connection.execute(text("CREATE SCHEMA public"))
+
+        alembic_cfg = Config("alembic.ini")
+        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+        app = create_app()
+
+        from app.features.auth.routes import get_circle_client
+        from app.platform.services.circle_wallets import CreatedWallet
+
+        class _FakeCircle:
+            async def create_developer_wallet(self) -> CreatedWallet:
+                return CreatedWallet(circle_wallet_id="cw_test", wallet_address="0xabc")
+
+        from app.features.content.routes import get_ipfs_client
+
+        class _FakeIPFS:
+            async def add_bytes(self, data: bytes, filename: str) -> str:
+                return "bafytestcid"
+
+            def playback_url(self, cid: str) -> str:
+                return f"http://localhost:8080/ipfs/{cid}"
+
+        app.dependency_overrides[get_circle_client] = lambda: _FakeCircle()
+        app.dependency_overrides[get_ipfs_client] = lambda: _FakeIPFS()
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            creator_register = await client.post(
+                "/api/v1/auth/register",
+                json={"email": f"creator-{uuid.uuid4()}@example.com", "password": "pass1234", "is_creator": True},
+            )
+            creator_token = creator_register.json()["access_token"]
+
+            upload = await client.post(
+                "/api/v1/content/upload",
+                headers={"Authorization": f"Bearer {creator_token}"},
+                data={
+                    "title": "Test",
+                    "description": "Desc",
+                    "content_type": "tutorial",
+                    "duration_seconds": "120",
+                    "resolution": "1080p",
+                    "bitrate_tier": "high",
+                    "engagement_intent": "learn",
+                },
+                files={"file": ("hello.txt", b"hello", "text/plain")},
+            )
+            content_id = upload.json()["id"]
+
+            user_register = await client.post(
+                "/api/v1/auth/register",
+                json={"email": f"user-{uuid.uuid4()}@example.com", "password": "pass1234", "is_creator": False},
+            )
+            user_token = user_register.json()["access_token"]
+            headers = {"Authorization": f"Bearer {user_token}"}
+
+            pay = await client.post(f"/api/v1/content/{content_id}/pay", headers=headers, json={"chunks": 3})
+            assert pay.json()["seconds_remaining"] == 30
+
+            for expected in (20, 10, 0):
+                stream = await client.get(f"/api/v1/content/{content_id}/stream", headers=headers)
+                assert stream.status_code == 200
+                assert stream.json()["seconds_remaining"] == expected
+
+            exhausted = await client.get(f"/api/v1/content/{content_id}/stream", headers=headers)
+            assert exhausted.status_code == 402
+
+            # The purchase must top up the exhausted Redis key itself; no post-commit sync may be needed.
+            def _sync_unavailable(**kwargs):
+                raise RuntimeError("redis down")
+
+            monkeypatch.setattr(content_services, "sync_stream_credit", _sync_unavailable)
+            repay = await client.post(f"/api/v1/content/{content_id}/pay", headers=headers, json={"chunks": 1})
+            assert repay.status_code == 200
+            assert repay.json()["seconds_remaining"] == 10
+
+            stream = await client.get(f"/api/v1/content/{content_id}/stream", headers=headers)
+            assert stream.status_code == 200
+            assert stream.json()["seconds_remaining"] == 0
+            monkeypatch.undo()
+
+        from app.features.content.services import flush_stream_credits
+        from app.platform.db.models import PaymentChannel, StreamCredit
+
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessionmaker() as session:
+            credit = (await session.execute(select(StreamCredit))).scalar_one()
+            assert credit.seconds_remaining == 40
+
+        async with sessionmaker() as session:
+            assert await flush_stream_credits(session=session, limit=100) >= 1
+
+        async with sessionmaker() as session:
+            credit = (await session.execute(select(StreamCredit))).scalar_one()
+            channel = (await session.execute(select(PaymentChannel))).scalar_one()
+            assert credit.seconds_remaining == 0
+            assert channel.total_seconds_streamed == 40
+    finally:
+        await engine.dispose()
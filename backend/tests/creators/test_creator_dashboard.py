@@ -2,6 +2,7 @@ import os
 import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import pytest
 from alembic import command
@@ -10,7 +11,10 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 
+from app.features.creators import routes as creator_routes
 from app.main import create_app
+from app.platform.db.session import get_sessionmaker
+from app.platform.services.earnings import get_creator_content_earnings, rebuild_creator_earnings
 
 
 @pytest.mark.asyncio
@@ -153,6 +157,14 @@ async def test_creator_dashboard_and_withdraw(monkeypatch: pytest.MonkeyPatch) -
             )
             assert content_earnings.status_code == 200
             assert len(content_earnings.json()) == 1
+            assert content_earnings.json()[0]["amount_gross"] == gross
+
+            me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {creator_token}"})
+            creator_id = me.json()["id"]
+            async with get_sessionmaker()() as session:
+                assert await rebuild_creator_earnings(session, creator_id=creator_id) == 1
+                await session.commit()
+                assert await get_creator_content_earnings(session, creator_id) == [(content_id, "Test", gross)]
 
             withdraw = await client.post(
                 "/api/v1/creators/withdraw",
@@ -162,3 +174,22 @@ async def test_creator_dashboard_and_withdraw(monkeypatch: pytest.MonkeyPatch) -
             assert isinstance(withdraw.json()["tx_id"], str) and withdraw.json()["tx_id"]
     finally:
         await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ValueError("bad address"), RuntimeError("Escrow address not configured")])
+async def test_dashboard_balance_lookup_failure_leaves_balance_unset(
+    monkeypatch: pytest.MonkeyPatch, error: Exception
+) -> None:
+    async def no_index(session, creator_address):
+        return None
+
+    async def failing_lookup(creator_wallet_address, *, refresh=False):
+        raise error
+
+    monkeypatch.setattr(creator_routes, "_live_withdraw_enabled", lambda: True)
+    monkeypatch.setattr(creator_routes, "get_indexed_creator_balance", no_index)
+    monkeypatch.setattr(creator_routes, "_get_escrow_creator_balance_minor", failing_lookup)
+    user = SimpleNamespace(id="creator", wallet_address="0xnot-an-address")
+
+    assert await creator_routes._dashboard_withdrawable_balance(None, user) is None
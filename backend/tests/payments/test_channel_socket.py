@@ -0,0 +1,124 @@
+import os
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.websockets import WebSocketDisconnect
+
+from app.main import create_app
+
+
+def test_channel_socket_rejects_missing_open_frame() -> None:
+    client = TestClient(create_app())
+
+    with client.websocket_connect("/api/v1/payments/channel/ws") as websocket:
+        websocket.send_json({"type": "tick"})
+        with pytest.raises(WebSocketDisconnect) as exc:
+            websocket.receive_json()
+
+    assert exc.value.code == 1008
+
+
+def test_channel_socket_ticks_and_closes(monkeypatch: pytest.MonkeyPatch) -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    async def _reset_schema() -> None:
+        engine = create_async_engine(database_url, pool_pre_ping=True)
+        try:
+            async with engine.begin() as connection:
+                await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+                await connection.execute(text("CREATE SCHEMA public"))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_reset_schema())
+    command.upgrade(Config("alembic.ini"), "head")
+
+    app = create_app()
+
+    from app.features.auth.routes import get_circle_client
+    from app.features.content.routes import get_ipfs_client
+    from app.platform.services.circle_wallets import CreatedWallet
+
+    class _FakeCircle:
+        async def create_developer_wallet(self) -> CreatedWallet:
+            return CreatedWallet(circle_wallet_id="cw_test", wallet_address="0xabc")
+
+    class _FakeIPFS:
+        async def add_bytes(self, data: bytes, filename: str) -> str:
+            return "bafytestcid"
+
+        def playback_url(self, cid: str) -> str:
+            return f"http://localhost:8080/ipfs/{cid}"
+
+    app.dependency_overrides[get_circle_client] = lambda: _FakeCircle()
+    app.dependency_overrides[get_ipfs_client] = lambda: _FakeIPFS()
+
+    from app.features.payments import routes as payments_routes
+
+    base = datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+    times = [base, base + timedelta(seconds=11), base + timedelta(seconds=22)]
+    monkeypatch.setattr(payments_routes, "_utcnow", lambda: times.pop(0) if times else base + timedelta(seconds=999))
+
+    # One portal keeps every request on the same event loop as the pooled connections.
+    with TestClient(app) as client:
+
+        creator_token = client.post(
+            "/api/v1/auth/register",
+            json={"email": f"creator-{uuid.uuid4()}@example.com", "password": "pass1234", "is_creator": True},
+        ).json()["access_token"]
+        upload = client.post(
+            "/api/v1/content/upload",
+            headers={"Authorization": f"Bearer {creator_token}"},
+            data={
+                "title": "Test",
+                "description": "Desc",
+                "content_type": "tutorial",
+                "duration_seconds": "120",
+                "resolution": "1080p",
+                "bitrate_tier": "high",
+                "engagement_intent": "learn",
+            },
+            files={"file": ("hello.txt", b"hello", "text/plain")},
+        )
+        content_id = upload.json()["id"]
+        price_per_second = upload.json()["price_per_second"]
+
+        user_token = client.post(
+            "/api/v1/auth/register",
+            json={"email": f"user-{uuid.uuid4()}@example.com", "password": "pass1234", "is_creator": False},
+        ).json()["access_token"]
+
+        with client.websocket_connect("/api/v1/payments/channel/ws") as websocket:
+            websocket.send_json({"type": "open", "token": user_token, "content_id": content_id})
+            opened = websocket.receive_json()
+            assert opened["type"] == "channel"
+            assert opened["status"] == "active"
+
+            websocket.send_json({"type": "tick"})
+            tick1 = websocket.receive_json()
+            assert tick1["type"] == "tick"
+            assert tick1["tick_seconds"] == 10
+            assert tick1["total_amount_owed"] == price_per_second * 10
+
+            websocket.send_json({"type": "tick"})
+            tick2 = websocket.receive_json()
+            assert tick2["total_amount_owed"] == price_per_second * 20
+
+            websocket.send_json({"type": "close"})
+            closed = websocket.receive_json()
+            assert closed["type"] == "closed"
+            assert closed["status"] == "closed"
+            assert closed["settlement_amount"] == price_per_second * 20
+
+            settlement = websocket.receive_json()
+            assert settlement["type"] == "settlement"
+            assert settlement["channel_id"] == opened["id"]
@@ -0,0 +1,137 @@
+import os
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.main import create_app
+
+
+@pytest.mark.asyncio
+async def test_sweeper_settles_and_closes_idle_channels(monkeypatch: pytest.MonkeyPatch) -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    engine = create_async_engine(database_url, pool_pre_ping=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            await connection.execute(text("CREATE SCHEMA public"))
+
+        alembic_cfg = Config("alembic.ini")
+        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+        app = create_app()
+
+        from app.features.auth.routes import get_circle_client
+        from app.platform.services.circle_wallets import CreatedWallet
+
+        class _FakeCircle:
+            async def create_developer_wallet(self) -> CreatedWallet:
+                return CreatedWallet(circle_wallet_id="cw_test", wallet_address="0xabc")
+
+        from app.features.content.routes import get_ipfs_client
+
+        class _FakeIPFS:
+            async def add_bytes(self, data: bytes, filename: str) -> str:
+                return "bafytestcid"
+
+            def playback_url(self, cid: str) -> str:
+                return f"http://localhost:8080/ipfs/{cid}"
+
+        app.dependency_overrides[get_circle_client] = lambda: _FakeCircle()
+        app.dependency_overrides[get_ipfs_client] = lambda: _FakeIPFS()
+
+        from app.features.payments import routes as payments_routes
+
+        base = datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        monkeypatch.setattr(payments_routes, "_utcnow", lambda: base)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            creator_email = f"creator-{uuid.uuid4()}@example.com"
+            creator_register = await client.post(
+                "/api/v1/auth/register",
+                json={"email": creator_email, "password": "pass1234", "is_creator": True},
+            )
+            assert creator_register.status_code == 200
+            creator_token = creator_register.json()["access_token"]
+
+            upload = await client.post(
+                "/api/v1/content/upload",
+                headers={"Authorization": f"Bearer {creator_token}"},
+                data={
+                    "title": "Test",
+                    "description": "Desc",
+                    "content_type": "tutorial",
+                    "duration_seconds": "120",
+                    "resolution": "1080p",
+                    "bitrate_tier": "high",
+                    "engagement_intent": "learn",
+                },
+                files={"file": ("hello.txt", b"hello", "text/plain")},
+            )
+            assert upload.status_code == 200
+            content_id = upload.json()["id"]
+            price_per_second = upload.json()["price_per_second"]
+
+            user_email = f"user-{uuid.uuid4()}@example.com"
+            user_register = await client.post(
+                "/api/v1/auth/register",
+                json={"email": user_email, "password": "pass1234", "is_creator": False},
+            )
+            assert user_register.status_code == 200
+            user_token = user_register.json()["access_token"]
+
+            open_resp = await client.post(
+                "/api/v1/payments/channel/open",
+                headers={"Authorization": f"Bearer {user_token}"},
+                json={"content_id": content_id},
+            )
+            channel_id = open_resp.json()["id"]
+
+            tick = await client.post(
+                "/api/v1/payments/channel/tick",
+                headers={"Authorization": f"Bearer {user_token}"},
+                json={"channel_id": channel_id},
+            )
+            assert tick.status_code == 200
+
+        from app.features.payments.services import compact_channel_events, flush_pending_ticks, sweep_idle_channels
+        from app.platform.db.models import PaymentChannel, Settlement, StreamCredit
+        from app.platform.db.session import get_sessionmaker
+
+        # An earlier, fully spent purchase for the same content must not waive this channel's tick debt.
+        async with get_sessionmaker()() as session:
+            channel_row = await session.get(PaymentChannel, channel_id)
+            session.add(StreamCredit(user_id=channel_row.user_id, content_id=content_id, seconds_remaining=0))
+            await session.commit()
+
+        if os.environ.get("REDIS_URL"):
+            async with get_sessionmaker()() as session:
+                await flush_pending_ticks(session=session, limit=10)
+        async with get_sessionmaker()() as session:
+            assert await compact_channel_events(session=session, limit=10) == 1
+
+        fresh = await sweep_idle_channels(circle=None, now=base + timedelta(minutes=1), limit=10)
+        assert fresh == 0
+
+        swept = await sweep_idle_channels(circle=None, now=base + timedelta(hours=1), limit=10)
+        assert swept == 1
+
+        async with engine.connect() as connection:
+            channel = (await connection.execute(select(PaymentChannel).where(PaymentChannel.id == channel_id))).one()
+            settlements = (await connection.execute(select(Settlement).where(Settlement.channel_id == channel_id))).all()
+
+        assert channel.status == "closed"
+        assert channel.total_amount_settled == price_per_second * 10
+        assert len(settlements) == 1
+        assert settlements[0].amount == price_per_second * 10
+    finally:
+        await engine.dispose()
@@ -0,0 +1,190 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.features.payments import services
+from app.platform import metrics
+from app.platform.db.models import Content, PaymentChannel, User
+from app.platform.db.session import get_sessionmaker
+
+
+def _channel(**overrides) -> PaymentChannel:
+    values = dict(
+        id=str(uuid.uuid4()),
+        user_id="u1",
+        content_id="c1",
+        status="active",
+        price_per_second_locked=3,
+        total_seconds_streamed=0,
+        total_amount_owed=0,
+        total_amount_settled=0,
+        last_tick_at=None,
+    )
+    values.update(overrides)
+    return PaymentChannel(**values)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_compaction_folds_tick_events_into_snapshot() -> None:
+    channel = _channel(total_seconds_streamed=30, total_amount_owed=90, total_amount_settled=90)
+    now = datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+    session = _Session(
+        [
+            ("tick", 10, 30, now),
+            ("settlement", 0, 90, now + timedelta(seconds=5)),
+            ("tick", 20, 60, now + timedelta(seconds=20)),
+        ]
+    )
+
+    await services._compact_channel_events(session, channel)
+
+    assert "channel_events" in str(session.statements[0])
+    assert channel.total_seconds_streamed == 60
+    assert channel.total_amount_owed == 180
+    assert channel.total_amount_settled == 90
+    assert channel.last_tick_at == now + timedelta(seconds=20)
+
+
+@pytest.mark.asyncio
+async def test_record_tick_reports_degraded_when_redis_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _BrokenRedis:
+        def register_script(self, source):
+            async def _call(*, keys, args):
+                raise ConnectionError("redis down")
+
+            return _call
+
+    monkeypatch.setattr(services, "get_redis", lambda: _BrokenRedis())
+    services._scripts.clear()
+    try:
+        result = await services.record_tick(channel=_channel(), now=datetime.now(timezone.utc))
+    finally:
+        services._scripts.clear()
+
+    assert result is None
+    assert metrics.gauge("channel_tick_degraded", "").value() == 1
+
+
+@pytest.mark.asyncio
+async def test_record_tick_dedups_and_folds_in_redis() -> None:
+    if not os.environ.get("REDIS_URL"):
+        pytest.skip("REDIS_URL not set")
+
+    channel = _channel()
+    now = datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+    first = await services.record_tick(channel=channel, now=now)
+    duplicate = await services.record_tick(channel=channel, now=now + timedelta(seconds=5))
+    second = await services.record_tick(channel=channel, now=now + timedelta(seconds=11))
+
+    assert first is not None and first.counted and first.pending_owed == 30
+    assert duplicate is not None and not duplicate.counted and duplicate.pending_seconds == 10
+    assert second is not None and second.counted and second.pending_seconds == 20
+
+    folded = await services.fold_pending_ticks(_Session(), channel)
+    assert folded is not None
+    assert channel.total_seconds_streamed == 20
+    assert channel.total_amount_owed == 60
+    assert channel.last_tick_at == now + timedelta(seconds=11)
+    assert await services.fold_pending_ticks(_Session(), channel) is None
+
+
+@pytest.mark.asyncio
+async def test_close_during_flush_still_counts_the_flushed_ticks(monkeypatch: pytest.MonkeyPatch) -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+    if not os.environ.get("REDIS_URL"):
+        pytest.skip("REDIS_URL not set")
+
+    engine = create_async_engine(database_url, pool_pre_ping=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            await connection.execute(text("CREATE SCHEMA public"))
+    finally:
+        await engine.dispose()
+    await asyncio.to_thread(command.upgrade, Config("alembic.ini"), "head")
+
+    sessionmaker = get_sessionmaker()
+    async with sessionmaker() as session:
+        creator = User(email=f"creator-{uuid.uuid4()}@example.com", hashed_password="x", is_creator=True)
+        viewer = User(email=f"user-{uuid.uuid4()}@example.com", hashed_password="x")
+        session.add_all([creator, viewer])
+        await session.flush()
+        content = Content(
+            creator_id=creator.id,
+            title="Test",
+            description="Desc",
+            content_type="tutorial",
+            duration_seconds=120,
+            resolution="1080p",
+            bitrate_tier="high",
+            engagement_intent="learn",
+            quality_score=5,
+            suggested_price_per_second=3,
+            price_per_second=3,
+            ipfs_cid="bafytestcid",
+        )
+        session.add(content)
+        await session.flush()
+        channel = _channel(user_id=viewer.id, content_id=content.id)
+        session.add(channel)
+        await session.commit()
+
+    assert await services.record_tick(channel=channel, now=datetime.now(timezone.utc)) is not None
+
+    async def _close() -> None:
+        async with sessionmaker() as session:
+            locked = (await session.execute(services.lock_channel(channel.id))).scalar_one()
+            await services.fold_pending_ticks(session, locked)
+            services.close_channel_row(session, locked, now=datetime.now(timezone.utc))
+            await session.commit()
+
+    take = services._take_pending
+    closing: list[asyncio.Task] = []
+
+    async def _take_then_close(channel_id: str):
+        pending = await take(channel_id)
+        if channel_id == channel.id and not closing:
+            # The close lands after the flush has taken the Redis deltas but before it logs them.
+            closing.append(asyncio.create_task(_close()))
+            await asyncio.wait(closing, timeout=0.5)
+        return pending
+
+    monkeypatch.setattr(services, "_take_pending", _take_then_close)
+    async with sessionmaker() as session:
+        await services.flush_pending_ticks(session=session, limit=100)
+    await asyncio.gather(*closing)
+
+    async with sessionmaker() as session:
+        closed = await session.get(PaymentChannel, channel.id)
+        assert closed.status == "closed"
+        assert closed.total_seconds_streamed == 10
+        assert closed.total_amount_owed == 30
+        assert (await services.pending_channel_events(session, channel.id)).seconds == 0
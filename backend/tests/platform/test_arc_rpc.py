@@ -0,0 +1,116 @@
+import json
+
+import httpx
+import pytest
+
+from app.platform.config import settings
+from app.platform.services import chain
+from app.platform.services.chain import ArcRpcClient, ArcRpcError, abi_encode_address, function_selector
+
+
+def test_abi_helpers() -> None:
+    assert function_selector("balanceOf(address)") == "0x70a08231"
+    assert abi_encode_address("0x" + "AB" * 20) == "0" * 24 + "ab" * 20
+    with pytest.raises(ValueError):
+        abi_encode_address("0x1234")
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_one_request_and_orders_results() -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        results = [{"jsonrpc": "2.0", "id": item["id"], "result": hex(index + 1)} for index, item in enumerate(body)]
+        return httpx.Response(200, json=list(reversed(results)))
+
+    client = ArcRpcClient("http://rpc.test", transport=httpx.MockTransport(handler))
+    try:
+        results = await client.eth_calls([("0x01", "0xaa"), ("0x02", "0xbb"), ("0x03", "0xcc")])
+    finally:
+        await client.aclose()
+
+    assert len(requests) == 1
+    assert [item["params"][0]["to"] for item in requests[0]] == ["0x01", "0x02", "0x03"]
+    assert results == ["0x1", "0x2", "0x3"]
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_status_then_raises_rpc_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "arc_rpc_retry_backoff_seconds", 0.0)
+    statuses = [503, 200, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        status = statuses.pop(0)
+        if status != 200:
+            return httpx.Response(status)
+        if body["method"] == "eth_blockNumber":
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": "0x10"})
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32000, "message": "revert"}})
+
+    client = ArcRpcClient("http://rpc.test", max_retries=2, transport=httpx.MockTransport(handler))
+    try:
+        assert await client.block_number() == 16
+        with pytest.raises(ArcRpcError):
+            await client.eth_call("0x01", "0xaa")
+    finally:
+        await client.aclose()
+
+    assert statuses == []
+
+
+@pytest.mark.asyncio
+async def test_escrow_usdc_address_is_memoized_until_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body["params"][0])
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": "0x" + "0" * 24 + "Ab" * 20})
+
+    monkeypatch.setattr(settings, "arc_rpc_url", "http://rpc.test")
+    rpc = ArcRpcClient("http://rpc.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(chain._arc_rpcs, "http://rpc.test", rpc)
+    chain.forget_escrow_config()
+    try:
+        first = await chain.get_escrow_usdc_address("0x" + "11" * 20)
+        second = await chain.get_escrow_usdc_address("0x" + "11" * 20)
+        await chain.get_escrow_usdc_address("0x" + "11" * 20, refresh=True)
+    finally:
+        chain.forget_escrow_config()
+        await rpc.aclose()
+
+    assert first == second == "0x" + "ab" * 20
+    assert len(calls) == 2
+    assert calls[0]["data"] == function_selector("usdc()")
+
+
+@pytest.mark.asyncio
+async def test_rpc_clients_are_kept_per_url_and_all_closed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "arc_rpc_url", "http://rpc-a.test")
+    first = chain.get_arc_rpc()
+    assert chain.get_arc_rpc() is first
+    monkeypatch.setattr(settings, "arc_rpc_url", "http://rpc-b.test")
+    second = chain.get_arc_rpc()
+    first._get_client()
+    second._get_client()
+
+    await chain.close_arc_rpc()
+
+    assert first._client is None and second._client is None
+    assert chain.get_arc_rpc() is not second
+    await chain.close_arc_rpc()
+
+
+def test_abi_encode_call_handles_dynamic_bytes() -> None:
+    from app.platform.services.chain import abi_encode_call
+
+    calldata = abi_encode_call("f(uint256,bytes)", [1, "0xabcd"])
+
+    assert calldata[:10] == function_selector("f(uint256,bytes)")
+    words = [calldata[10 + i : 74 + i] for i in range(0, len(calldata) - 10, 64)]
+    assert [int(word, 16) for word in words[:3]] == [1, 64, 2]
+    assert words[3].startswith("abcd")
+    assert abi_encode_call("withdrawCreator()", []) == function_selector("withdrawCreator()")
@@ -0,0 +1,44 @@
+import json
+
+import httpx
+import pytest
+
+from app.platform.config import settings
+from app.platform.services import balances, chain
+from app.platform.services.chain import ArcRpcClient, function_selector
+
+
+@pytest.mark.asyncio
+async def test_balances_are_batched_and_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    posts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        items = body if isinstance(body, list) else [body]
+        posts.append(items)
+        results = [
+            {"jsonrpc": "2.0", "id": item["id"], "result": "0x" + item["params"][0]["data"][-2:].rjust(64, "0")}
+            for item in items
+        ]
+        return httpx.Response(200, json=results if isinstance(body, list) else results[0])
+
+    monkeypatch.setattr(settings, "arc_rpc_url", "http://rpc.test")
+    monkeypatch.setattr(settings, "usdc_address", "0x" + "55" * 20)
+    monkeypatch.setattr(settings, "arc_balance_batch_size", 2)
+    monkeypatch.setattr(settings, "arc_balance_cache_ttl_seconds", 60.0)
+    rpc = ArcRpcClient("http://rpc.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(chain._arc_rpcs, "http://rpc.test", rpc)
+    balances.forget_balances()
+    holders = ["0x" + "0" * 38 + suffix for suffix in ("01", "02", "0A")]
+    try:
+        first = await balances.read_usdc_balances(holders + [holders[0].upper().replace("0X", "0x")])
+        second = await balances.read_usdc_balances(holders[:2])
+        await balances.read_usdc_balances(holders[:1], refresh=True)
+    finally:
+        balances.forget_balances()
+        await rpc.aclose()
+
+    assert first == {holders[0]: 1, holders[1]: 2, holders[2].lower(): 10}
+    assert second == {holders[0]: 1, holders[1]: 2}
+    assert [len(items) for items in posts] == [2, 1, 1]
+    assert posts[0][0]["params"][0]["data"].startswith(function_selector("balanceOf(address)"))
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from app.platform.config import settings
+from app.platform.services.block_height import BlockHeightTracker
+
+
+class _Rpc:
+    def __init__(self, heights):
+        self.heights = heights
+        self.calls = 0
+
+    async def block_number(self):
+        self.calls += 1
+        return self.heights.pop(0)
+
+
+class _Redis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        value, expires_at = self.values.get(key, (None, 0.0))
+        return value if expires_at > time.monotonic() else None
+
+    async def set(self, key, value, px=None):
+        self.values[key] = (str(value), time.monotonic() + px / 1000)
+
+
+@pytest.mark.asyncio
+async def test_trackers_share_one_poll_through_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "arc_block_poll_interval_seconds", 60.0)
+    redis = _Redis()
+    rpc = _Rpc([100])
+
+    first = BlockHeightTracker(rpc=rpc, redis=redis)
+    second = BlockHeightTracker(rpc=rpc, redis=redis)
+
+    assert await first.current() == 100
+    assert await second.current() == 100
+    assert await first.current() == 100
+    assert rpc.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_for_block_polls_until_reached(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "arc_block_poll_interval_seconds", 0.001)
+    rpc = _Rpc([10, 11, 9, 13])
+    tracker = BlockHeightTracker(rpc=rpc, redis=_Redis())
+
+    assert await tracker.wait_for_block(12, timeout=1.0) == 13
+    assert rpc.calls == 4
+
+    with pytest.raises(TimeoutError):
+        await BlockHeightTracker(rpc=_Rpc([1] * 1000), redis=_Redis()).wait_for_block(5, timeout=0.01)
@@ -73,3 +73,105 @@ async def test_create_contract_execution_transaction_requires_tx_id(monkeypatch:
             abi_parameters=[],
         )
 
+
+
+@pytest.mark.asyncio
+async def test_client_is_built_once_and_ciphertexts_are_single_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "circle_api_key", "key")
+    monkeypatch.setattr(settings, "circle_entity_secret", "secret")
+
+    inits = []
+    counter = {"n": 0}
+    seen = []
+
+    def fake_init(*, api_key: str, entity_secret: str):
+        inits.append((api_key, entity_secret))
+        return object()
+
+    def fake_cipher(api_key: str, entity_secret: str) -> str:
+        counter["n"] += 1
+        return f"ciphertext-{counter['n']}"
+
+    class FakeSigningApi:
+        def __init__(self, client):
+            self.client = client
+
+        def sign_typed_data(self, request):
+            seen.append(request.entity_secret_ciphertext)
+            return types.SimpleNamespace(data=types.SimpleNamespace(signature="0xsig"))
+
+    monkeypatch.setattr("app.platform.services.circle_wallets.utils.init_developer_controlled_wallets_client", fake_init)
+    monkeypatch.setattr("app.platform.services.circle_wallets.utils.generate_entity_secret_ciphertext", fake_cipher)
+    monkeypatch.setattr("app.platform.services.circle_wallets.developer_controlled_wallets.SigningApi", FakeSigningApi)
+
+    client = CircleWalletsClient(ciphertext_pool_size=4, ciphertext_low_watermark=1)
+    await client.start()
+    await client._refill_task
+    assert client.ciphertext_pool_depth == 4
+
+    for _ in range(6):
+        await client.sign_typed_data(wallet_id="wid", blockchain="ARC-TESTNET", typed_data={"x": 1})
+
+    await client.aclose()
+
+    assert len(inits) == 1
+    assert len(seen) == 6
+    assert len(set(seen)) == 6
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_calls_beyond_queue_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    import asyncio
+    import threading
+
+    from app.platform.services.circle_wallets import CircleBackpressureError
+
+    monkeypatch.setattr(settings, "circle_executor_max_workers", 1)
+    monkeypatch.setattr(settings, "circle_executor_queue_limit", 1)
+
+    release = threading.Event()
+    client = CircleWalletsClient(ciphertext_pool_size=0)
+
+    first = asyncio.ensure_future(client._run("sign", release.wait))
+    second = asyncio.ensure_future(client._run("sign", release.wait))
+    await asyncio.sleep(0)
+    assert client.pending_calls == 2
+
+    with pytest.raises(CircleBackpressureError):
+        await client._run("sign", release.wait)
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert client.pending_calls == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_create_developer_wallets_requests_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "circle_api_key", "key")
+    monkeypatch.setattr(settings, "circle_entity_secret", "secret")
+    monkeypatch.setattr(settings, "circle_wallet_set_id", "ws")
+
+    calls = {}
+
+    class FakeWalletsApi:
+        def __init__(self, client):
+            self.client = client
+
+        def create_wallet(self, request):
+            calls["count"] = request.count
+            wallets = [types.SimpleNamespace(id=f"w{i}", address=f"0x{i:040x}") for i in range(request.count)]
+            return types.SimpleNamespace(data=types.SimpleNamespace(wallets=wallets))
+
+    monkeypatch.setattr(
+        "app.platform.services.circle_wallets.utils.init_developer_controlled_wallets_client",
+        lambda *, api_key, entity_secret: object(),
+    )
+    monkeypatch.setattr("app.platform.services.circle_wallets.developer_controlled_wallets.WalletsApi", FakeWalletsApi)
+
+    client = CircleWalletsClient(ciphertext_pool_size=0)
+    wallets = await client.create_developer_wallets(count=5)
+    await client.aclose()
+
+    assert calls["count"] == 5
+    assert [w.circle_wallet_id for w in wallets] == ["w0", "w1", "w2", "w3", "w4"]
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.pool import NullPool
+
+from app.platform.config import settings
+from app.platform.db import session as db_session
+
+
+def test_engine_options_follow_pool_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_max_overflow", 3)
+    monkeypatch.setattr(settings, "db_statement_cache_size", 250)
+    monkeypatch.setattr(settings, "db_pgbouncer_mode", False)
+
+    options = db_session._engine_options()
+    assert options["poolclass"] is db_session._TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert options["connect_args"]["prepared_statement_cache_size"] == 250
+
+    monkeypatch.setattr(settings, "db_pgbouncer_mode", True)
+    monkeypatch.setattr(settings, "db_pool_size", 0)
+    options = db_session._engine_options()
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    names = {options["connect_args"]["prepared_statement_name_func"]() for _ in range(2)}
+    assert len(names) == 2
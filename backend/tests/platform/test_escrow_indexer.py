@@ -0,0 +1,139 @@
+import pytest
+
+from app.platform.config import settings
+from app.platform.db.models import ChainCursor
+from app.platform.services import escrow_indexer
+
+_ESCROW = "0x" + "EE" * 20
+_CREATOR = "0x" + "cc" * 20
+_VIEWER = "0x" + "aa" * 20
+
+
+def _topic(address: str) -> str:
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def _data(*words: int) -> str:
+    return "0x" + "".join(hex(word)[2:].rjust(64, "0") for word in words)
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _Session:
+    def __init__(self, cursor=None):
+        self.cursor = cursor
+        self.upserts = []
+        self.added = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            return _Result(True)
+        self.upserts.append(statement.compile().params)
+        return _Result(None)
+
+    async def get(self, model, key):
+        return self.cursor
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class _Rpc:
+    def __init__(self, logs):
+        self.logs = logs
+        self.ranges = []
+
+    async def get_logs(self, *, address, topics, from_block, to_block):
+        self.ranges.append((from_block, to_block))
+        return self.logs
+
+
+def test_aggregate_folds_streamed_and_withdrawn_per_creator() -> None:
+    logs = [
+        {
+            "topics": [escrow_indexer.STREAMED_TOPIC, _topic(_VIEWER), _topic(_CREATOR)],
+            "data": _data(100, 90, 10),
+            "blockNumber": "0x5",
+        },
+        {
+            "topics": [escrow_indexer.STREAMED_TOPIC, _topic(_VIEWER), _topic(_CREATOR)],
+            "data": _data(50, 45, 5),
+            "blockNumber": "0x7",
+            "removed": True,
+        },
+        {
+            "topics": [escrow_indexer.CREATOR_WITHDRAWN_TOPIC, _topic(_CREATOR)],
+            "data": _data(30),
+            "blockNumber": "0x9",
+        },
+    ]
+
+    deltas = escrow_indexer._aggregate(logs)
+
+    assert list(deltas) == [_CREATOR]
+    assert (deltas[_CREATOR].streamed, deltas[_CREATOR].withdrawn, deltas[_CREATOR].last_block) == (90, 30, 9)
+
+
+@pytest.mark.asyncio
+async def test_index_advances_cursor_by_confirmed_block_range(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "escrow_indexer_confirmations", 3)
+    monkeypatch.setattr(settings, "escrow_indexer_block_range", 100)
+    logs = [
+        {
+            "topics": [escrow_indexer.STREAMED_TOPIC, _topic(_VIEWER), _topic(_CREATOR)],
+            "data": _data(100, 90, 10),
+            "blockNumber": "0x20",
+        }
+    ]
+    session = _Session(ChainCursor(name="escrow_logs:" + _ESCROW.lower(), block_number=9))
+    rpc = _Rpc(logs)
+
+    catching_up = await escrow_indexer.index_escrow_logs(session=session, rpc=rpc, escrow_address=_ESCROW, head=503)
+
+    assert catching_up is True
+    assert rpc.ranges == [(10, 109)]
+    assert session.cursor.block_number == 109
+    assert session.commits == 1
+    (upsert,) = session.upserts
+    assert upsert["escrow_address"] == _ESCROW.lower()
+    assert upsert["creator_address"] == _CREATOR
+    assert upsert["total_streamed"] == 90
+
+    assert await escrow_indexer.index_escrow_logs(session=session, rpc=rpc, escrow_address=_ESCROW, head=112) is False
+    assert len(rpc.ranges) == 1
+
+
+@pytest.mark.asyncio
+async def test_indexed_balance_withheld_until_cursor_reaches_confirmed_head(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Tracker:
+        async def current(self) -> int:
+            return 503
+
+    class _BalanceSession(_Session):
+        async def execute(self, statement, params=None):
+            return _Result(42)
+
+    monkeypatch.setattr(settings, "arc_rpc_url", "http://rpc")
+    monkeypatch.setattr(settings, "escrow_address", _ESCROW)
+    monkeypatch.setattr(settings, "escrow_indexer_confirmations", 3)
+    monkeypatch.setattr(escrow_indexer, "get_block_height_tracker", lambda: _Tracker())
+    cursor = ChainCursor(name="escrow_logs:" + _ESCROW.lower(), block_number=109)
+    session = _BalanceSession(cursor)
+
+    assert await escrow_indexer.get_indexed_creator_balance(session, _CREATOR) is None
+
+    cursor.block_number = 500
+    assert await escrow_indexer.get_indexed_creator_balance(session, _CREATOR) == 42
@@ -0,0 +1,86 @@
+import pytest
+
+from app.platform.config import settings
+from app.platform.services import circle_wallets
+from app.platform.services.chain import erc3009_typed_data
+from app.platform.services.eip712 import hash_typed_data, recover_address
+from app.platform.services.local_signer import LocalSignerClient
+
+
+@pytest.mark.asyncio
+async def test_local_signer_signs_for_its_wallet_addresses() -> None:
+    signer = LocalSignerClient(seed="test", latency_seconds=0.0, confirm_seconds=0.0, db_path="")
+    wallet = await signer.create_developer_wallet()
+    typed = erc3009_typed_data(
+        primary_type="ReceiveWithAuthorization",
+        domain={"name": "USDC", "version": "2", "chainId": 5042002, "verifyingContract": "0x" + "33" * 20},
+        message={
+            "from": wallet.wallet_address,
+            "to": "0x" + "22" * 20,
+            "value": 5000,
+            "validAfter": 0,
+            "validBefore": 2**40,
+            "nonce": "0x" + "ab" * 32,
+        },
+    )
+
+    signature = await signer.sign_typed_data(wallet_id=wallet.circle_wallet_id, blockchain="ARC-TESTNET", typed_data=typed)
+
+    assert recover_address(hash_typed_data(typed), bytes.fromhex(signature[2:])) == wallet.wallet_address
+    assert LocalSignerClient(seed="test", db_path="").wallet_address(wallet.circle_wallet_id) == wallet.wallet_address
+
+
+@pytest.mark.asyncio
+async def test_local_transactions_persist_and_confirm(tmp_path) -> None:
+    db_path = str(tmp_path / "signer.db")
+    signer = LocalSignerClient(seed="test", latency_seconds=0.0, confirm_seconds=3600.0, db_path=db_path)
+    tx_id = await signer.create_contract_execution_transaction(
+        wallet_id="local-1",
+        blockchain="ARC-TESTNET",
+        contract_address="0x" + "44" * 20,
+        abi_function_signature="withdrawCreator()",
+        abi_parameters=[],
+        ref_id="creator-withdraw:u1",
+    )
+    pending = await signer.get_transaction(tx_id=tx_id)
+    await signer.aclose()
+
+    reopened = LocalSignerClient(seed="test", latency_seconds=0.0, confirm_seconds=0.0, db_path=db_path)
+    try:
+        done = await reopened.get_transaction(tx_id=tx_id)
+        with pytest.raises(RuntimeError):
+            await reopened.get_transaction(tx_id="missing")
+    finally:
+        await reopened.aclose()
+
+    assert pending["state"] == "SENT" and pending["txHash"] is None
+    assert done["state"] == "COMPLETE" and done["refId"] == "creator-withdraw:u1"
+    assert done["txHash"].startswith("0x") and done["blockHeight"] > 0
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"circle_api_key": "live-key"},
+        {"circle_entity_secret": "secret"},
+        {"app_env": "production"},
+    ],
+)
+def test_local_signer_refused_outside_dev_or_beside_circle_credentials(
+    monkeypatch: pytest.MonkeyPatch, overrides: dict
+) -> None:
+    monkeypatch.setattr(circle_wallets, "_circle_wallets", None)
+    monkeypatch.setattr(settings, "circle_signer_backend", "local")
+    monkeypatch.setattr(settings, "circle_api_key", None)
+    monkeypatch.setattr(settings, "circle_entity_secret", None)
+    monkeypatch.setattr(settings, "circle_wallet_set_id", None)
+    monkeypatch.setattr(settings, "app_env", "development")
+    assert circle_wallets.circle_signing_enabled()
+
+    for name, value in overrides.items():
+        monkeypatch.setattr(settings, name, value)
+
+    with pytest.raises(RuntimeError):
+        circle_wallets.circle_signing_enabled()
+    with pytest.raises(RuntimeError):
+        circle_wallets.get_circle_wallets()
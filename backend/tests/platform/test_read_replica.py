@@ -0,0 +1,113 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from app.platform.config import settings
+from app.platform.db import replica
+from app.platform.db import session as db_session
+from app.platform.security import create_access_token
+
+
+class _Redis:
+    def __init__(self, log: list[str]) -> None:
+        self.keys: set[str] = set()
+        self.log = log
+
+    async def set(self, key: str, value: str, ex: int) -> None:
+        self.log.append("fence")
+        self.keys.add(key)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.keys)
+
+
+class _Result:
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class _Session:
+    def __init__(self, user) -> None:
+        self.user = user
+        self.info: dict = {}
+
+    async def execute(self, statement) -> _Result:
+        return _Result(self.user)
+
+
+async def _bound_host(credentials) -> str:
+    sessions = replica.get_read_session(credentials)
+    session = await sessions.__anext__()
+    try:
+        return session.bind.url.host
+    finally:
+        await sessions.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_unless_lagging_or_caller_just_wrote(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "database_url", "postgresql+asyncpg://u:p@primary/db")
+    monkeypatch.setattr(settings, "database_replica_url", "postgresql+asyncpg://u:p@replica/db")
+    writers = {"writer"}
+
+    async def has_recent_write(user_id: str) -> bool:
+        return user_id in writers
+
+    monkeypatch.setattr(replica, "has_recent_write", has_recent_write)
+    reader = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("reader"))
+    writer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("writer"))
+
+    monkeypatch.setattr(replica, "_replica_healthy", False)
+    assert await _bound_host(None) == "primary"
+
+    monkeypatch.setattr(replica, "_replica_healthy", True)
+    assert await _bound_host(None) == "replica"
+    assert await _bound_host(reader) == "replica"
+    assert await _bound_host(writer) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_write_fence_is_set_before_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "database_url", "postgresql+asyncpg://u:p@primary/db")
+    monkeypatch.setattr(settings, "database_replica_url", "postgresql+asyncpg://u:p@replica/db")
+    monkeypatch.setattr(replica, "_replica_healthy", True)
+    log: list[str] = []
+    redis = _Redis(log)
+    monkeypatch.setattr(db_session, "get_redis", lambda: redis)
+
+    session = db_session.get_sessionmaker()()
+    event.listen(session.sync_session, "after_commit", lambda _: log.append("commit"))
+    session.info.update(user_id="writer", wrote=True)
+    await session.commit()
+    await session.close()
+    assert log == ["fence", "commit"]
+
+    writer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("writer"))
+    assert await _bound_host(writer) == "primary"
+    # An anonymous read cannot be tied to anyone's write, which is why the client sends its token on
+    # public content reads too.
+    assert await _bound_host(None) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_current_reader_uses_the_read_session_and_falls_back_to_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("u1"))
+    user = SimpleNamespace(id="u1")
+
+    read_session = _Session(user)
+    assert await replica.get_current_reader(credentials, read_session) is user
+    assert read_session.info["user_id"] == "u1"
+
+    # A lagging replica may not have the account yet.
+    @asynccontextmanager
+    async def _primary():
+        yield _Session(user)
+
+    monkeypatch.setattr(replica, "get_sessionmaker", lambda: _primary)
+    assert await replica.get_current_reader(credentials, _Session(None)) is user
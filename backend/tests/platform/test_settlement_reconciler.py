@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.platform.config import settings
+from app.platform.services import settlements
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, claimed):
+        self.claimed = claimed
+        self.updates = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        if not self.updates and self.claimed is not None:
+            claimed, self.claimed = self.claimed, None
+            return _Result(claimed)
+        self.updates.append(statement.compile().params)
+        return _Result([])
+
+    async def commit(self):
+        self.commits += 1
+
+
+class _FakeCircle:
+    def __init__(self, transactions):
+        self.transactions = transactions
+        self.polled = []
+
+    async def get_transaction(self, *, tx_id: str) -> dict:
+        self.polled.append(tx_id)
+        tx = self.transactions[tx_id]
+        if isinstance(tx, Exception):
+            raise tx
+        return tx
+
+
+def test_simulated_settlements_are_final_on_insert() -> None:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    simulated = settlements.new_settlement(channel_id="ch", amount=5, tx_id="simulated:abc", now=now)
+    live = settlements.new_settlement(channel_id="ch", amount=5, tx_id="circle-tx", now=now)
+
+    assert simulated.state == "SIMULATED" and simulated.next_check_at is None
+    assert live.state == "INITIATED" and live.next_check_at == now
+
+
+@pytest.mark.asyncio
+async def test_reconcile_writes_final_state_and_backs_off_pending(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "settlement_reconcile_backoff_seconds", 2.0)
+    monkeypatch.setattr(settings, "settlement_reconcile_max_backoff_seconds", 300.0)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    session = _Session([("s1", "tx-done", 0), ("s2", "tx-sent", 3), ("s3", "tx-error", 0)])
+    circle = _FakeCircle(
+        {
+            "tx-done": {"state": "COMPLETE", "txHash": "0xhash", "blockHeight": "42"},
+            "tx-sent": {"state": "SENT"},
+            "tx-error": RuntimeError("circle down"),
+        }
+    )
+
+    reconciled = await settlements.reconcile_settlements(session=session, circle=circle, now=now, limit=10)
+
+    assert reconciled == 3
+    assert sorted(circle.polled) == ["tx-done", "tx-error", "tx-sent"]
+    done, sent, errored = session.updates
+
+    assert done["state"] == "COMPLETE"
+    assert done["chain_tx_hash"] == "0xhash"
+    assert done["block_height"] == 42
+    assert done["next_check_at"] is None
+
+    assert sent["state"] == "SENT"
+    assert sent["next_check_at"] == now + timedelta(seconds=16)
+    assert sent["check_attempts"] == 4
+
+    assert "state" not in errored
+    assert errored["next_check_at"] == now + timedelta(seconds=2)
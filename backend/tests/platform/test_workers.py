@@ -0,0 +1,12 @@
+import pytest
+
+from app.platform.workers import PeriodicWorker
+
+
+def test_worker_missing_run_once_fails_at_construction() -> None:
+    class _Incomplete(PeriodicWorker):
+        def interval_seconds(self) -> float:
+            return 1.0
+
+    with pytest.raises(TypeError):
+        _Incomplete()
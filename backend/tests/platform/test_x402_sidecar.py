@@ -0,0 +1,52 @@
+import httpx
+import pytest
+
+from app.platform.config import settings
+from app.platform.services import x402
+from app.platform.services.x402 import GatewaySidecarClient
+
+
+@pytest.mark.asyncio
+async def test_only_idempotent_calls_retry_on_http_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "x402_sidecar_retry_backoff_seconds", 0.0)
+    seen = []
+    outcomes = [503, 200, 503, "connect", 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path))
+        outcome = outcomes.pop(0)
+        if outcome == "connect":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(outcome, json={"ok": True})
+
+    client = GatewaySidecarClient("http://sidecar/", max_retries=2, transport=httpx.MockTransport(handler))
+    try:
+        assert await client.get_json("supported") == {"ok": True}
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post_json("verify-settle", {"paymentPayload": {}})
+        assert await client.post_json("pay", {"contentId": "c"}) == {"ok": True}
+    finally:
+        await client.aclose()
+
+    assert seen == [
+        ("GET", "/supported"),
+        ("GET", "/supported"),
+        ("POST", "/verify-settle"),
+        ("POST", "/pay"),
+        ("POST", "/pay"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sidecar_clients_are_kept_per_url_and_all_closed() -> None:
+    first = x402.get_x402_sidecar("http://sidecar-a/")
+    assert x402.get_x402_sidecar("http://sidecar-a") is first
+    second = x402.get_x402_sidecar("http://sidecar-b")
+    first._get_client()
+    second._get_client()
+
+    await x402.close_x402_sidecar()
+
+    assert first._client is None and second._client is None
+    assert x402.get_x402_sidecar("http://sidecar-a") is not first
+    await x402.close_x402_sidecar()
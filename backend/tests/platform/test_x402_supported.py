@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from app.platform.services import x402
+
+_DOC = {"kinds": [{"scheme": "exact", "network": "eip155:1", "extra": {"name": "USDC", "version": "2"}}]}
+
+
+class _Redis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        value, expires_at = self.values.get(key, (None, 0.0))
+        return value if expires_at > time.monotonic() else None
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and await self.get(key) is not None:
+            return None
+        ttl = px / 1000 if px is not None else ex
+        self.values[key] = (value, time.monotonic() + ttl)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_readers_never_call_sidecar_and_keep_last_good(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis = _Redis()
+    responses = [_DOC, None]
+    fetched = []
+
+    async def fetch(*, sidecar_url):
+        fetched.append(sidecar_url)
+        return responses.pop(0)
+
+    monkeypatch.setattr(x402, "get_redis", lambda: redis)
+    monkeypatch.setattr(x402, "fetch_gateway_supported_kinds", fetch)
+    monkeypatch.setattr(x402, "_SUPPORTED_CACHE", None)
+
+    assert await x402.get_gateway_supported_kinds(sidecar_url="http://sidecar") is None
+    assert fetched == []
+
+    assert await x402.refresh_gateway_supported_kinds(sidecar_url="http://sidecar") == _DOC
+    # A second refresh inside the interval is skipped by the cluster lock.
+    assert await x402.refresh_gateway_supported_kinds(sidecar_url="http://sidecar") == _DOC
+    assert len(fetched) == 1
+
+    # Another process starts cold and warms from Redis.
+    monkeypatch.setattr(x402, "_SUPPORTED_CACHE", None)
+    assert await x402.get_gateway_supported_kinds(sidecar_url="http://sidecar") == _DOC
+
+    # Sidecar down on the next refresh: the last known good document is still served.
+    redis.values.pop(x402._SUPPORTED_LOCK_KEY)
+    assert await x402.refresh_gateway_supported_kinds(sidecar_url="http://sidecar") == _DOC
+    assert len(fetched) == 2
+    assert await x402.get_gateway_supported_kinds(sidecar_url="http://sidecar") == _DOC
@@ -0,0 +1,140 @@
+import time
+
+from ecdsa import SECP256k1, SigningKey
+from ecdsa.util import sigencode_string_canonize
+import pytest
+
+from app.platform.services.chain import erc3009_typed_data, keccak256
+from app.platform.services.eip712 import hash_typed_data, recover_address
+from app.platform.services import x402
+from app.platform.services.x402 import PaymentVerificationError, verify_exact_payment
+
+# Well-known test key for 0x2c7536E3605D9C16a7a3D7b1898e529396a65c23.
+_KEY = SigningKey.from_string(
+    bytes.fromhex("4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318"), curve=SECP256k1
+)
+_PAYER = "0x2c7536e3605d9c16a7a3d7b1898e529396a65c23"
+_PAY_TO = "0x" + "22" * 20
+_ASSET = "0x" + "33" * 20
+_NOW = 1_800_000_000
+
+_REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "eip155:5042002",
+    "asset": _ASSET,
+    "amount": "5000",
+    "payTo": _PAY_TO,
+    "maxTimeoutSeconds": 60,
+    "extra": {"name": "USDC", "version": "2"},
+}
+
+
+def _sign(authorization: dict, key: SigningKey = _KEY, primary_type: str = "TransferWithAuthorization") -> str:
+    typed = erc3009_typed_data(
+        primary_type=primary_type,
+        domain={"name": "USDC", "version": "2", "chainId": 5042002, "verifyingContract": _ASSET},
+        message=authorization,
+    )
+    digest = hash_typed_data(typed)
+    rs = key.sign_digest_deterministic(digest, sigencode=sigencode_string_canonize)
+    signer = "0x" + keccak256(key.get_verifying_key().to_string())[-20:].hex()
+    (signature,) = [rs + bytes([v]) for v in (27, 28) if recover_address(digest, rs + bytes([v])) == signer]
+    return "0x" + signature.hex()
+
+
+def _payload(now: int = _NOW, **overrides) -> dict:
+    authorization = {
+        "from": _PAYER,
+        "to": _PAY_TO,
+        "value": "5000",
+        "validAfter": str(now - 10),
+        "validBefore": str(now + 60),
+        "nonce": "0x" + "ab" * 32,
+    }
+    signature = _sign(authorization, **overrides)
+    return {"x402Version": 2, "payload": {"authorization": authorization, "signature": signature}}
+
+
+def test_erc3009_type_hashes_match_fiat_token() -> None:
+    assert keccak256(
+        b"ReceiveWithAuthorization(address from,address to,uint256 value,uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+    ).hex() == "d099cc98ef71107a616c4f0f941f04c322d8e254fe26b3c6668db87aae413de8"
+
+
+@pytest.mark.parametrize("primary_type", ["ReceiveWithAuthorization", "TransferWithAuthorization"])
+def test_valid_payment_recovers_payer(primary_type: str) -> None:
+    payload = _payload(primary_type=primary_type)
+    assert verify_exact_payment(payment_payload=payload, requirements=_REQUIREMENTS, now=_NOW) == _PAYER
+    overpaid = {**_REQUIREMENTS, "amount": "4000"}
+    assert verify_exact_payment(payment_payload=payload, requirements=overpaid, now=_NOW) == _PAYER
+
+
+def test_rejects_bad_payloads_locally() -> None:
+    def reason(payload: dict, requirements: dict = _REQUIREMENTS, now: int = _NOW) -> str:
+        with pytest.raises(PaymentVerificationError) as exc:
+            verify_exact_payment(payment_payload=payload, requirements=requirements, now=now)
+        return exc.value.reason
+
+    assert reason(_payload(), {**_REQUIREMENTS, "amount": "6000"}) == "amount_mismatch"
+    assert reason(_payload(), {**_REQUIREMENTS, "payTo": "0x" + "44" * 20}) == "recipient_mismatch"
+    assert reason(_payload(), now=_NOW + 58) == "expired"
+    assert reason(_payload(), now=_NOW - 60) == "not_yet_valid"
+    assert reason(_payload(key=SigningKey.generate(curve=SECP256k1))) == "invalid_signature"
+    assert reason({"payload": {}}) == "invalid_payload"
+
+    tampered = _payload()
+    tampered["payload"]["authorization"]["nonce"] = "0x" + "cd" * 32
+    assert reason(tampered) == "invalid_signature"
+
+
+class _Redis:
+    def __init__(self):
+        self.keys = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = ex
+        return True
+
+    async def delete(self, key):
+        self.keys.pop(key, None)
+
+
+class _Sidecar:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = 0
+
+    async def post_json(self, endpoint, body):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.mark.asyncio
+async def test_replayed_authorization_is_rejected_before_sidecar(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis = _Redis()
+    sidecar = _Sidecar([RuntimeError("sidecar down"), {"transaction": "0xtx"}])
+    monkeypatch.setattr(x402, "get_redis", lambda: redis)
+    monkeypatch.setattr(x402, "get_x402_sidecar", lambda url: sidecar)
+    payload = _payload(now=int(time.time()))
+
+    with pytest.raises(RuntimeError):
+        await x402.verify_and_settle_via_sidecar(sidecar_url="http://sidecar", payment_payload=payload, requirements=_REQUIREMENTS)
+    assert redis.keys == {}
+
+    settled = await x402.verify_and_settle_via_sidecar(
+        sidecar_url="http://sidecar", payment_payload=payload, requirements=_REQUIREMENTS
+    )
+    assert settled == x402.X402Settlement(transaction="0xtx", payer=_PAYER)
+    ((key, ttl),) = redis.keys.items()
+    assert key == f"x402:nonce:{_PAYER}:0x" + "ab" * 32
+    assert 0 < ttl <= 60 + 60
+
+    with pytest.raises(PaymentVerificationError) as exc:
+        await x402.verify_and_settle_via_sidecar(sidecar_url="http://sidecar", payment_payload=payload, requirements=_REQUIREMENTS)
+    assert exc.value.reason == "nonce_replayed"
+    assert sidecar.calls == 2
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import create_app
@@ -11,3 +12,33 @@ def test_health_returns_ok() -> None:
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_metrics_snapshot_lists_registered_metrics(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.platform import metrics
+    from app.platform.config import settings
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-token")
+    metrics.histogram("test_latency_seconds", "test").observe(0.02, operation="x")
+
+    app = create_app()
+    client = TestClient(app)
+
+    assert client.get("/api/v1/metrics").status_code == 401
+    assert client.get("/api/v1/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/api/v1/metrics", headers={"Authorization": "Bearer scrape-token"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["test_latency_seconds"]["type"] == "histogram"
+    assert body["test_latency_seconds"]["values"][0]["count"] >= 1
+
+
+def test_metrics_hidden_without_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.platform.config import settings
+
+    monkeypatch.setattr(settings, "metrics_token", None)
+    client = TestClient(create_app())
+
+    assert client.get("/api/v1/metrics", headers={"Authorization": "Bearer anything"}).status_code == 404
@@ -31,6 +31,11 @@ async def test_migrations_apply_cleanly() -> None:
             "payment_channels",
             "settlements",
             "ai_cache",
+            "circle_wallet_pool",
+            "channel_events",
+            "chain_cursors",
+            "escrow_creator_balances",
+            "creator_content_earnings",
         }
 
         async with engine.connect() as connection:
@@ -0,0 +1,164 @@
+import os
+import asyncio
+import json
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+_SEED = [
+    """
+    INSERT INTO users (id, email, hashed_password, is_creator)
+    SELECT md5('u' || g)::uuid, 'user' || g || '@example.com', 'x', g <= 200
+    FROM generate_series(1, 2000) AS g
+    """,
+    """
+    INSERT INTO content (
+        id, creator_id, title, description, content_type, duration_seconds, resolution, bitrate_tier,
+        engagement_intent, quality_score, suggested_price_per_second, price_per_second, ipfs_cid
+    )
+    SELECT md5('c' || g)::uuid, md5('u' || (g % 200 + 1))::uuid, 'Title ' || g, 'd', 'tutorial', 600, '1080p',
+        'high', 'learn', 50, 10, 10, 'bafy'
+    FROM generate_series(1, 2000) AS g
+    """,
+    """
+    INSERT INTO payment_channels (
+        id, user_id, content_id, price_per_second_locked, status, total_seconds_streamed, total_amount_owed,
+        total_amount_settled, last_tick_at, opened_at
+    )
+    SELECT md5('ch' || g)::uuid, md5('u' || (g % 2000 + 1))::uuid, md5('c' || (g % 1999 + 1))::uuid, 10,
+        CASE WHEN g % 20 = 0 THEN 'active' ELSE 'closed' END, 60, 600, 600,
+        now() - g * interval '1 second', now() - g * interval '1 second'
+    FROM generate_series(1, 100000) AS g
+    """,
+    """
+    INSERT INTO settlements (id, channel_id, amount, tx_hash, state, created_at)
+    SELECT md5('s' || g)::uuid, md5('ch' || g)::uuid, 600, 'simulated:' || g, 'SIMULATED',
+        now() - g * interval '1 second'
+    FROM generate_series(1, 100000) AS g
+    """,
+    """
+    INSERT INTO creator_content_earnings (content_id, creator_id, amount_gross, settlement_count)
+    SELECT content.id, content.creator_id, SUM(settlements.amount), COUNT(*)
+    FROM settlements
+    JOIN payment_channels ON payment_channels.id = settlements.channel_id
+    JOIN content ON content.id = payment_channels.content_id
+    GROUP BY content.id, content.creator_id
+    """,
+    "ANALYZE",
+]
+
+_QUERIES = {
+    "active_channel_lookup": (
+        """
+        SELECT * FROM payment_channels
+        WHERE user_id = :user_id AND content_id = :content_id AND status = 'active'
+        ORDER BY opened_at DESC LIMIT 1
+        """,
+        {"user_id": "md5u", "content_id": "md5c"},
+        {"ix_payment_channels_active_user_content"},
+    ),
+    "viewer_history": (
+        """
+        SELECT payment_channels.*, content.title, content.creator_id FROM payment_channels
+        JOIN content ON content.id = payment_channels.content_id
+        WHERE payment_channels.user_id = :user_id
+        ORDER BY payment_channels.opened_at DESC LIMIT 100
+        """,
+        {"user_id": "md5u"},
+        {"ix_payment_channels_user_opened"},
+    ),
+    "creator_recent_settlements": (
+        """
+        SELECT settlements.* FROM settlements
+        JOIN payment_channels ON payment_channels.id = settlements.channel_id
+        JOIN content ON content.id = payment_channels.content_id
+        WHERE content.creator_id = :creator_id
+        ORDER BY settlements.created_at DESC LIMIT 50
+        """,
+        {"creator_id": "md5u"},
+        {"ix_content_creator_id", "ix_payment_channels_content_id", "ix_settlements_channel_created"},
+    ),
+    "creator_earnings_by_content": (
+        """
+        SELECT content.id, content.title, creator_content_earnings.amount_gross FROM creator_content_earnings
+        JOIN content ON content.id = creator_content_earnings.content_id
+        WHERE creator_content_earnings.creator_id = :creator_id
+        ORDER BY creator_content_earnings.amount_gross DESC
+        """,
+        {"creator_id": "md5u"},
+        {"ix_creator_content_earnings_creator_gross"},
+    ),
+}
+
+
+# Pinned so the assertions do not depend on the server's cost settings or on how a small seed
+# compares to a sequential scan: a plan only avoids an index here when no usable index exists.
+_PLANNER_SETTINGS = (
+    "SET enable_seqscan = off",
+    "SET random_page_cost = 1.1",
+    "SET seq_page_cost = 1",
+)
+
+
+def _scans(plan: dict) -> list[tuple[str, str]]:
+    """(node type, relation or index name) for every scan node in an EXPLAIN (FORMAT JSON) plan."""
+    found = []
+    if "Index Name" in plan:
+        found.append((plan["Node Type"], plan["Index Name"]))
+    elif plan.get("Node Type") == "Seq Scan":
+        found.append(("Seq Scan", plan["Relation Name"]))
+    for child in plan.get("Plans", []):
+        found.extend(_scans(child))
+    return found
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes_on_large_dataset() -> None:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    engine = create_async_engine(database_url, pool_pre_ping=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            await connection.execute(text("CREATE SCHEMA public"))
+
+        alembic_cfg = Config("alembic.ini")
+        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+        async with engine.begin() as connection:
+            for statement in _SEED:
+                await connection.execute(text(statement))
+
+        async with engine.connect() as connection:
+            analyzed = await connection.execute(
+                text(
+                    "SELECT relname, reltuples FROM pg_class "
+                    "WHERE relname IN ('payment_channels', 'settlements')"
+                )
+            )
+            # The seed ends with ANALYZE; without fresh statistics the plans below would be guesses.
+            estimates = {name: int(rows) for name, rows in analyzed.all()}
+            assert estimates.keys() == {"payment_channels", "settlements"}
+            assert all(rows >= 90_000 for rows in estimates.values()), estimates
+
+            for statement in _PLANNER_SETTINGS:
+                await connection.execute(text(statement))
+            ids = {
+                "md5u": (await connection.execute(text("SELECT md5('u' || 7)::uuid::text"))).scalar(),
+                "md5c": (await connection.execute(text("SELECT md5('c' || 7)::uuid::text"))).scalar(),
+            }
+            for name, (sql, params, expected_indexes) in _QUERIES.items():
+                bound = {key: ids[value] for key, value in params.items()}
+                result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), bound)
+                raw = result.scalar()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                scans = _scans(plan)
+                assert not [scan for scan in scans if scan[0] == "Seq Scan"], f"{name} has no usable index: {scans}"
+                assert expected_indexes <= {index for _, index in scans}, f"{name} skipped an expected index: {scans}"
+    finally:
+        await engine.dispose()
@@ -83,7 +83,7 @@ export default function App() {
 
     async function loadContent() {
       if (!token) return;
-      const items = await listContent();
+      const items = await listContent(token);
       if (!cancelled) {
         setContent(items);
       }
@@ -96,7 +96,8 @@ export default function App() {
   }, [token]);
 
   async function refreshContent() {
-    const items = await listContent();
+    if (!token) return;
+    const items = await listContent(token);
     setContent(items);
   }
 
@@ -11,6 +11,9 @@ import {
 } from '../services/stream';
 import { formatUsdcMinor } from '../utils/format';
 
+// Prepay a minute of playback per authorization instead of one 10s chunk.
+const PREPAY_CHUNKS = 6;
+
 export default function VideoPlayer({
   token,
   item,
@@ -65,7 +68,7 @@ export default function VideoPlayer({
     let cancelled = false;
 
     async function loadDetails() {
-      const details = await getContent(item.id);
+      const details = await getContent(token, item.id);
       if (!cancelled) {
         setContentDetails(details);
       }
@@ -80,7 +83,7 @@ export default function VideoPlayer({
     return () => {
       cancelled = true;
     };
-  }, [item.id]);
+  }, [item.id, token]);
 
   useEffect(() => {
     // Do not auto-consume credit on modal open.
@@ -91,7 +94,7 @@ export default function VideoPlayer({
     setRefillBusy(true);
     setError(null);
     try {
-      const res = await autoPayStream(token, item.id);
+      const res = await autoPayStream(token, item.id, { chunks: PREPAY_CHUNKS });
       setPaymentResponse(res.paymentResponseHeader ?? null);
       if (typeof res.secondsRemaining === 'number') {
         setSecondsRemaining(res.secondsRemaining);
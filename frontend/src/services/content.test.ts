@@ -15,15 +15,19 @@ vi.mock('./api', () => {
 });
 
 describe('content service', () => {
-  it('calls list content', async () => {
+  it('calls list content with bearer token', async () => {
     const { apiRequest } = await import('./api');
-    await listContent();
-    expect(apiRequest).toHaveBeenCalledWith('/content');
+    await listContent('t1');
+    expect(apiRequest).toHaveBeenCalledWith('/content', {
+      headers: { authorization: 'Bearer t1' },
+    });
   });
 
-  it('calls get content by id', async () => {
+  it('calls get content by id with bearer token', async () => {
     const { apiRequest } = await import('./api');
-    await getContent('abc');
-    expect(apiRequest).toHaveBeenCalledWith('/content/abc');
+    await getContent('t2', 'abc');
+    expect(apiRequest).toHaveBeenCalledWith('/content/abc', {
+      headers: { authorization: 'Bearer t2' },
+    });
   });
 });
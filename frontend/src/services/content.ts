@@ -1,12 +1,17 @@
 import { apiRequest, ApiError, getApiBaseUrl } from './api';
 import { ContentItem, ContentResponse } from '../types';
 
-export async function listContent(): Promise<ContentItem[]> {
-  return apiRequest<ContentItem[]>('/content');
+// Content reads are public, but the token lets the API keep them on the primary right after this viewer writes.
+export async function listContent(token: string): Promise<ContentItem[]> {
+  return apiRequest<ContentItem[]>('/content', {
+    headers: { authorization: `Bearer ${token}` },
+  });
 }
 
-export async function getContent(contentId: string): Promise<ContentResponse> {
-  return apiRequest<ContentResponse>(`/content/${encodeURIComponent(contentId)}`);
+export async function getContent(token: string, contentId: string): Promise<ContentResponse> {
+  return apiRequest<ContentResponse>(`/content/${encodeURIComponent(contentId)}`, {
+    headers: { authorization: `Bearer ${token}` },
+  });
 }
 
 export async function uploadContent(
@@ -1,4 +1,4 @@
-import { apiRequest } from './api';
+import { apiRequest, getApiBaseUrl } from './api';
 
 export type ChannelResponse = {
   id: string;
@@ -42,3 +42,81 @@ export async function closeChannel(token: string, channelId: string): Promise<Ti
     body: JSON.stringify({ channel_id: channelId }),
   });
 }
+
+export type ChannelSocketEvent =
+  | ({ type: 'channel' } & ChannelResponse)
+  | ({ type: 'tick' | 'closed' } & TickResponse)
+  | {
+      type: 'settlement';
+      channel_id: string;
+      settlement_tx_id: string | null;
+      settlement_amount: number | null;
+      total_amount_settled: number;
+    }
+  | { type: 'error'; status: number; detail: string };
+
+export function channelSocketUrl(): string {
+  return `${getApiBaseUrl().replace(/^http/, 'ws')}/payments/channel/ws`;
+}
+
+export class ChannelSocket {
+  private socket: WebSocket | null = null;
+  private heartbeatId: number | null = null;
+
+  constructor(
+    private readonly args: {
+      token: string;
+      contentId?: string;
+      channelId?: string;
+      onEvent: (event: ChannelSocketEvent) => void;
+      onDisconnect?: (code: number) => void;
+    },
+  ) {}
+
+  connect(): void {
+    if (this.socket) return;
+    const socket = new WebSocket(channelSocketUrl());
+    this.socket = socket;
+
+    socket.onopen = () => {
+      socket.send(
+        JSON.stringify({
+          type: 'open',
+          token: this.args.token,
+          content_id: this.args.contentId ?? null,
+          channel_id: this.args.channelId ?? null,
+        }),
+      );
+    };
+    socket.onmessage = (message) => {
+      const event = JSON.parse(String(message.data)) as ChannelSocketEvent;
+      if (event.type === 'channel' && this.heartbeatId === null) {
+        this.heartbeatId = window.setInterval(() => this.send('tick'), 10_000);
+      }
+      this.args.onEvent(event);
+    };
+    socket.onclose = (event) => {
+      this.stopHeartbeat();
+      this.socket = null;
+      this.args.onDisconnect?.(event.code);
+    };
+  }
+
+  close(): void {
+    this.stopHeartbeat();
+    this.send('close');
+  }
+
+  private send(type: 'tick' | 'close'): void {
+    if (this.socket?.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify({ type }));
+    }
+  }
+
+  private stopHeartbeat(): void {
+    if (this.heartbeatId !== null) {
+      window.clearInterval(this.heartbeatId);
+      this.heartbeatId = null;
+    }
+  }
+}
@@ -3,6 +3,12 @@ import { ApiError, getApiBaseUrl } from './api';
 export type StreamResponse = {
   playback_url: string;
   seconds_remaining?: number;
+  seconds_purchased?: number;
+};
+
+export type PrepayOptions = {
+  chunks?: number;
+  restOfVideo?: boolean;
 };
 
 export type X402Accept = {
@@ -84,9 +90,22 @@ export async function getStreamPlaybackUrl(
   };
 }
 
-export async function autoPayStream(token: string, contentId: string): Promise<StreamResult> {
+export async function autoPayStream(
+  token: string,
+  contentId: string,
+  prepay?: PrepayOptions,
+): Promise<StreamResult> {
   const url = `${getApiBaseUrl()}/content/${encodeURIComponent(contentId)}/pay?access_token=${encodeURIComponent(token)}`;
-  const resp = await fetch(url, { method: 'POST' });
+  const resp = await fetch(
+    url,
+    prepay
+      ? {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ chunks: prepay.chunks ?? 1, rest_of_video: prepay.restOfVideo ?? false }),
+        }
+      : { method: 'POST' },
+  );
 
   const contentType = resp.headers.get('content-type') ?? '';
   const isJson = contentType.includes('application/json');
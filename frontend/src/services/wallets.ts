@@ -12,6 +12,19 @@ export type UsdcBalanceResponse = {
   balance: string;
 };
 
+export type WalletBalanceItem = {
+  wallet_address: string;
+  balance_minor: number;
+  balance: string;
+  escrow_balance_minor?: number | null;
+};
+
+export type BulkBalancesResponse = {
+  usdc_address: string;
+  escrow_address?: string | null;
+  items: WalletBalanceItem[];
+};
+
 export type CircleTransactionResponse = {
   id: string;
   state: string;
@@ -47,6 +60,18 @@ export async function getUsdcBalance(token: string): Promise<UsdcBalanceResponse
   });
 }
 
+export async function getBulkBalances(
+  token: string,
+  addresses: string[],
+  includeEscrow = false,
+): Promise<BulkBalancesResponse> {
+  return apiRequest<BulkBalancesResponse>('/wallets/balances', {
+    method: 'POST',
+    headers: { 'content-type': 'application/json', authorization: `Bearer ${token}` },
+    body: JSON.stringify({ addresses, include_escrow: includeEscrow }),
+  });
+}
+
 export async function getCircleTransaction(token: string, txId: string): Promise<CircleTransactionResponse> {
   return apiRequest<CircleTransactionResponse>(`/wallets/transactions/${encodeURIComponent(txId)}`, {
     method: 'GET',
@@ -45,6 +45,7 @@ export type CreatorSettlementItem = {
   amount_gross: number;
   amount_creator: number;
   tx_hash: string;
+  state?: string | null;
   created_at: string;
 };
 